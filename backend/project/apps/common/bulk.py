@@ -0,0 +1,54 @@
+from itertools import islice
+
+from django.db import connection
+
+
+# Raw executemany() writers for the bulk jobs (seat maps, rolling inventory,
+# ranking, room allocation). Building a model instance per row for
+# bulk_create(), or bulk_update()'s CASE statements, cost more than the
+# write itself at these volumes, so the statements are written against the
+# model's table directly. They send no signals, so callers invalidate
+# caches themselves, and rows must already hold database values (dates and
+# decimals through get_db_prep_save() where the backend needs it).
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def _executemany(sql, rows, batch_size):
+    """executemany() rows (any iterable) batch_size at a time; returns the rows written."""
+    rows = iter(rows)
+    written = 0
+    with connection.cursor() as cursor:
+        while True:
+            chunk = list(islice(rows, batch_size))
+            if not chunk:
+                return written
+            cursor.executemany(sql, chunk)
+            written += cursor.rowcount if cursor.rowcount >= 0 else len(chunk)
+
+
+def insert_ignoring_conflicts(model, fields, rows, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    INSERT rows (tuples in fields order) into model's table, skipping rows
+    that hit a unique constraint. Returns the number of rows inserted.
+    """
+    meta = model._meta
+    qn = connection.ops.quote_name
+    columns = ', '.join(qn(meta.get_field(name).column) for name in fields)
+    placeholders = ', '.join(['%s'] * len(fields))
+    sql = f"INSERT INTO {qn(meta.db_table)} ({columns}) VALUES ({placeholders}) ON CONFLICT DO NOTHING"
+    return _executemany(sql, rows, batch_size)
+
+
+def update_by_id(model, field, rows, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    UPDATE field of model's rows from (value, pk) pairs. Returns the number
+    of rows updated.
+    """
+    meta = model._meta
+    qn = connection.ops.quote_name
+    sql = (
+        f"UPDATE {qn(meta.db_table)} SET {qn(meta.get_field(field).column)} = %s "
+        f"WHERE {qn(meta.pk.column)} = %s"
+    )
+    return _executemany(sql, rows, batch_size)
@@ -0,0 +1,189 @@
+import hashlib
+import json
+import time
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from apps.common.models import IdempotencyRecord
+
+
+# ---------------------- SETTINGS ----------------------
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+# How long a stored response is replayed for
+TTL_SECONDS = getattr(settings, 'IDEMPOTENCY_TTL', 60 * 60 * 24)
+
+# How long a claim may stay in flight before its worker is taken to have
+# died (OOM, SIGKILL, deploy) and a retry may run; keep it above the
+# request timeout
+IN_FLIGHT_TIMEOUT = getattr(settings, 'IDEMPOTENCY_IN_FLIGHT_TIMEOUT', 60)
+
+# How long a duplicate waits for the first request to finish
+WAIT_TIMEOUT = getattr(settings, 'IDEMPOTENCY_WAIT_TIMEOUT', 10)
+POLL_INTERVAL = getattr(settings, 'IDEMPOTENCY_POLL_INTERVAL', 0.05)
+
+CACHE_PREFIX = 'idem:'
+
+
+# ---------------------- HELPERS ----------------------
+
+def _scope_key(request, idempotency_key):
+    """Keys are scoped per user (or client IP) and per endpoint."""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        owner = f"user:{user.pk}"
+    else:
+        owner = f"ip:{request.META.get('REMOTE_ADDR', '')}"
+    raw = f"{owner}|{request.method}|{request.path}|{idempotency_key}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _request_hash(request):
+    data = request.data
+    if hasattr(data, 'lists'):
+        data = dict(data.lists())
+    payload = json.dumps(data, cls=JSONEncoder, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _load(key):
+    """Completed response as (request_hash, status_code, body), cache first then DB."""
+    stored = cache.get(CACHE_PREFIX + key)
+    if stored is not None:
+        return stored
+
+    cutoff = timezone.now() - timedelta(seconds=TTL_SECONDS)
+    record = (
+        IdempotencyRecord.objects
+        .filter(key=key, status_code__isnull=False, created_at__gte=cutoff)
+        .values_list('request_hash', 'status_code', 'response_body')
+        .first()
+    )
+    if record is not None:
+        cache.set(CACHE_PREFIX + key, record, TTL_SECONDS)
+    return record
+
+
+def _replay(stored, request_hash):
+    stored_hash, status_code, body = stored
+    if stored_hash != request_hash:
+        return Response(
+            {"detail": f"{HEADER} was already used with a different request payload."},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    response = Response(body, status=status_code)
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def _claim(key, request_hash):
+    """
+    Insert the in-flight record; the unique key makes this the lock.
+    Replaces a stored response past TTL_SECONDS and an in-flight claim past
+    IN_FLIGHT_TIMEOUT. Returns the record's pk, or None if another request
+    already owns the key.
+    """
+    now = timezone.now()
+    IdempotencyRecord.objects.filter(key=key).filter(
+        Q(created_at__lt=now - timedelta(seconds=TTL_SECONDS))
+        | Q(status_code__isnull=True, created_at__lt=now - timedelta(seconds=IN_FLIGHT_TIMEOUT))
+    ).delete()
+    try:
+        with transaction.atomic():
+            return IdempotencyRecord.objects.create(key=key, request_hash=request_hash).pk
+    except IntegrityError:
+        return None
+
+
+def _wait_for(key):
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        stored = _load(key)
+        if stored is not None:
+            return stored
+        # The first request failed and released its claim
+        if not IdempotencyRecord.objects.filter(key=key).exists():
+            return None
+        time.sleep(POLL_INTERVAL)
+    return None
+
+
+# ---------------------- DECORATOR ----------------------
+
+def idempotent(view_method):
+    """
+    Replay the first response for requests carrying the same Idempotency-Key.
+
+    Use on DRF view methods / viewset actions. Requests without the header
+    run as usual. A duplicate that arrives while the first request is still
+    running waits for its response instead of executing again; a claim whose
+    worker died is taken over after IN_FLIGHT_TIMEOUT. Server errors are not
+    stored, so the client can retry them.
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        idempotency_key = request.headers.get(HEADER)
+        if not idempotency_key:
+            return view_method(self, request, *args, **kwargs)
+
+        if len(idempotency_key) > MAX_KEY_LENGTH:
+            return Response(
+                {"detail": f"{HEADER} must be at most {MAX_KEY_LENGTH} characters."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        key = _scope_key(request, idempotency_key)
+        request_hash = _request_hash(request)
+
+        stored = _load(key)
+        if stored is not None:
+            return _replay(stored, request_hash)
+
+        claim = _claim(key, request_hash)
+        if claim is None:
+            stored = _wait_for(key)
+            if stored is not None:
+                return _replay(stored, request_hash)
+            claim = _claim(key, request_hash)
+            if claim is None:
+                return Response(
+                    {"detail": "A request with this Idempotency-Key is still being processed."},
+                    status=status.HTTP_409_CONFLICT,
+                )
+
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except APIException as exc:
+            # Validation errors are answers too; replay them instead of re-validating
+            response = self.handle_exception(exc)
+        except Exception:
+            IdempotencyRecord.objects.filter(pk=claim).delete()
+            raise
+
+        # By pk: if this request outlived IN_FLIGHT_TIMEOUT, its claim was
+        # taken over and the new owner's record is left alone
+        if response.status_code >= 500:
+            IdempotencyRecord.objects.filter(pk=claim).delete()
+            return response
+
+        body = json.loads(json.dumps(response.data, cls=JSONEncoder))
+        saved = IdempotencyRecord.objects.filter(pk=claim).update(
+            status_code=response.status_code, response_body=body
+        )
+        if saved:
+            cache.set(CACHE_PREFIX + key, (request_hash, response.status_code, body), TTL_SECONDS)
+        return response
+
+    return wrapper
@@ -0,0 +1,54 @@
+import time
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from apps.common import throttling
+from apps.common.throttling import IPTokenBucketThrottle
+
+
+class BenchView(APIView):
+    ip_throttle_scope = 'bench'
+
+
+class Command(BaseCommand):
+    help = "Measure token bucket throttle overhead per request"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50000)
+        # Keep below the cache's MAX_ENTRIES (300 for locmem) or culling resets buckets
+        parser.add_argument('--clients', type=int, default=200)
+
+    def handle(self, *args, **options):
+        total = options['requests']
+        clients = options['clients']
+        factory = APIRequestFactory()
+        requests = [
+            factory.get('/', REMOTE_ADDR=f"10.0.{i // 256}.{i % 256}")
+            for i in range(clients)
+        ]
+        view = BenchView()
+        buckets = {'bench': {'rate': '10/s', 'burst': 20}}
+
+        for label, broken_cache in [('shared cache', False), ('local fallback', True)]:
+            throttle = IPTokenBucketThrottle()
+            throttle.get_bucket = lambda scope: throttling.parse_bucket(buckets[scope])
+            if broken_cache:
+                throttle.consume = self._unreachable
+            caches[throttling.CACHE_ALIAS].clear()
+
+            allowed = 0
+            start = time.perf_counter()
+            for i in range(total):
+                allowed += throttle.allow_request(requests[i % clients], view)
+            elapsed = time.perf_counter() - start
+
+            self.stdout.write(
+                f"{label:>15}: {total} checks in {elapsed:.3f}s, "
+                f"{elapsed / total * 1e6:.1f} us/request, {allowed} allowed"
+            )
+
+    def _unreachable(self, *args):
+        raise ConnectionError("cache unavailable")
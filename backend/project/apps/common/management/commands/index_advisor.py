@@ -0,0 +1,136 @@
+import io
+import json
+import re
+import shlex
+from collections import defaultdict
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+
+# Workloads whose queries are checked when no command is given
+DEFAULT_COMMANDS = (
+    'bench_serializers',
+    'bench_quote_flow',
+    'bench_repricing --classes 2000',
+    'bench_reaccommodation',
+    'bench_rotation --aircraft 20',
+)
+
+EXPLAINABLE = re.compile(r'^\s*(SELECT|UPDATE|DELETE|WITH)\b', re.IGNORECASE)
+
+# "flights_flightseat" T3 / "flights_flightseat" AS U0
+TABLE_ALIAS = re.compile(r'"(\w+)"\s+(?:AS\s+)?"?([A-Z]\d+)"?\b')
+
+
+class Command(BaseCommand):
+    help = (
+        "Run workloads (the bench_* commands by default), EXPLAIN every distinct "
+        "query they issue and report sequential scans of large tables"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('commands', nargs='*', help="Commands to run, e.g. 'bench_repricing --classes 500'")
+        parser.add_argument('--min-rows', type=int, default=1000,
+                            help="Only report scans of tables with at least this many rows")
+        parser.add_argument('--fail', action='store_true', help="Exit with an error if any scan is reported")
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            raise CommandError(f"EXPLAIN parsing is not implemented for {connection.vendor}.")
+
+        self.min_rows = options['min_rows']
+        self.flagged = {}
+        self.scans = defaultdict(lambda: {'count': 0, 'rows': 0, 'sql': '', 'commands': set()})
+        self.explaining = False
+
+        for command in options['commands'] or DEFAULT_COMMANDS:
+            self.command = command
+            name, *arguments = shlex.split(command)
+            self.stderr.write(f"running {command}")
+            with connection.execute_wrapper(self.capture):
+                call_command(name, *arguments, stdout=io.StringIO())
+
+        self.report()
+        if options['fail'] and self.scans:
+            raise CommandError(f"{len(self.scans)} sequential scans of large tables found.")
+
+    # ---------------------- CAPTURE ----------------------
+
+    def capture(self, execute, sql, params, many, context):
+        result = execute(sql, params, many, context)
+        if self.explaining or many or not EXPLAINABLE.match(sql) or ' WHERE ' not in sql:
+            # Statements without a WHERE clause read whole tables by design
+            return result
+
+        flagged = self.flagged.get(sql)
+        if flagged:
+            for key in flagged:
+                self.scans[key]['count'] += 1
+            return result
+
+        # Explained on every run until it scans a large table: plans and row
+        # counts change as the workload fills its tables. A scan reads the
+        # whole table anyway, so counting its rows at most doubles the cost.
+        self.explaining = True
+        try:
+            for table in self.scanned_tables(sql, params):
+                rows = self.table_rows(table)
+                if rows >= self.min_rows:
+                    key = (table, sql)
+                    self.flagged.setdefault(sql, []).append(key)
+                    self.scans[key].update(count=1, rows=rows, sql=sql)
+                    self.scans[key]['commands'].add(self.command)
+        finally:
+            self.explaining = False
+        return result
+
+    def scanned_tables(self, sql, params):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+                return sqlite_scans(sql, [row[3] for row in cursor.fetchall()])
+            cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+            plan = cursor.fetchone()[0]
+            return postgres_scans(json.loads(plan) if isinstance(plan, str) else plan)
+
+    def table_rows(self, table):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {connection.ops.quote_name(table)}")
+            return cursor.fetchone()[0]
+
+    # ---------------------- REPORT ----------------------
+
+    def report(self):
+        if not self.scans:
+            self.stdout.write(f"No sequential scans of tables with {self.min_rows}+ rows.")
+            return
+        for (table, _), scan in sorted(self.scans.items(), key=lambda item: -item[1]['count']):
+            self.stdout.write(
+                f"SEQ SCAN {table} ({scan['rows']} rows), {scan['count']}x in {', '.join(sorted(scan['commands']))}"
+            )
+            self.stdout.write(f"    {scan['sql'][:300]}")
+
+
+def sqlite_scans(sql, details):
+    """Tables read in full: 'SCAN <table or alias>' without an index."""
+    aliases = {alias: table for table, alias in TABLE_ALIAS.findall(sql)}
+    tables = []
+    for detail in details:
+        match = re.match(r'SCAN (\w+)(.*)$', detail)
+        if match and 'INDEX' not in match.group(2):
+            tables.append(aliases.get(match.group(1), match.group(1)))
+    return tables
+
+
+def postgres_scans(plan):
+    """Relations under a 'Seq Scan' node anywhere in an EXPLAIN (FORMAT JSON) plan."""
+    tables = []
+    nodes = [entry['Plan'] for entry in plan]
+    while nodes:
+        node = nodes.pop()
+        if node.get('Node Type') == 'Seq Scan':
+            tables.append(node['Relation Name'])
+        nodes.extend(node.get('Plans', []))
+    return tables
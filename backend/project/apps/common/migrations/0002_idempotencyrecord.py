@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdempotencyRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(help_text='sha256 of user, path and Idempotency-Key', max_length=64, unique=True)),
+                ('request_hash', models.CharField(help_text='sha256 of the request payload', max_length=64)),
+                ('status_code', models.PositiveSmallIntegerField(blank=True, help_text='Empty while the first request is in flight', null=True)),
+                ('response_body', models.JSONField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+    ]
@@ -75,5 +75,15 @@ class ServiceProvider(models.Model):
 
 
 
+# Idempotency
 
+class IdempotencyRecord(models.Model):
+    """First response stored for a request sent with an Idempotency-Key header"""
+    key = models.CharField(max_length=64, unique=True, help_text="sha256 of user, path and Idempotency-Key")
+    request_hash = models.CharField(max_length=64, help_text="sha256 of the request payload")
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True, help_text="Empty while the first request is in flight")
+    response_body = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
+    def __str__(self):
+        return f"{self.key[:12]} ({self.status_code or 'in flight'})"
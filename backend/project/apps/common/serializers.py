@@ -0,0 +1,224 @@
+from contextlib import contextmanager
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db import IntegrityError, transaction
+from django.db.models import UniqueConstraint
+from rest_framework import serializers
+from rest_framework.fields import empty
+from rest_framework.settings import api_settings
+
+
+# Fields whose to_representation() returns database values unchanged
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.ChoiceField,
+)
+
+
+class CompiledSerializer:
+    """
+    Read-only fast path for a ModelSerializer.
+
+    The serializer's readable fields are compiled once into a flat list of
+    ORM lookups (source='airline.name' becomes 'airline__name') and rows are
+    read with values_list(), so no model instances or per-row Field walks are
+    needed. Output matches serializer(queryset, many=True).data, including
+    DRF's habit of omitting a dotted-source field when the relation is null.
+
+    Only plain model fields and dotted paths over forward relations can be
+    compiled; SerializerMethodField, nested serializers, many-to-many and
+    source='*' raise ImproperlyConfigured.
+    """
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        self.model = serializer_class.Meta.model
+        self.lookups = []
+        self.names = []
+        self.converters = []
+        self.skip_if_none = []
+
+        for field in serializer_class().fields.values():
+            if field.write_only:
+                continue
+            index = len(self.lookups)
+            self.lookups.append(self._lookup(field))
+            self.names.append(field.field_name)
+
+            convert = self._converter(field)
+            if convert is not None:
+                self.converters.append((field.field_name, index, convert))
+            if self._skips_none(field):
+                self.skip_if_none.append((field.field_name, index))
+
+    def _lookup(self, field):
+        name = f"{self.serializer_class.__name__}.{field.field_name}"
+        if isinstance(field, (serializers.BaseSerializer, serializers.SerializerMethodField,
+                              serializers.ManyRelatedField)) or field.source == '*':
+            raise ImproperlyConfigured(f"{name} cannot be compiled to a values() lookup.")
+
+        model = self.model
+        for attr in field.source_attrs:
+            try:
+                model_field = model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                raise ImproperlyConfigured(f"{name}: '{attr}' is not a field of {model.__name__}.")
+            if model_field.many_to_many or model_field.one_to_many:
+                raise ImproperlyConfigured(f"{name} spans a to-many relation.")
+            model = model_field.related_model
+        return '__'.join(field.source_attrs)
+
+    def _converter(self, field):
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            return field.pk_field.to_representation if field.pk_field is not None else None
+        if type(field) in PASSTHROUGH_FIELDS:
+            return None
+        if type(field) is serializers.DecimalField:
+            return self._decimal_converter(field)
+        return field.to_representation
+
+    def _decimal_converter(self, field):
+        # The database already returns Decimals at the field's scale, so the
+        # quantize() in DecimalField.to_representation is a no-op for them.
+        coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+        if (not coerce_to_string or field.localize or field.normalize_output
+                or field.decimal_places is None):
+            return field.to_representation
+        exponent = -field.decimal_places
+        to_representation = field.to_representation
+
+        def convert(value):
+            if value.as_tuple().exponent == exponent:
+                return format(value, 'f')
+            return to_representation(value)
+        return convert
+
+    def _skips_none(self, field):
+        # Mirrors Field.get_attribute(): a null relation in a dotted source
+        # raises AttributeError, which read-only fields turn into SkipField.
+        return (
+            len(field.source_attrs) > 1
+            and field.default is empty
+            and not field.allow_null
+            and not field.required
+        )
+
+    def values(self, queryset):
+        return queryset.values_list(*self.lookups)
+
+    def convert(self, rows):
+        """values_list() rows -> representation dicts"""
+        names, converters, skip_if_none = self.names, self.converters, self.skip_if_none
+        for row in rows:
+            item = dict(zip(names, row))
+            for name, index, convert in converters:
+                value = row[index]
+                if value is not None:
+                    item[name] = convert(value)
+            for name, index in skip_if_none:
+                if row[index] is None:
+                    del item[name]
+            yield item
+
+    def iterate(self, queryset, chunk_size=2000):
+        return self.convert(self.values(queryset).iterator(chunk_size=chunk_size))
+
+    def serialize(self, queryset):
+        return list(self.iterate(queryset))
+
+
+@lru_cache(maxsize=None)
+def compile_serializer(serializer_class):
+    """Compiled fast path for serializer_class, built once per class."""
+    return CompiledSerializer(serializer_class)
+
+
+class UniqueConstraintErrorsMixin:
+    """
+    Enforce uniqueness with database constraints instead of exists() queries.
+
+    create()/update() run in a savepoint; an IntegrityError from one of the
+    constraints listed in unique_errors becomes a field-level ValidationError,
+    so a write is a single round trip and still race free. Keys are
+    UniqueConstraint names, unique_together tuples or, for unique=True
+    columns, the field name:
+
+        unique_errors = {
+            'flights_flightleg_route_stop_order_uniq':
+                ('stop_order', "Stop order {stop_order} already exists for this route."),
+        }
+
+    Messages are formatted with the validated data. Set Meta.validators = []
+    (and drop field UniqueValidators) so DRF does not add its own queries.
+    """
+    unique_errors = {}
+
+    def create(self, validated_data):
+        with self.unique_constraint_errors(validated_data):
+            return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        with self.unique_constraint_errors(validated_data):
+            return super().update(instance, validated_data)
+
+    @contextmanager
+    def unique_constraint_errors(self, validated_data):
+        try:
+            with transaction.atomic():
+                yield
+        except IntegrityError as exc:
+            error = self.unique_error(exc, validated_data)
+            if error is None:
+                raise
+            raise serializers.ValidationError(error)
+
+    def unique_error(self, exc, validated_data):
+        message = str(exc)
+        model = self.Meta.model
+        for key, (field_name, template) in self.unique_errors.items():
+            if any(signature in message for signature in violation_signatures(model, key)):
+                return {field_name: [template.format_map(FormatValues(validated_data, self.instance))]}
+        return None
+
+
+class FormatValues(dict):
+    """Validated data, falling back to the instance for partial updates."""
+
+    def __init__(self, data, instance):
+        super().__init__(data)
+        self.instance = instance
+
+    def __missing__(self, key):
+        return getattr(self.instance, key, '')
+
+
+@lru_cache(maxsize=None)
+def violation_signatures(model, key):
+    """
+    Substrings identifying a violation of constraint/field `key` in backend
+    error messages: the constraint name (PostgreSQL, SQLite expression
+    indexes), SQLite's column list and PostgreSQL's key detail.
+    """
+    table = model._meta.db_table
+    constraint = next(
+        (c for c in model._meta.constraints if isinstance(c, UniqueConstraint) and c.name == key),
+        None,
+    )
+    if isinstance(key, tuple):
+        fields = list(key)
+        signatures = []
+    elif constraint is None:
+        fields = [key]
+        signatures = []
+    else:
+        fields = list(constraint.fields)
+        signatures = [f'"{key}"', f"'{key}'"]
+
+    if fields:
+        columns = [model._meta.get_field(name).column for name in fields]
+        signatures.append("UNIQUE constraint failed: " + ", ".join(f"{table}.{c}" for c in columns))
+        signatures.append(f"Key ({', '.join(columns)})=")
+    return tuple(signatures)
@@ -0,0 +1,160 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.throttling import BaseThrottle
+
+
+# ---------------------- SETTINGS ----------------------
+
+# scope -> {'rate': 'requests/period', 'burst': requests allowed back to back}
+# Override with TOKEN_BUCKET_RATES in settings.
+DEFAULT_BUCKETS = {
+    'apply_coupon': {'rate': '30/min', 'burst': 10},
+    'apply_coupon_ip': {'rate': '120/min', 'burst': 40},
+}
+
+CACHE_ALIAS = getattr(settings, 'TOKEN_BUCKET_CACHE', 'default')
+CACHE_PREFIX = 'tb:'
+
+# Buckets hold an absolute timestamp, so a stale entry is harmless; the
+# timeout only bounds memory. incr() does not refresh it.
+BUCKET_TIMEOUT = getattr(settings, 'TOKEN_BUCKET_TIMEOUT', 60 * 60)
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_bucket(config):
+    """'30/min' + burst -> (milliseconds between tokens, burst tolerance in ms)"""
+    num, period = config['rate'].split('/')
+    seconds = PERIODS[period[0]]
+    emission_ms = max(1, int(seconds * 1000 / int(num)))
+    burst = max(1, int(config.get('burst', 1)))
+    return emission_ms, emission_ms * burst
+
+
+# ---------------------- LOCAL FALLBACK ----------------------
+
+class LocalBuckets:
+    """Process-local buckets used when the shared cache is unreachable."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tat = {}
+
+    def consume(self, key, now_ms, emission_ms, tolerance_ms):
+        with self._lock:
+            tat = max(self._tat.get(key, now_ms), now_ms) + emission_ms
+            if tat - now_ms > tolerance_ms:
+                return False, tat - now_ms - tolerance_ms
+            self._tat[key] = tat
+            return True, 0
+
+
+local_buckets = LocalBuckets()
+
+
+# ---------------------- THROTTLES ----------------------
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token bucket throttle on a shared cache (GCRA).
+
+    Each bucket is one integer in the cache: the time (ms) at which it will
+    be full again. A request adds one emission interval with an atomic incr
+    and is rejected if that pushes the bucket past its burst tolerance, so a
+    check is one or two cache calls and no database work. Rejected requests
+    give their token back. If the cache backend errors, a process-local
+    bucket is used instead.
+
+    Subclasses choose what a bucket is keyed on via get_bucket_ident().
+    Set throttle_scope on the view, or scope on the throttle class.
+    """
+    scope = None
+    scope_attr = 'throttle_scope'
+
+    def __init__(self):
+        self.cache = caches[CACHE_ALIAS]
+        self.retry_after_ms = 0
+
+    def get_scope(self, view):
+        return self.scope or getattr(view, self.scope_attr, None)
+
+    def get_bucket(self, scope):
+        buckets = getattr(settings, 'TOKEN_BUCKET_RATES', DEFAULT_BUCKETS)
+        try:
+            return parse_bucket(buckets[scope])
+        except KeyError:
+            raise ImproperlyConfigured(f"No token bucket rate set for scope '{scope}'.")
+
+    def get_bucket_ident(self, request, view):
+        raise NotImplementedError('.get_bucket_ident() must be overridden')
+
+    def allow_request(self, request, view):
+        scope = self.get_scope(view)
+        if scope is None:
+            return True
+
+        emission_ms, tolerance_ms = self.get_bucket(scope)
+        key = f"{CACHE_PREFIX}{scope}:{self.get_bucket_ident(request, view)}"
+        now_ms = int(time.time() * 1000)
+
+        try:
+            allowed, self.retry_after_ms = self.consume(key, now_ms, emission_ms, tolerance_ms)
+        except Exception:
+            allowed, self.retry_after_ms = local_buckets.consume(key, now_ms, emission_ms, tolerance_ms)
+        return allowed
+
+    def consume(self, key, now_ms, emission_ms, tolerance_ms):
+        timeout = max(BUCKET_TIMEOUT, tolerance_ms // 1000 + 1)
+        if self.cache.add(key, now_ms + emission_ms, timeout):
+            return True, 0
+
+        try:
+            tat = self.cache.incr(key, emission_ms)
+        except ValueError:
+            # Expired between add() and incr()
+            self.cache.set(key, now_ms + emission_ms, timeout)
+            return True, 0
+
+        if tat - emission_ms < now_ms:
+            # Bucket had refilled completely; restart it from now. Concurrent
+            # requests racing this set() can only be let through, never lost.
+            self.cache.set(key, now_ms + emission_ms, timeout)
+            return True, 0
+
+        if tat - now_ms > tolerance_ms:
+            self.cache.decr(key, emission_ms)
+            return False, tat - now_ms - tolerance_ms
+
+        return True, 0
+
+    def wait(self):
+        return self.retry_after_ms / 1000 if self.retry_after_ms else None
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """Bucket per authenticated user, per client IP for anonymous requests."""
+
+    def get_bucket_ident(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return f"user:{request.user.pk}"
+        return f"ip:{self.get_ident(request)}"
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    """Bucket per client IP, whoever is logged in. Never touches the database."""
+    scope_attr = 'ip_throttle_scope'
+
+    def get_bucket_ident(self, request, view):
+        return f"ip:{self.get_ident(request)}"
+
+
+class EndpointTokenBucketThrottle(TokenBucketThrottle):
+    """One bucket shared by every caller of the view."""
+    scope_attr = 'endpoint_throttle_scope'
+
+    def get_bucket_ident(self, request, view):
+        return 'all'
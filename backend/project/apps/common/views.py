@@ -1,3 +1,25 @@
 from django.shortcuts import render
 
 # Create your views here.
+from rest_framework.response import Response
+
+from .serializers import compile_serializer
+
+
+class CompiledListMixin:
+    """
+    list() served through the compiled read path of the serializer class
+    instead of instantiating a Field tree per row. Same output, pagination
+    and filtering as ListModelMixin.
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        compiled = compile_serializer(self.get_serializer_class())
+
+        rows = compiled.values(queryset)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(list(compiled.convert(page)))
+
+        return Response(list(compiled.convert(rows)))
@@ -6,6 +6,8 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAdminUser, IsAuthenticatedOrReadOnly
 from django.utils import timezone
+from apps.common.idempotency import idempotent
+from apps.common.throttling import IPTokenBucketThrottle, UserTokenBucketThrottle
 from .models import Coupon
 from .serializers import CouponSerializer, ApplyCouponSerializer
 
@@ -29,11 +31,16 @@ class CouponViewSet(viewsets.ModelViewSet):
 class ApplyCouponViewSet(viewsets.GenericViewSet):
     """
     Endpoint for users to validate/apply coupon at checkout.
+    Send an Idempotency-Key header to make client retries safe.
     """
     serializer_class = ApplyCouponSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    throttle_classes = [IPTokenBucketThrottle, UserTokenBucketThrottle]
+    throttle_scope = 'apply_coupon'
+    ip_throttle_scope = 'apply_coupon_ip'
 
     @action(detail=False, methods=['post'])
+    @idempotent
     def apply(self, request):
         serializer = self.get_serializer(data=request.data, context={'request': request})
         serializer.is_valid(raise_exception=True)
@@ -3,4 +3,4 @@ from django.contrib import admin
 # Register your models here.
 from apps.flights.models import * 
 
-admin.site.register([Aircraft,Airport,Terminal,FlightRoute,FlightLeg,FlightClass,FlightClassFare,FlightSchedule,FlightSeat,FareType,Passenger])
\ No newline at end of file
+admin.site.register([Aircraft,Airport,Terminal,FlightRoute,FlightLeg,FlightClass,FlightClassFare,FlightSchedule,FlightSeat,FareType,FareLadderStep,Passenger,SeatMapTemplate,SeatMapSection])
\ No newline at end of file
@@ -0,0 +1,265 @@
+import secrets
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import FlightClass, FlightSeat, SeatMapSection
+from .seatmaps import SEAT_NUMBER, invalidate_seat_maps, merge_letters
+
+
+HOLD_MINUTES = getattr(settings, 'SEAT_HOLD_MINUTES', 15)
+
+# Seats can be taken between reading the map and holding; re-plan this often
+MAX_ATTEMPTS = 3
+
+
+class SeatAllocationError(Exception):
+    """No set of free seats satisfies the party."""
+
+
+# ---------------------- PARTY ----------------------
+
+def family_units(party):
+    """
+    Split a party into units that must sit side by side: each adult with
+    the children they guard. Infants ride on their guardian's lap, so they
+    take no seat but count against the unit (one infant per seat block).
+
+    party: [{'ref': 'A1', 'passenger_type': 'adult', 'guardian': None}, ...]
+    Returns [{'seated': [guardian ref, child refs...], 'infants': [refs]}]
+    """
+    units = {}
+    for member in party:
+        if member['passenger_type'] == 'adult':
+            units[member['ref']] = {'seated': [member['ref']], 'infants': []}
+
+    for member in party:
+        if member['passenger_type'] == 'adult':
+            continue
+        unit = units.get(member.get('guardian'))
+        if unit is None:
+            raise ValueError(f"Passenger {member['ref']} needs an adult guardian in the party.")
+        if member['passenger_type'] == 'infant':
+            unit['infants'].append(member['ref'])
+        else:
+            unit['seated'].append(member['ref'])
+
+    return list(units.values())
+
+
+# ---------------------- SEAT GRID ----------------------
+
+def _free_rows(flight_class, now):
+    """Free seats of the class laid out by seat_grid()."""
+    layouts = list(
+        SeatMapSection.objects
+        .filter(template__aircraft_id=flight_class.scheduled_flight.aircraft_id,
+                template__is_active=True, class_name=flight_class.name)
+        .values_list('seat_letters', flat=True)
+    )
+    free = (
+        FlightSeat.objects
+        .filter(flight_class=flight_class, is_booked=False)
+        .filter(Q(held_until__isnull=True) | Q(held_until__lte=now))
+        .values_list('id', 'seat_number')
+    )
+    return seat_grid(free, merge_letters(layouts) if layouts else None)
+
+
+def seat_grid(free_seats, letters=None):
+    """
+    Free seats [(seat id, seat number)] as {row: [block, block, ...]}, each
+    block the seats between two aisles in letter order, None where a seat
+    is taken. Without the template's letters there is one block per row.
+    """
+    free = {}
+    for seat_id, seat_number in free_seats:
+        match = SEAT_NUMBER.match(seat_number)
+        if match:
+            free[(int(match.group(1)), match.group(2))] = (seat_id, seat_number)
+
+    if letters is None:
+        letters = ''.join(sorted({letter for _, letter in free}))
+
+    blocks = letters.split('-')
+    rows = sorted({row for row, _ in free})
+    return {
+        row: [[free.get((row, letter)) for letter in block] for block in blocks]
+        for row in rows
+    }
+
+
+def take_seats(rows, seats):
+    """Mark seats as taken in a seat_grid()"""
+    for seat in seats:
+        for block in rows.get(int(SEAT_NUMBER.match(seat[1]).group(1)), ()):
+            if seat in block:
+                block[block.index(seat)] = None
+
+
+def _segments(rows, row_numbers, across_aisles):
+    """Runs of consecutive free seats: (row, block index, [seats])."""
+    segments = []
+    for row in row_numbers:
+        blocks = rows[row]
+        if across_aisles:
+            blocks = [[seat for block in blocks for seat in block]]
+        for index, block in enumerate(blocks):
+            run = []
+            for seat in block + [None]:
+                if seat is not None:
+                    run.append(seat)
+                elif run:
+                    segments.append((row, index, run))
+                    run = []
+    return segments
+
+
+def _pack(units, segments):
+    """
+    Place units into segments, keeping each unit contiguous and the party in
+    as few segments as possible. Returns ({ref: seat}, segments used) or None.
+    """
+    remaining = [len(seats) for _, _, seats in segments]
+    infants = {}
+    used = set()
+    placement = {}
+
+    for unit in sorted(units, key=lambda u: len(u['seated']), reverse=True):
+        size = len(unit['seated'])
+        best = None
+        for i, (row, block, seats) in enumerate(segments):
+            if remaining[i] < size:
+                continue
+            if unit['infants'] and infants.get((row, block), 0) + len(unit['infants']) > 1:
+                continue
+            # Prefer joining the party, then the roomiest segment
+            key = (i in used, remaining[i] if i not in used else -remaining[i])
+            if best is None or key > best[0]:
+                best = (key, i)
+        if best is None:
+            return None
+
+        i = best[1]
+        row, block, seats = segments[i]
+        start = len(seats) - remaining[i]
+        for ref, seat in zip(unit['seated'], seats[start:start + size]):
+            placement[ref] = seat
+        remaining[i] -= size
+        used.add(i)
+        if unit['infants']:
+            infants[(row, block)] = infants.get((row, block), 0) + len(unit['infants'])
+
+    return placement, len(used)
+
+
+def find_seats(rows, units):
+    """
+    Best placement for the party: the fewest consecutive rows, then the
+    fewest separate runs of seats, then the frontmost rows. Aisles split
+    runs unless no placement exists otherwise.
+    """
+    needed = sum(len(unit['seated']) for unit in units)
+    row_numbers = sorted(rows)
+    free_per_row = [
+        sum(seat is not None for block in rows[row] for seat in block) for row in row_numbers
+    ]
+
+    for across_aisles in (False, True):
+        best = None
+        for start in range(len(row_numbers)):
+            capacity = 0
+            for end in range(start, len(row_numbers)):
+                if best is not None and end - start + 1 > best[0][0]:
+                    break
+                capacity += free_per_row[end]
+                if capacity < needed:
+                    continue
+                packed = _pack(units, _segments(rows, row_numbers[start:end + 1], across_aisles))
+                if packed is None:
+                    continue
+                placement, runs = packed
+                key = (end - start + 1, runs, start)
+                if best is None or key < best[0]:
+                    best = (key, placement)
+                break
+            if best is not None and best[0][:2] == (1, 1):
+                break
+        if best is not None:
+            return best[1]
+    return None
+
+
+# ---------------------- HOLDS ----------------------
+
+def hold_seats(seat_ids, minutes=HOLD_MINUTES, token=None):
+    """
+    Hold all of seat_ids or none of them. A single conditional UPDATE
+    takes the seats, so concurrent holders cannot both win a seat.
+    Returns (token, held_until) or None if any seat was no longer free.
+    """
+    now = timezone.now()
+    token = token or secrets.token_hex(16)
+    held_until = now + timedelta(minutes=minutes)
+
+    with transaction.atomic():
+        updated = (
+            FlightSeat.objects
+            .filter(pk__in=seat_ids, is_booked=False)
+            .filter(Q(held_until__isnull=True) | Q(held_until__lte=now) | Q(hold_token=token))
+            .update(held_until=held_until, hold_token=token)
+        )
+        if updated != len(seat_ids):
+            transaction.set_rollback(True)
+            return None
+    return token, held_until
+
+
+def release_hold(token):
+    """Free the unbooked seats held under token."""
+    seats = FlightSeat.objects.filter(hold_token=token, is_booked=False)
+    schedule_ids = set(seats.values_list('flight_class__scheduled_flight_id', flat=True))
+    released = seats.update(held_until=None, hold_token='')
+    invalidate_seat_maps(schedule_ids)
+    return released
+
+
+def allocate_group(flight_class, party, hold_minutes=HOLD_MINUTES):
+    """
+    Find seats for the party in flight_class and hold them.
+
+    Returns {'hold_token', 'held_until', 'seats': [{'ref', 'seat_id',
+    'seat_number', 'guardian'}]}; infants have no seat and name the guardian
+    whose lap they sit on. Raises SeatAllocationError if the party does not
+    fit, ValueError if a child or infant has no adult guardian in the party.
+    """
+    if not isinstance(flight_class, FlightClass):
+        flight_class = FlightClass.objects.select_related('scheduled_flight').get(pk=flight_class)
+    units = family_units(party)
+
+    for _ in range(MAX_ATTEMPTS):
+        placement = find_seats(_free_rows(flight_class, timezone.now()), units)
+        if placement is None:
+            raise SeatAllocationError("Not enough free seats to seat this party together.")
+
+        held = hold_seats([seat_id for seat_id, _ in placement.values()], minutes=hold_minutes)
+        if held is None:
+            continue
+
+        invalidate_seat_maps([flight_class.scheduled_flight_id])
+        token, held_until = held
+        seats = []
+        for unit in units:
+            guardian = unit['seated'][0]
+            for ref in unit['seated']:
+                seat_id, seat_number = placement[ref]
+                seats.append({'ref': ref, 'seat_id': seat_id, 'seat_number': seat_number,
+                              'guardian': None if ref == guardian else guardian})
+            for ref in unit['infants']:
+                seats.append({'ref': ref, 'seat_id': None, 'seat_number': None, 'guardian': guardian})
+        return {'hold_token': token, 'held_until': held_until, 'seats': seats}
+
+    raise SeatAllocationError("Seats were taken while allocating; please try again.")
@@ -0,0 +1,91 @@
+"""Synthetic flight data for the bench_* commands. Run inside a rolled-back transaction."""
+from datetime import date, time, timedelta
+from decimal import Decimal
+
+from apps.common.models import ServiceProvider, User
+from apps.flights.models import (
+    Aircraft, Airport, FareType, FlightClass, FlightClassFare, FlightLeg, FlightRoute,
+    FlightSchedule, SeatMapSection, SeatMapTemplate
+)
+from apps.flights.seatmaps import materialise_seat_maps
+
+
+class Rollback(Exception):
+    pass
+
+
+def create_airline(code='BN'):
+    owner = User.objects.create_user(
+        f"bench-{code}@example.com", None, first_name='Bench', phone_number=f"bench-{code}"
+    )
+    return ServiceProvider.objects.create(
+        owner=owner, name=f"Bench {code}", code=code, provider_type='flight',
+        country='India', gstin_number='0000000000',
+    )
+
+
+def create_airports(count):
+    return Airport.objects.bulk_create(
+        Airport(name=f"Bench {i}", code=f"Z{i:05d}", city=f"City {i}", country='IND',
+                latitude=Decimal('0'), longitude=Decimal('0'))
+        for i in range(count)
+    )
+
+
+def create_fare_types():
+    return (
+        FareType.objects.create(name='Bench Saver', baggage_allowance_kg=15),
+        FareType.objects.create(name='Bench Flexi', is_refundable=True, seat_selection=True,
+                                meal_included=True, baggage_allowance_kg=25),
+    )
+
+
+def create_aircraft(airline, fare_types, count=1):
+    """A320-style aircraft: 12 business (AC-DF, rows 1-3), 168 economy (ABC-DEF)."""
+    saver, flexi = fare_types
+    fleet = []
+    for _ in range(count):
+        aircraft = Aircraft.objects.create(airline=airline, total_seats=180,
+                                           economy_seats=168, business_seats=12)
+        template = SeatMapTemplate.objects.create(aircraft=aircraft, name='A320 12J 168Y')
+        SeatMapSection.objects.bulk_create([
+            SeatMapSection(template=template, class_name='Business', first_row=1, last_row=3,
+                           seat_letters='AC-DF', default_fare_type=flexi),
+            SeatMapSection(template=template, class_name='Economy', first_row=4, last_row=32,
+                           seat_letters='ABC-DEF', skipped_rows='13', default_fare_type=saver),
+        ])
+        fleet.append(aircraft)
+    return fleet
+
+
+def create_leg(airline, origin, destination, number, departure=time(6), arrival=time(8)):
+    route = FlightRoute.objects.create(airline=airline, flight_number=number, origin=origin,
+                                       destination=destination, is_direct=True)
+    return FlightLeg.objects.create(route=route, stop_order=1, origin=origin, destination=destination,
+                                    departure_time=departure, arrival_time=arrival)
+
+
+def create_schedules(leg, aircraft, fare_types, days, start=None, seats=True):
+    """One schedule per day with Business and Economy classes, both fare types and (optionally) seats."""
+    start = start or date.today() + timedelta(days=1)
+    saver, flexi = fare_types
+    schedules = FlightSchedule.objects.bulk_create(
+        FlightSchedule(flight_leg=leg, flight_date=start + timedelta(days=i), aircraft=aircraft,
+                       departure_time=leg.departure_time, arrival_time=leg.arrival_time)
+        for i in range(days)
+    )
+    classes = FlightClass.objects.bulk_create(
+        FlightClass(scheduled_flight=schedule, name=name, capacity=capacity)
+        for schedule in schedules
+        for name, capacity in (('Business', 12), ('Economy', 168))
+    )
+    prices = {'Business': (Decimal('15000.00'), Decimal('18000.00')),
+              'Economy': (Decimal('4000.00'), Decimal('5500.00'))}
+    FlightClassFare.objects.bulk_create(
+        FlightClassFare(flight_class=flight_class, fare_type=fare_type, price=price)
+        for flight_class in classes
+        for fare_type, price in zip((saver, flexi), prices[flight_class.name])
+    )
+    if seats:
+        materialise_seat_maps([schedule.pk for schedule in schedules])
+    return schedules
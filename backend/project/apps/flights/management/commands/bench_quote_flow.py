@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from apps.flights.allocation import allocate_group
+from apps.flights.models import FlightClass
+from apps.flights.quotes import book_quote, create_quote, get_quote
+
+from ._benchdata import (
+    Rollback, create_aircraft, create_airline, create_airports, create_fare_types,
+    create_leg, create_schedules
+)
+
+
+class Command(BaseCommand):
+    help = "Count the queries of the quote -> review -> hold -> book flow"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--segments', type=int, default=3)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options['segments'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, segment_count):
+        airline = create_airline()
+        airports = create_airports(segment_count + 1)
+        fare_types = create_fare_types()
+        aircraft = create_aircraft(airline, fare_types, count=segment_count)
+
+        classes = []
+        for i in range(segment_count):
+            leg = create_leg(airline, airports[i], airports[i + 1], f"BN{100 + i}")
+            schedule = create_schedules(leg, aircraft[i], fare_types, days=1)[0]
+            classes.append(FlightClass.objects.get(scheduled_flight=schedule, name='Economy'))
+
+        party = [
+            {'ref': 'A1', 'passenger_type': 'adult', 'guardian': None},
+            {'ref': 'A2', 'passenger_type': 'adult', 'guardian': None},
+            {'ref': 'C1', 'passenger_type': 'child', 'guardian': 'A1'},
+            {'ref': 'I1', 'passenger_type': 'infant', 'guardian': 'A2'},
+        ]
+        segments = [{'flight_class': c.pk, 'fare_type': fare_types[0].pk} for c in classes]
+        passengers = {'adult': 2, 'child': 1, 'infant': 1}
+
+        steps = []
+        with CaptureQueriesContext(connection) as queries:
+            quote = create_quote(segments, passengers)
+        steps.append(('quote', len(queries)))
+
+        with CaptureQueriesContext(connection) as queries:
+            get_quote(quote['quote_id'])
+        steps.append(('review', len(queries)))
+
+        tokens = []
+        with CaptureQueriesContext(connection) as queries:
+            for flight_class in classes:
+                tokens.append(allocate_group(flight_class.pk, party)['hold_token'])
+        steps.append((f"hold seats ({segment_count} classes)", len(queries)))
+
+        with CaptureQueriesContext(connection) as queries:
+            book_quote(quote['quote_id'], tokens)
+        steps.append(('book', len(queries)))
+
+        self.stdout.write(f"{segment_count} segments, total {quote['total']} {quote['currency']}")
+        for label, count in steps:
+            self.stdout.write(f"{label:>28}: {count} queries")
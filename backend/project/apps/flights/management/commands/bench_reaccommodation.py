@@ -0,0 +1,76 @@
+import time
+from datetime import time as clock
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from apps.flights.models import FlightSchedule, FlightSeat, Passenger
+from apps.flights.reaccommodation import reaccommodate
+
+from ._benchdata import (
+    Rollback, create_aircraft, create_airline, create_airports, create_fare_types,
+    create_leg, create_schedules
+)
+
+
+class Command(BaseCommand):
+    help = "Re-accommodate a full cancelled flight onto two direct flights and a connection (rolled back)"
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run()
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self):
+        airline = create_airline()
+        origin, destination, hub = create_airports(3)
+        fare_types = create_fare_types()
+        fleet = create_aircraft(airline, fare_types, count=5)
+
+        cancelled = create_schedules(create_leg(airline, origin, destination, 'BN500'), fleet[0], fare_types, days=1)[0]
+        for aircraft, number in ((fleet[1], 'BN504'), (fleet[2], 'BN506')):
+            create_schedules(create_leg(airline, origin, destination, number, clock(9), clock(11)),
+                             aircraft, fare_types, days=1)
+        create_schedules(create_leg(airline, origin, hub, 'BN600', clock(7), clock(8)), fleet[3], fare_types, days=1)
+        create_schedules(create_leg(airline, hub, destination, 'BN602', clock(10), clock(11)), fleet[4], fare_types, days=1)
+
+        # Full cancelled flight: families of two adults and a child, others travelling alone
+        seats = list(FlightSeat.objects.filter(flight_class__scheduled_flight=cancelled).order_by('id'))
+        passengers = Passenger.objects.bulk_create(
+            Passenger(first_name=f"P{i}", last_name='Bench', passenger_type='child' if i % 9 == 2 else 'adult')
+            for i in range(len(seats))
+        )
+        for i, passenger in enumerate(passengers):
+            if passenger.passenger_type == 'child':
+                passenger.guardian = passengers[i - 2]
+        Passenger.objects.bulk_update(passengers, ['guardian'])
+        for seat, passenger in zip(seats, passengers):
+            seat.is_booked, seat.passenger = True, passenger
+        FlightSeat.objects.bulk_update(seats, ['is_booked', 'passenger'])
+
+        # The other direct flights are half full
+        for schedule in FlightSchedule.objects.filter(flight_leg__route__flight_number__in=['BN504', 'BN506']):
+            FlightSeat.objects.filter(flight_class__scheduled_flight=schedule, pk__in=FlightSeat.objects
+                                      .filter(flight_class__scheduled_flight=schedule)
+                                      .values('pk')[:90]).update(is_booked=True)
+        FlightSchedule.objects.filter(pk=cancelled.pk).update(status='cancelled')
+
+        start = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            result = reaccommodate(cancelled.pk)
+        elapsed = time.perf_counter() - start
+
+        via = {}
+        for entry in result['moved']:
+            route = ' + '.join(leg['flight_number'] for leg in entry['to'])
+            via[route] = via.get(route, 0) + 1
+        self.stdout.write(
+            f"{len(seats)} passengers: {len(result['moved'])} moved, {len(result['unplaced'])} unplaced "
+            f"in {elapsed:.2f}s, {len(queries)} queries"
+        )
+        for route, count in sorted(via.items()):
+            self.stdout.write(f"{route:>16}: {count}")
@@ -0,0 +1,69 @@
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.flights.models import FareLadderStep, FlightClass, FlightClassFare
+from apps.flights.repricing import reprice_fares, upcoming_classes
+from apps.flights.seatmaps import _insert_seats
+
+from ._benchdata import (
+    Rollback, create_aircraft, create_airline, create_airports, create_fare_types,
+    create_leg, create_schedules
+)
+
+
+LADDER = ((Decimal('0'), Decimal('1.000')), (Decimal('0.5'), Decimal('1.150')),
+          (Decimal('0.75'), Decimal('1.300')), (Decimal('0.9'), Decimal('1.600')))
+
+
+class Command(BaseCommand):
+    help = "Time reprice_fares() over synthetic upcoming flights (rolled back)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--classes', type=int, default=20000)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options['classes'], random.Random(options['seed']))
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, class_count, rng):
+        airline = create_airline()
+        origin, destination = create_airports(2)
+        fare_types = create_fare_types()
+        aircraft = create_aircraft(airline, fare_types)[0]
+        leg = create_leg(airline, origin, destination, 'BN900')
+
+        self.stdout.write(f"Creating {class_count} classes...")
+        create_schedules(leg, aircraft, fare_types, days=class_count // 2, seats=False)
+        FareLadderStep.objects.bulk_create(
+            FareLadderStep(fare_type=fare_type, min_load_factor=load, multiplier=multiplier)
+            for fare_type in fare_types for load, multiplier in LADDER
+        )
+
+        # Booked seats only; load factors spread over the whole ladder
+        fare_of_class = dict(
+            FlightClassFare.objects.filter(fare_type=fare_types[0]).values_list('flight_class_id', 'id')
+        )
+        seats = []
+        for class_id, capacity in FlightClass.objects.values_list('id', 'capacity'):
+            booked = rng.randint(0, capacity // 4) * 4 if rng.random() < 0.6 else 0
+            seats.extend((class_id, fare_of_class[class_id], f"{n}X", True, '') for n in range(booked))
+        _insert_seats(seats)
+        self.stdout.write(f"{len(seats)} booked seats")
+
+        classes = upcoming_classes()
+        for label in ('first run', 'second run'):
+            start = time.perf_counter()
+            result = reprice_fares(classes)
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f"{label:>10}: {result['fares']} fares, {result['changed']} changed in {elapsed:.2f}s"
+            )
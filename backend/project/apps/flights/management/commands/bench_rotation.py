@@ -0,0 +1,77 @@
+import random
+import time
+from datetime import date, datetime, time as clock, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.flights.models import FlightSchedule
+from apps.flights.rotation import Block, RotationIndex
+
+from ._benchdata import (
+    Rollback, create_aircraft, create_airline, create_airports, create_fare_types, create_leg
+)
+
+
+class Command(BaseCommand):
+    help = "Time fleet-wide rotation validation and conflict checks (rolled back)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--aircraft', type=int, default=100)
+        parser.add_argument('--days', type=int, default=7)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options['aircraft'], options['days'], random.Random(options['seed']))
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, aircraft_count, days, rng):
+        airline = create_airline()
+        base, *outstations = create_airports(6)
+        fleet = create_aircraft(airline, create_fare_types(), count=aircraft_count)
+        legs = {}
+        for i, airport in enumerate(outstations):
+            legs[airport] = (
+                create_leg(airline, base, airport, f"BN{2 * i}", clock(6), clock(8)),
+                create_leg(airline, airport, base, f"BN{2 * i + 1}", clock(9), clock(11)),
+            )
+
+        # Each aircraft flies three out-and-back rotations from base a day
+        start = date.today() + timedelta(days=1)
+        schedules = []
+        for aircraft in fleet:
+            for day in range(days):
+                flight_date = start + timedelta(days=day)
+                departure = datetime.combine(flight_date, clock(5, rng.randrange(0, 60, 5)))
+                for _ in range(3):
+                    out, back = legs[rng.choice(outstations)]
+                    for leg in (out, back):
+                        arrival = departure + timedelta(minutes=rng.randrange(60, 150, 5))
+                        schedules.append(FlightSchedule(
+                            flight_leg=leg, flight_date=departure.date(), aircraft=aircraft,
+                            departure_time=departure.time(), arrival_time=arrival.time(),
+                        ))
+                        departure = arrival + timedelta(minutes=rng.randrange(30, 70, 5))
+        FlightSchedule.objects.bulk_create(schedules, batch_size=2000)
+
+        began = time.perf_counter()
+        index = RotationIndex.load(start, start + timedelta(days=days - 1))
+        loaded = time.perf_counter()
+        problems = index.validate()
+        validated = time.perf_counter()
+
+        checks = 10000
+        ids = [aircraft.pk for aircraft in fleet]
+        for _ in range(checks):
+            departure = datetime.combine(start + timedelta(days=rng.randrange(days)), clock(rng.randrange(24)))
+            index.conflicts(rng.choice(ids), Block(departure, departure + timedelta(hours=2), None, base.pk, base.pk))
+        checked = time.perf_counter()
+
+        self.stdout.write(f"{len(schedules)} flights, {len(fleet)} aircraft, {days} days")
+        self.stdout.write(f"  load      {(loaded - began) * 1000:7.1f}ms")
+        self.stdout.write(f"  validate  {(validated - loaded) * 1000:7.1f}ms  ({len(problems)} problems)")
+        self.stdout.write(f"  {checks} conflict checks {(checked - validated) * 1000:7.1f}ms")
@@ -0,0 +1,58 @@
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.common.serializers import compile_serializer
+from apps.flights.models import Airport
+from apps.flights.serializers import AirportSerializer
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Compare ModelSerializer and compiled serializer throughput on Airports"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options['rows'], options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, rows, repeat):
+        Airport.objects.bulk_create(
+            Airport(
+                name=f"Airport {i}", code=f"B{i:07d}", city=f"City {i % 500}",
+                country='IND', latitude=Decimal('12.971599'), longitude=Decimal('77.594566'),
+                is_international=bool(i % 2),
+            )
+            for i in range(rows)
+        )
+        queryset = Airport.objects.filter(code__startswith='B').order_by('id')
+        compiled = compile_serializer(AirportSerializer)
+
+        results = {}
+        for label, serialize in [
+            ('ModelSerializer', lambda: AirportSerializer(queryset, many=True).data),
+            ('compiled', lambda: compiled.serialize(queryset)),
+        ]:
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                data = serialize()
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            results[label] = data
+            self.stdout.write(f"{label:>16}: {rows / best:,.0f} rows/s ({best * 1000:.1f} ms)")
+
+        same = [dict(row) for row in results['ModelSerializer']] == results['compiled']
+        self.stdout.write(f"identical output: {same}")
@@ -0,0 +1,36 @@
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+
+from apps.flights.rotation import RotationIndex
+
+
+class Command(BaseCommand):
+    help = "Report aircraft turnaround conflicts and positioning gaps for a date range"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date-from', type=date.fromisoformat, default=date.today())
+        parser.add_argument('--days', type=int, default=7)
+
+    def handle(self, *args, **options):
+        date_from = options['date_from']
+        date_to = date_from + timedelta(days=options['days'] - 1)
+
+        start = time.perf_counter()
+        index = RotationIndex.load(date_from, date_to)
+        problems = index.validate()
+        elapsed = time.perf_counter() - start
+
+        for problem in problems:
+            flights = ' -> '.join(
+                f"{flight['schedule']} ({flight['departure']} - {flight['arrival']})" for flight in problem['flights']
+            )
+            detail = f", {problem['ground_minutes']} of {problem['required_minutes']} min" if 'ground_minutes' in problem else ''
+            self.stdout.write(f"aircraft {problem['aircraft']}: {problem['type']}{detail}: {flights}")
+
+        flights = sum(len(blocks) for blocks in index.blocks.values())
+        self.stdout.write(
+            f"{flights} flights of {len(index.blocks)} aircraft checked, "
+            f"{len(problems)} problems in {elapsed * 1000:.0f}ms"
+        )
@@ -0,0 +1,26 @@
+import sys
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from apps.flights.manifest import OUTPUTS, render_manifest
+from apps.flights.models import FlightSchedule
+
+
+class Command(BaseCommand):
+    help = "Stream the passenger manifests of every departure on a date"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=date.fromisoformat, default=date.today())
+        parser.add_argument('--output', choices=list(OUTPUTS), default='csv')
+        parser.add_argument('--file', help="Write to this file instead of stdout")
+
+    def handle(self, *args, **options):
+        schedules = FlightSchedule.objects.filter(flight_date=options['date'], is_active=True).values('pk')
+        out = open(options['file'], 'w', newline='') if options['file'] else sys.stdout
+        try:
+            for chunk in render_manifest(schedules, options['output']):
+                out.write(chunk)
+        finally:
+            if options['file']:
+                out.close()
@@ -0,0 +1,32 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from apps.flights.models import FlightSchedule
+from apps.flights.seatmaps import materialise_seat_maps
+
+
+class Command(BaseCommand):
+    help = "Create FlightSeat rows from seat map templates for schedules in a date range"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date-from', type=date.fromisoformat, default=date.today())
+        parser.add_argument('--date-to', type=date.fromisoformat, required=True)
+
+    def handle(self, *args, **options):
+        schedules = FlightSchedule.objects.filter(
+            is_active=True,
+            flight_date__gte=options['date_from'],
+            flight_date__lte=options['date_to'],
+        )
+
+        start = time.perf_counter()
+        result = materialise_seat_maps(schedules)
+        elapsed = time.perf_counter() - start
+
+        for schedule_id, class_name, reason in result['skipped']:
+            self.stderr.write(f"schedule {schedule_id} {class_name or ''}: {reason}")
+        self.stdout.write(
+            f"{result['seats']} seats for {result['schedules']} schedules in {elapsed:.2f}s"
+        )
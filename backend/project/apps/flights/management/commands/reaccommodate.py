@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.flights.models import FlightSchedule
+from apps.flights.reaccommodation import (
+    MIN_CONNECTION_MINUTES, WINDOW_DAYS, ReaccommodationError, reaccommodate
+)
+
+
+class Command(BaseCommand):
+    help = "Move the passengers of a cancelled flight schedule onto alternative flights"
+
+    def add_arguments(self, parser):
+        parser.add_argument('schedule_id', type=int)
+        parser.add_argument('--window-days', type=int, default=WINDOW_DAYS)
+        parser.add_argument('--min-connection', type=int, default=MIN_CONNECTION_MINUTES,
+                            help="Minimum connection time in minutes")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            result = reaccommodate(options['schedule_id'], options['window_days'], options['min_connection'])
+        except FlightSchedule.DoesNotExist:
+            raise CommandError(f"Schedule {options['schedule_id']} does not exist.")
+        except ReaccommodationError as exc:
+            raise CommandError(str(exc))
+        elapsed = time.perf_counter() - start
+
+        for entry in result['unplaced']:
+            self.stderr.write(f"unplaced: passenger {entry['passenger']} seat {entry['seat']} ({entry['class_name']})")
+        self.stdout.write(
+            f"{len(result['moved'])} moved, {len(result['unplaced'])} unplaced in {elapsed:.2f}s"
+        )
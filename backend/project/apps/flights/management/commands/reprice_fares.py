@@ -0,0 +1,27 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from apps.flights.repricing import REPRICE_BATCH_SIZE, reprice_fares, upcoming_classes
+
+
+class Command(BaseCommand):
+    help = "Reprice fares of upcoming flights from their load factor and fare ladders"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date-from', type=date.fromisoformat, default=date.today())
+        parser.add_argument('--batch-size', type=int, default=REPRICE_BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help="Count the changes without writing them")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        result = reprice_fares(
+            upcoming_classes(options['date_from']),
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+        )
+        elapsed = time.perf_counter() - start
+
+        verb = "would change" if options['dry_run'] else "changed"
+        self.stdout.write(f"{result['fares']} fares checked, {verb} {result['changed']} in {elapsed:.2f}s")
@@ -0,0 +1,131 @@
+import csv
+import heapq
+
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import FlightSeat, Passenger
+
+
+MANIFEST_CHUNK_SIZE = 2000
+
+# Rows per chunk handed to the response; keeps writes large and memory flat
+LINES_PER_CHUNK = 500
+
+MANIFEST_COLUMNS = (
+    'schedule', 'flight_number', 'flight_date', 'departure_time', 'origin', 'destination',
+    'class_name', 'seat_number', 'passenger', 'passenger_type', 'first_name', 'last_name',
+    'guardian', 'fare_type', 'email', 'contact_number',
+)
+
+OUTPUTS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+# ---------------------- ROWS ----------------------
+
+SCHEDULE_LOOKUPS = (
+    'flight_class__scheduled_flight_id',
+    'flight_class__scheduled_flight__flight_leg__route__flight_number',
+    'flight_class__scheduled_flight__flight_date',
+    'flight_class__scheduled_flight__departure_time',
+    'flight_class__scheduled_flight__flight_leg__origin__code',
+    'flight_class__scheduled_flight__flight_leg__destination__code',
+    'flight_class__name',
+    'seat_number',
+)
+
+
+def _seated(schedules):
+    """Booked seats, ordered by schedule, class and seat."""
+    return (
+        FlightSeat.objects
+        .filter(flight_class__scheduled_flight__in=schedules, is_booked=True)
+        .order_by('flight_class__scheduled_flight_id', 'flight_class_id', 'id')
+        .values_list(
+            'flight_class__scheduled_flight_id', 'flight_class_id', 'id',
+            *SCHEDULE_LOOKUPS[1:],
+            'passenger_id', 'passenger__passenger_type', 'passenger__first_name',
+            'passenger__last_name', 'passenger__guardian_id', 'flight_class_fare__fare_type__name',
+            'passenger__email', 'passenger__contact_number',
+        )
+        .iterator(chunk_size=MANIFEST_CHUNK_SIZE)
+    )
+
+
+def _lap_infants(schedules):
+    """Infants on the lap of a booked passenger, in their guardian's seat order."""
+    return (
+        Passenger.objects
+        .filter(passenger_type='infant',
+                guardian__seats__flight_class__scheduled_flight__in=schedules,
+                guardian__seats__is_booked=True)
+        .order_by('guardian__seats__flight_class__scheduled_flight_id',
+                  'guardian__seats__flight_class_id', 'guardian__seats__id')
+        .values_list(
+            *(f"guardian__seats__{lookup}" for lookup in (
+                'flight_class__scheduled_flight_id', 'flight_class_id', 'id', *SCHEDULE_LOOKUPS[1:]
+            )),
+            'id', 'passenger_type', 'first_name', 'last_name', 'guardian_id',
+            'guardian__seats__flight_class_fare__fare_type__name', 'email', 'contact_number',
+        )
+        .iterator(chunk_size=MANIFEST_CHUNK_SIZE)
+    )
+
+
+def manifest_rows(schedules):
+    """
+    Manifest rows (tuples in MANIFEST_COLUMNS order) of the given schedules:
+    every booked seat, each lap infant straight after their guardian.
+
+    Two streamed queries merged on (schedule, class, seat), so memory stays
+    flat however many schedules and passengers there are. Uses server-side
+    cursors where the database has them.
+    """
+    seated = ((row[:3], 0, row) for row in _seated(schedules))
+    infants = ((row[:3], 1, row) for row in _lap_infants(schedules))
+    for _, _, row in heapq.merge(seated, infants, key=lambda item: item[:2]):
+        yield (row[0],) + row[3:]
+
+
+# ---------------------- RENDERING ----------------------
+
+class Echo:
+    """File-like object whose write() returns the line, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def _chunks(lines):
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= LINES_PER_CHUNK:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
+
+
+def render_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(MANIFEST_COLUMNS)
+    yield from _chunks(writer.writerow(row) for row in rows)
+
+
+def render_ndjson(rows):
+    encoder = JSONEncoder()
+    yield from _chunks(encoder.encode(dict(zip(MANIFEST_COLUMNS, row))) + '\n' for row in rows)
+
+
+RENDERERS = {
+    'csv': render_csv,
+    'ndjson': render_ndjson,
+}
+
+
+def render_manifest(schedules, output='csv'):
+    """Manifest of schedules as an iterator of text chunks in the given output format."""
+    return RENDERERS[output](manifest_rows(schedules))
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:21
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0005_alter_terminal_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='faretype',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('name'), name='flights_faretype_name_ci_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='flightclass',
+            constraint=models.UniqueConstraint(fields=('scheduled_flight', 'name'), name='flights_flightclass_schedule_name_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='flightleg',
+            constraint=models.UniqueConstraint(fields=('route', 'stop_order'), name='flights_flightleg_route_stop_order_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='flightroute',
+            constraint=models.UniqueConstraint(fields=('airline', 'flight_number'), name='flights_flightroute_airline_flight_number_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='flightseat',
+            constraint=models.UniqueConstraint(fields=('flight_class', 'seat_number'), name='flights_flightseat_class_seat_number_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='terminal',
+            constraint=models.UniqueConstraint(condition=models.Q(('code', ''), _negated=True), fields=('airport', 'code'), name='flights_terminal_airport_code_uniq'),
+        ),
+    ]
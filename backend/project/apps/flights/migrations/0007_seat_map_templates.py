@@ -0,0 +1,44 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:22
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0006_unique_constraints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeatMapTemplate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50)),
+                ('is_active', models.BooleanField(default=True)),
+                ('aircraft', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seat_maps', to='flights.aircraft')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SeatMapSection',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('class_name', models.CharField(max_length=20)),
+                ('first_row', models.PositiveIntegerField(validators=[django.core.validators.MinValueValidator(1)])),
+                ('last_row', models.PositiveIntegerField(validators=[django.core.validators.MinValueValidator(1)])),
+                ('seat_letters', models.CharField(help_text="Letters left to right, '-' marks an aisle, e.g. ABC-DEF", max_length=20, validators=[django.core.validators.RegexValidator('^[A-Z]+(-[A-Z]+)*$')])),
+                ('skipped_rows', models.CharField(blank=True, help_text='Comma separated row numbers that do not exist, e.g. 13', max_length=50)),
+                ('default_fare_type', models.ForeignKey(help_text='Fare given to the seats when the class sells it', on_delete=django.db.models.deletion.PROTECT, to='flights.faretype')),
+                ('template', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sections', to='flights.seatmaptemplate')),
+            ],
+            options={
+                'ordering': ['template', 'first_row'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='seatmaptemplate',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('aircraft',), name='flights_seatmaptemplate_one_active_uniq'),
+        ),
+    ]
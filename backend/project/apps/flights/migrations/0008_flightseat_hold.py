@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0007_seat_map_templates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='flightseat',
+            name='held_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='flightseat',
+            name='hold_token',
+            field=models.CharField(blank=True, db_index=True, max_length=32),
+        ),
+    ]
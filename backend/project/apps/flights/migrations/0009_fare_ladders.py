@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:28
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0008_flightseat_hold'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='flightclassfare',
+            name='base_price',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.CreateModel(
+            name='FareLadderStep',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('min_load_factor', models.DecimalField(decimal_places=3, help_text='Share of the class booked, 0 to 1', max_digits=4, validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(1)])),
+                ('multiplier', models.DecimalField(decimal_places=3, max_digits=5, validators=[django.core.validators.MinValueValidator(0)])),
+                ('fare_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ladder', to='flights.faretype')),
+            ],
+            options={
+                'ordering': ['fare_type', 'min_load_factor'],
+                'constraints': [models.UniqueConstraint(fields=('fare_type', 'min_load_factor'), name='flights_fareladderstep_fare_type_load_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0009_fare_ladders'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='flightseat',
+            name='passenger',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='seats', to='flights.passenger'),
+        ),
+    ]
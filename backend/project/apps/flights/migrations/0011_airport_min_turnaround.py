@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0010_flightseat_passenger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='airport',
+            name='min_turnaround_minutes',
+            field=models.PositiveIntegerField(default=45, help_text="Minimum ground time between an arrival and the same aircraft's next departure"),
+        ),
+    ]
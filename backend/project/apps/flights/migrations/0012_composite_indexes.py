@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0011_airport_min_turnaround'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='flightroute',
+            index=models.Index(fields=['origin', 'destination'], name='flights_fli_origin__f99e35_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flightschedule',
+            index=models.Index(fields=['flight_date', 'aircraft'], name='flights_fli_flight__ced8fd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flightschedule',
+            index=models.Index(fields=['flight_leg', 'flight_date'], name='flights_fli_flight__ad2ad0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flightseat',
+            index=models.Index(fields=['flight_class', 'is_booked'], name='flights_fli_flight__1c7dc6_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:40
+
+from django.db import migrations, models
+
+
+# Databases that ran 0006 before its terminal code constraint skipped blank
+# codes get the conditional constraint here; elsewhere this recreates it.
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0012_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='terminal',
+            name='flights_terminal_airport_code_uniq',
+        ),
+        migrations.AddConstraint(
+            model_name='terminal',
+            constraint=models.UniqueConstraint(condition=models.Q(('code', ''), _negated=True), fields=('airport', 'code'), name='flights_terminal_airport_code_uniq'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:32
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('flights', '0013_terminal_blank_codes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='seatmapsection',
+            name='skipped_rows',
+            field=models.CharField(blank=True, help_text='Comma separated row numbers that do not exist, e.g. 13', max_length=50, validators=[django.core.validators.RegexValidator('^\\s*\\d+(\\s*,\\s*\\d+)*\\s*$', 'Give row numbers separated by commas, e.g. 13,14')]),
+        ),
+    ]
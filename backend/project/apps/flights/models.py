@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models.functions import Lower
+from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator, RegexValidator
 
 # Service Provider Model
@@ -34,6 +36,7 @@ class Airport(models.Model):
     longitude = models.DecimalField(max_digits=9, decimal_places=6)
     is_international = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
+    min_turnaround_minutes = models.PositiveIntegerField(default=45, help_text="Minimum ground time between an arrival and the same aircraft's next departure")
 
     def __str__(self):
         return f"{self.code} - {self.name}"
@@ -48,6 +51,10 @@ class Terminal(models.Model):
     class Meta:
         unique_together = ("airport", "name")
         ordering = ["airport", "name"]
+        constraints = [
+            # Codes are optional; blank ones may repeat
+            models.UniqueConstraint(fields=["airport", "code"], condition=~models.Q(code=""), name="flights_terminal_airport_code_uniq"),
+        ]
 
     def __str__(self):
         return f"{self.airport.code} - {self.name}"
@@ -62,6 +69,14 @@ class FlightRoute(models.Model):
     operational_days = models.PositiveIntegerField(default=7)  # days in a week 0-7
     is_active = models.BooleanField(default=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["airline", "flight_number"], name="flights_flightroute_airline_flight_number_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["origin", "destination"]),
+        ]
+
     def __str__(self):
         return f"{self.airline.code} {self.flight_number}: {self.origin.code} → {self.destination.code}"
 
@@ -78,9 +93,12 @@ class FlightLeg(models.Model):
 
     class Meta:
         ordering = ["stop_order"]
+        constraints = [
+            models.UniqueConstraint(fields=["route", "stop_order"], name="flights_flightleg_route_stop_order_uniq"),
+        ]
 
     def __str__(self):
-        return f"{self.route.flight_number} Stop {self.stops_order}: {self.origin.code} → {self.destination.code}"
+        return f"{self.route.flight_number} Stop {self.stop_order}: {self.origin.code} → {self.destination.code}"
 
 
 # Which Flight is Schedule for the date
@@ -105,6 +123,12 @@ class FlightSchedule(models.Model):
 
     rescheduled_to = models.DateTimeField(blank=True, null=True,help_text="New datetime if flight is rescheduled")
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["flight_date", "aircraft"]),
+            models.Index(fields=["flight_leg", "flight_date"]),
+        ]
+
     def __str__(self):
         return f"{self.flight_leg.route.flight_number} on {self.flight_date}"
 
@@ -120,9 +144,30 @@ class FareType(models.Model):
     baggage_allowance_kg = models.PositiveIntegerField(default=0)
     extra_baggage_allowed = models.BooleanField(default=False)
     priority_boarding = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(Lower("name"), name="flights_faretype_name_ci_uniq"),
+        ]
     
     def __str__(self):
         return self.name
+
+
+# Load factor ladder per fare type: price = base price x multiplier of the highest step reached
+class FareLadderStep(models.Model):
+    fare_type = models.ForeignKey(FareType, on_delete=models.CASCADE, related_name="ladder")
+    min_load_factor = models.DecimalField(max_digits=4, decimal_places=3, validators=[MinValueValidator(0), MaxValueValidator(1)], help_text="Share of the class booked, 0 to 1")
+    multiplier = models.DecimalField(max_digits=5, decimal_places=3, validators=[MinValueValidator(0)])
+
+    class Meta:
+        ordering = ["fare_type", "min_load_factor"]
+        constraints = [
+            models.UniqueConstraint(fields=["fare_type", "min_load_factor"], name="flights_fareladderstep_fare_type_load_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.fare_type.name} >= {self.min_load_factor:.0%}: x{self.multiplier}"
     
 
 # Scheduled Flight Class (Economy, Business, Premium)
@@ -131,14 +176,23 @@ class FlightClass(models.Model):
     name = models.CharField(max_length=20)  # Economy, Business, Premium
     capacity = models.PositiveIntegerField()
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["scheduled_flight", "name"], name="flights_flightclass_schedule_name_uniq"),
+        ]
+
     def __str__(self):
-        return f"{self.schedule.flight_leg.route.flight_number} - {self.name}"
+        return f"{self.scheduled_flight.flight_leg.route.flight_number} - {self.name}"
 
 # 
 class FlightClassFare(models.Model):
     flight_class = models.ForeignKey(FlightClass, on_delete=models.CASCADE, related_name="fares")
     fare_type = models.ForeignKey(FareType, on_delete=models.CASCADE)
     price = models.DecimalField(max_digits=10, decimal_places=2)
+
+    # Price the fare ladder is applied to; the repricer sets it from price on first run,
+    # and a price saved by hand clears it (signals.fare_saving)
+    base_price = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
     
     class Meta:
         unique_together = ("flight_class", "fare_type")
@@ -154,8 +208,73 @@ class FlightSeat(models.Model):
     seat_number = models.CharField(max_length=5)
     is_booked = models.BooleanField(default=False)
 
+    # Temporary hold while a booking is completed
+    held_until = models.DateTimeField(blank=True, null=True)
+    hold_token = models.CharField(max_length=32, blank=True, db_index=True)
+
+    # Who sits here once booked
+    passenger = models.ForeignKey("Passenger", on_delete=models.SET_NULL, blank=True, null=True, related_name="seats")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["flight_class", "seat_number"], name="flights_flightseat_class_seat_number_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["flight_class", "is_booked"]),
+        ]
+
     def __str__(self):
-        return f"{self.flight_class.schedule.flight_leg.route.flight_number} - {self.seat_number} ({self.flight_class.name})"
+        return f"{self.flight_class.scheduled_flight.flight_leg.route.flight_number} - {self.seat_number} ({self.flight_class.name})"
+
+    def is_held(self, now=None):
+        return self.held_until is not None and self.held_until > (now or timezone.now())
+
+
+# Seat map layout per aircraft, used to create FlightSeat rows in bulk
+class SeatMapTemplate(models.Model):
+    aircraft = models.ForeignKey(Aircraft, on_delete=models.CASCADE, related_name="seat_maps")
+    name = models.CharField(max_length=50)  # e.g., A320 3-3 186Y
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["aircraft"], condition=models.Q(is_active=True), name="flights_seatmaptemplate_one_active_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.aircraft})"
+
+    @property
+    def seat_count(self):
+        return sum(len(section.seat_numbers()) for section in self.sections.all())
+
+
+class SeatMapSection(models.Model):
+    template = models.ForeignKey(SeatMapTemplate, on_delete=models.CASCADE, related_name="sections")
+    class_name = models.CharField(max_length=20)  # matches FlightClass.name
+    first_row = models.PositiveIntegerField(validators=[MinValueValidator(1)])
+    last_row = models.PositiveIntegerField(validators=[MinValueValidator(1)])
+    seat_letters = models.CharField(max_length=20, validators=[RegexValidator(r"^[A-Z]+(-[A-Z]+)*$")], help_text="Letters left to right, '-' marks an aisle, e.g. ABC-DEF")
+    skipped_rows = models.CharField(max_length=50, blank=True, validators=[RegexValidator(r"^\s*\d+(\s*,\s*\d+)*\s*$", "Give row numbers separated by commas, e.g. 13,14")], help_text="Comma separated row numbers that do not exist, e.g. 13")
+    default_fare_type = models.ForeignKey(FareType, on_delete=models.PROTECT, help_text="Fare given to the seats when the class sells it")
+
+    class Meta:
+        ordering = ["template", "first_row"]
+
+    def __str__(self):
+        return f"{self.template.name} {self.class_name} rows {self.first_row}-{self.last_row}"
+
+    @property
+    def rows(self):
+        skipped = {int(row) for row in self.skipped_rows.split(",") if row.strip()}
+        return [row for row in range(self.first_row, self.last_row + 1) if row not in skipped]
+
+    @property
+    def letters(self):
+        return self.seat_letters.replace("-", "")
+
+    def seat_numbers(self):
+        return [f"{row}{letter}" for row in self.rows for letter in self.letters]
 
 
 # Passenger Travelling
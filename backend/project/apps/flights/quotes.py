@@ -0,0 +1,234 @@
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Value, When
+from django.utils import timezone
+
+from .models import FlightClassFare, FlightSeat
+from .seatmaps import invalidate_seat_maps
+
+
+QUOTE_TTL = getattr(settings, 'FARE_QUOTE_TTL', 15 * 60)
+QUOTE_SALT = 'flights.quote'
+QUOTE_CACHE_PREFIX = 'quote:'
+QUOTE_USED_PREFIX = 'quote-used:'
+
+# Share of the adult fare paid per passenger type
+PASSENGER_FARE_SHARE = getattr(settings, 'FARE_PASSENGER_SHARE', {
+    'adult': Decimal('1.00'),
+    'child': Decimal('0.75'),
+    'infant': Decimal('0.10'),
+})
+
+CENT = Decimal('0.01')
+
+
+class QuoteError(Exception):
+    """The itinerary cannot be quoted or booked as requested."""
+
+
+# ---------------------- QUOTE ----------------------
+
+def _seated(passengers):
+    # Infants travel on a lap
+    return passengers.get('adult', 0) + passengers.get('child', 0)
+
+
+def price_itinerary(segments, passengers):
+    """
+    Fare breakdown for passengers ({'adult': 2, 'child': 1, 'infant': 1})
+    over segments ([{'flight_class': id, 'fare_type': id}, ...]).
+    Two queries whatever the number of segments.
+    """
+    pairs = Q()
+    for segment in segments:
+        pairs |= Q(flight_class_id=segment['flight_class'], fare_type_id=segment['fare_type'])
+
+    fares = {
+        (fare.flight_class_id, fare.fare_type_id): fare
+        for fare in FlightClassFare.objects.filter(pairs).select_related(
+            'fare_type', 'flight_class__scheduled_flight__flight_leg__route'
+        )
+    }
+    now = timezone.now()
+    free_seats = dict(
+        FlightSeat.objects
+        .filter(flight_class_id__in=[s['flight_class'] for s in segments], is_booked=False)
+        .filter(Q(held_until__isnull=True) | Q(held_until__lte=now))
+        .values('flight_class_id')
+        .annotate(free=Count('id'))
+        .values_list('flight_class_id', 'free')
+    )
+
+    seated = _seated(passengers)
+    lines_total = Decimal('0.00')
+    priced = []
+    for index, segment in enumerate(segments, start=1):
+        fare = fares.get((segment['flight_class'], segment['fare_type']))
+        if fare is None:
+            raise QuoteError(f"Segment {index}: this class does not sell the selected fare type.")
+        flight_class = fare.flight_class
+        schedule = flight_class.scheduled_flight
+        if not schedule.is_active or schedule.status == 'cancelled':
+            raise QuoteError(f"Segment {index}: flight {schedule} is not operating.")
+        if free_seats.get(flight_class.pk, 0) < seated:
+            raise QuoteError(f"Segment {index}: not enough seats left in {flight_class.name}.")
+
+        lines = []
+        segment_total = Decimal('0.00')
+        for passenger_type, count in passengers.items():
+            if not count:
+                continue
+            unit_price = (fare.price * PASSENGER_FARE_SHARE[passenger_type]).quantize(CENT)
+            amount = unit_price * count
+            segment_total += amount
+            lines.append({
+                'passenger_type': passenger_type,
+                'count': count,
+                'unit_price': f"{unit_price:f}",
+                'amount': f"{amount:f}",
+            })
+        lines_total += segment_total
+
+        priced.append({
+            'flight_class': flight_class.pk,
+            'class_name': flight_class.name,
+            'schedule': schedule.pk,
+            'flight_number': schedule.flight_leg.route.flight_number,
+            'flight_date': schedule.flight_date.isoformat(),
+            'departure_time': schedule.departure_time.isoformat(),
+            'fare': fare.pk,
+            'fare_type': fare.fare_type_id,
+            'fare_type_name': fare.fare_type.name,
+            'is_refundable': fare.fare_type.is_refundable,
+            'lines': lines,
+            'total': f"{segment_total:f}",
+        })
+
+    return {
+        'currency': 'INR',
+        'passengers': passengers,
+        'segments': priced,
+        'total': f"{lines_total:f}",
+    }
+
+
+def create_quote(segments, passengers, user=None):
+    """
+    Price the itinerary once and store the breakdown for QUOTE_TTL seconds.
+    The returned quote_id is signed and names the user who priced it, so
+    clients cannot forge, extend or share it.
+    """
+    breakdown = price_itinerary(segments, passengers)
+    key = uuid.uuid4().hex
+    breakdown['quote_id'] = signing.dumps({'key': key, 'user': getattr(user, 'pk', None)}, salt=QUOTE_SALT)
+    breakdown['expires_at'] = (timezone.now() + timedelta(seconds=QUOTE_TTL)).isoformat()
+    cache.set(QUOTE_CACHE_PREFIX + key, breakdown, QUOTE_TTL)
+    return breakdown
+
+
+def _quote_key(quote_id, user=None):
+    try:
+        payload = signing.loads(quote_id, salt=QUOTE_SALT, max_age=QUOTE_TTL)
+    except signing.BadSignature:
+        raise QuoteError("Invalid or expired quote.")
+    if not isinstance(payload, dict) or payload.get('user') != getattr(user, 'pk', None):
+        raise QuoteError("Invalid or expired quote.")
+    return payload['key']
+
+
+def get_quote(quote_id, user=None):
+    """Stored breakdown for quote_id, priced by user; no database access."""
+    breakdown = cache.get(QUOTE_CACHE_PREFIX + _quote_key(quote_id, user))
+    if breakdown is None:
+        raise QuoteError("Invalid or expired quote.")
+    return breakdown
+
+
+# ---------------------- BOOK ----------------------
+
+def book_quote(quote_id, hold_tokens, user=None, passengers=None):
+    """
+    Turn held seats into booked seats at the quoted price.
+
+    Prices are not recomputed; only seat availability is re-checked: the
+    seats held under hold_tokens must still be held and cover every
+    segment's seated passengers. passengers ({seat id: passenger id}) names
+    who sits where, written by the same UPDATE. One read and one
+    conditional UPDATE.
+
+    A quote books once: it is marked used before the seats are touched,
+    unmarked if booking fails, and dropped from the cache on commit.
+    """
+    key = _quote_key(quote_id, user)
+    breakdown = get_quote(quote_id, user)
+    seated = _seated(breakdown['passengers'])
+    now = timezone.now()
+
+    with transaction.atomic():
+        # add() is atomic, so of two concurrent bookings only one gets past
+        if not cache.add(QUOTE_USED_PREFIX + key, True, QUOTE_TTL):
+            raise QuoteError("This quote has already been booked.")
+        try:
+            seats_by_class = _book_held(breakdown, hold_tokens, seated, now, passengers or {})
+        except BaseException:
+            cache.delete(QUOTE_USED_PREFIX + key)
+            raise
+        transaction.on_commit(lambda: cache.delete(QUOTE_CACHE_PREFIX + key))
+
+    return {
+        'quote_id': quote_id,
+        'total': breakdown['total'],
+        'currency': breakdown['currency'],
+        'seats': {
+            segment['flight_class']: sorted(number for _, number in seats_by_class[segment['flight_class']])
+            for segment in breakdown['segments']
+        },
+    }
+
+
+def _book_held(breakdown, hold_tokens, seated, now, passengers):
+    """Book the seats held under hold_tokens for every segment; {class id: [(seat id, number)]}."""
+    held = list(
+        FlightSeat.objects
+        .filter(hold_token__in=hold_tokens, held_until__gt=now, is_booked=False)
+        .values_list('id', 'flight_class_id', 'seat_number')
+    )
+    seats_by_class = {}
+    for seat_id, class_id, seat_number in held:
+        seats_by_class.setdefault(class_id, []).append((seat_id, seat_number))
+
+    seat_ids = []
+    for index, segment in enumerate(breakdown['segments'], start=1):
+        seats = seats_by_class.get(segment['flight_class'], [])
+        if len(seats) != seated:
+            raise QuoteError(
+                f"Segment {index}: {seated} held seats needed, {len(seats)} still held."
+            )
+        seat_ids.extend(seat_id for seat_id, _ in seats)
+
+    if not set(passengers) <= set(seat_ids):
+        raise QuoteError("Passengers can only be seated in the seats being booked.")
+    changes = {'is_booked': True, 'held_until': None, 'hold_token': ''}
+    if passengers:
+        changes['passenger_id'] = Case(
+            *(When(pk=seat_id, then=Value(passenger_id)) for seat_id, passenger_id in passengers.items()),
+            default=F('passenger_id'),
+            output_field=FlightSeat._meta.get_field('passenger').target_field,
+        )
+    booked = (
+        FlightSeat.objects
+        .filter(pk__in=seat_ids, hold_token__in=hold_tokens, held_until__gt=now, is_booked=False)
+        .update(**changes)
+    )
+    if booked != len(seat_ids):
+        raise QuoteError("Some held seats expired while booking; please select seats again.")
+
+    schedule_ids = [segment['schedule'] for segment in breakdown['segments']]
+    transaction.on_commit(lambda: invalidate_seat_maps(schedule_ids))
+    return seats_by_class
@@ -0,0 +1,282 @@
+import secrets
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .allocation import find_seats, hold_seats, release_hold, seat_grid, take_seats
+from .models import FlightClassFare, FlightSchedule, FlightSeat, SeatMapSection
+from .seatmaps import invalidate_seat_maps, merge_letters
+
+
+# Alternatives are searched from the cancelled flight's date up to this many days later
+WINDOW_DAYS = getattr(settings, 'REACCOMMODATION_WINDOW_DAYS', 2)
+
+MIN_CONNECTION_MINUTES = getattr(settings, 'MIN_CONNECTION_MINUTES', 60)
+MAX_CONNECTIONS = 20
+
+MAX_ATTEMPTS = 3
+
+PERK_FLAGS = ('is_refundable', 'seat_selection', 'meal_included', 'extra_baggage_allowed', 'priority_boarding')
+
+
+class ReaccommodationError(Exception):
+    """The schedule cannot be re-accommodated."""
+
+
+# ---------------------- ALTERNATIVES ----------------------
+
+def _times(schedule):
+    """(departure, arrival) datetimes; arrival before departure means next day"""
+    departure = datetime.combine(schedule.flight_date, schedule.departure_time)
+    arrival = datetime.combine(schedule.flight_date, schedule.arrival_time)
+    if arrival <= departure:
+        arrival += timedelta(days=1)
+    return departure, arrival
+
+
+def alternatives(schedule, window_days=WINDOW_DAYS, min_connection=MIN_CONNECTION_MINUTES):
+    """
+    Ways to fly the cancelled schedule's leg, best first: direct flights
+    between the same airports by closeness of departure, then one-stop
+    connections by arrival time. Each option is a tuple of schedules.
+    Three queries.
+    """
+    leg = schedule.flight_leg
+    departure, _ = _times(schedule)
+    now = timezone.localtime().replace(tzinfo=None)
+    operating = (
+        FlightSchedule.objects
+        .filter(is_active=True, flight_date__gte=max(schedule.flight_date, now.date()),
+                flight_date__lte=schedule.flight_date + timedelta(days=window_days))
+        .exclude(status='cancelled')
+        .exclude(pk=schedule.pk)
+        .select_related('flight_leg__route')
+    )
+
+    direct = [
+        s for s in operating.filter(flight_leg__origin_id=leg.origin_id,
+                                    flight_leg__destination_id=leg.destination_id)
+        if _times(s)[0] > now
+    ]
+    direct.sort(key=lambda s: abs(_times(s)[0] - departure))
+
+    first_legs = [
+        s for s in operating.filter(flight_leg__origin_id=leg.origin_id)
+        .exclude(flight_leg__destination_id=leg.destination_id)
+        if _times(s)[0] > now
+    ]
+    second_legs = defaultdict(list)
+    for s in operating.filter(flight_leg__destination_id=leg.destination_id,
+                              flight_leg__origin_id__in={s.flight_leg.destination_id for s in first_legs}):
+        second_legs[s.flight_leg.origin_id].append(s)
+
+    gap = timedelta(minutes=min_connection)
+    connections = []
+    for first in first_legs:
+        arrival = _times(first)[1]
+        for second in second_legs[first.flight_leg.destination_id]:
+            if _times(second)[0] >= arrival + gap:
+                connections.append((_times(second)[1], first, second))
+    connections.sort(key=lambda c: c[0])
+
+    return [(s,) for s in direct] + [(first, second) for _, first, second in connections[:MAX_CONNECTIONS]]
+
+
+def covers(fare_type, original):
+    """fare_type offers at least the perks of original"""
+    return (
+        all(getattr(fare_type, flag) or not getattr(original, flag) for flag in PERK_FLAGS)
+        and fare_type.baggage_allowance_kg >= original.baggage_allowance_kg
+    )
+
+
+def matching_fare(fares, original):
+    """The original fare type if sold, else the cheapest fare whose perks cover it."""
+    for fare in fares:
+        if fare.fare_type_id == original.pk:
+            return fare
+    return next((fare for fare in fares if covers(fare.fare_type, original)), None)
+
+
+# ---------------------- PLANNING ----------------------
+
+def _passenger_units(seats):
+    """
+    Booked seats grouped into units that sit together: an adult with the
+    dependents seated on the same flight. Seats without a passenger move alone.
+    """
+    seated = {seat.passenger_id for seat in seats if seat.passenger_id}
+    units = {}
+    for seat in seats:
+        if seat.passenger_id is None:
+            key = ('seat', seat.pk)
+        elif seat.passenger.guardian_id in seated:
+            key = ('passenger', seat.passenger.guardian_id)
+        else:
+            key = ('passenger', seat.passenger_id)
+        units.setdefault(key, []).append(seat)
+    return sorted(units.values(), key=len, reverse=True)
+
+
+def _plan(units, options, now):
+    """
+    Assign each unit to the first option with room in the same cabin and a
+    fare covering its perks. Returns ([(unit, [(schedule, fare, seats)])], [unplaced units]).
+    """
+    schedule_ids = {s.pk for option in options for s in option}
+
+    layouts = {}
+    for aircraft_id, class_name, letters in (
+        SeatMapSection.objects
+        .filter(template__aircraft_id__in={s.aircraft_id for option in options for s in option},
+                template__is_active=True)
+        .values_list('template__aircraft_id', 'class_name', 'seat_letters')
+    ):
+        layouts.setdefault((aircraft_id, class_name), []).append(letters)
+
+    free = defaultdict(list)
+    for seat_id, schedule_id, class_name, seat_number in (
+        FlightSeat.objects
+        .filter(flight_class__scheduled_flight_id__in=schedule_ids, is_booked=False)
+        .filter(Q(held_until__isnull=True) | Q(held_until__lte=now))
+        .values_list('id', 'flight_class__scheduled_flight_id', 'flight_class__name', 'seat_number')
+    ):
+        free[(schedule_id, class_name)].append((seat_id, seat_number))
+
+    aircraft = {s.pk: s.aircraft_id for option in options for s in option}
+    grids = {}
+    for key, seats in free.items():
+        sections = layouts.get((aircraft[key[0]], key[1]))
+        grids[key] = seat_grid(seats, merge_letters(sections) if sections else None)
+
+    fares = defaultdict(list)
+    for fare in (
+        FlightClassFare.objects
+        .filter(flight_class__scheduled_flight_id__in=schedule_ids)
+        .select_related('fare_type', 'flight_class')
+        .order_by('price')
+    ):
+        fares[(fare.flight_class.scheduled_flight_id, fare.flight_class.name)].append(fare)
+
+    placed, unplaced = [], []
+    for unit in units:
+        class_name = unit[0].flight_class.name
+        original = unit[0].flight_class_fare.fare_type
+        party = [{'seated': [seat.pk for seat in unit], 'infants': []}]
+
+        for option in options:
+            legs = []
+            for schedule in option:
+                key = (schedule.pk, class_name)
+                fare = matching_fare(fares[key], original)
+                placement = find_seats(grids[key], party) if fare and key in grids else None
+                if placement is None:
+                    break
+                legs.append((schedule, fare, key, placement))
+            else:
+                for schedule, fare, key, placement in legs:
+                    take_seats(grids[key], placement.values())
+                placed.append((unit, [(schedule, fare, placement) for schedule, fare, _, placement in legs]))
+                break
+        else:
+            unplaced.append(unit)
+
+    return placed, unplaced
+
+
+# ---------------------- RE-ACCOMMODATION ----------------------
+
+def reaccommodate(schedule, window_days=WINDOW_DAYS, min_connection=MIN_CONNECTION_MINUTES):
+    """
+    Move everyone booked on a cancelled schedule to alternative flights.
+
+    Passengers keep their cabin and get a fare with at least the perks they
+    paid for; families stay seated together. All new seats are taken with
+    one hold_seats() call, so a concurrent booking makes the plan retry
+    rather than double-book, and the move itself is one transaction: the
+    new seats are booked for the passengers and the old ones released.
+
+    Returns {'schedule', 'moved': [{'passenger', 'from_seat', 'to': [{'schedule',
+    'flight_number', 'flight_date', 'seat_number', 'fare_type'}]}], 'unplaced':
+    [{'passenger', 'seat', 'class_name'}]}.
+    """
+    if not isinstance(schedule, FlightSchedule):
+        schedule = FlightSchedule.objects.select_related('flight_leg').get(pk=schedule)
+    if schedule.status != 'cancelled':
+        raise ReaccommodationError("Only cancelled flights can be re-accommodated.")
+
+    booked = list(
+        FlightSeat.objects
+        .filter(flight_class__scheduled_flight=schedule, is_booked=True)
+        .select_related('flight_class', 'flight_class_fare__fare_type', 'passenger')
+        .order_by('flight_class_id', 'id')
+    )
+    options = alternatives(schedule, window_days, min_connection)
+    units = _passenger_units(booked)
+
+    for _ in range(MAX_ATTEMPTS):
+        now = timezone.now()
+        placed, unplaced = _plan(units, options, now) if options else ([], units)
+        new_seat_ids = [
+            seat_id for _, legs in placed for _, _, placement in legs
+            for seat_id, _ in placement.values()
+        ]
+        token = secrets.token_hex(16)
+        if not new_seat_ids or hold_seats(new_seat_ids, token=token) is not None:
+            break
+    else:
+        raise ReaccommodationError("Seats kept changing while re-accommodating; please try again.")
+
+    moved = {}
+    moved_seats = []
+    for unit, legs in placed:
+        for seat in unit:
+            moved[seat.pk] = {'passenger': seat.passenger_id, 'from_seat': seat.seat_number, 'to': []}
+        for schedule_to, fare, placement in legs:
+            for old_id, (seat_id, seat_number) in placement.items():
+                moved_seats.append(FlightSeat(
+                    pk=seat_id, is_booked=True, passenger_id=moved[old_id]['passenger'],
+                    flight_class_fare_id=fare.pk, held_until=None, hold_token='',
+                ))
+                moved[old_id]['to'].append({
+                    'schedule': schedule_to.pk,
+                    'flight_number': schedule_to.flight_leg.route.flight_number,
+                    'flight_date': schedule_to.flight_date.isoformat(),
+                    'seat_number': seat_number,
+                    'fare_type': fare.fare_type.name,
+                })
+
+    try:
+        with transaction.atomic():
+            if moved_seats:
+                # Locked until commit, so an expiring hold cannot be taken in between
+                still_held = len(
+                    FlightSeat.objects.select_for_update()
+                    .filter(pk__in=new_seat_ids, hold_token=token, held_until__gt=timezone.now(), is_booked=False)
+                    .values_list('pk', flat=True)
+                )
+                if still_held != len(new_seat_ids):
+                    raise ReaccommodationError("Seat holds expired while re-accommodating; please try again.")
+                FlightSeat.objects.bulk_update(
+                    moved_seats, ['is_booked', 'passenger', 'flight_class_fare', 'held_until', 'hold_token']
+                )
+                FlightSeat.objects.filter(pk__in=moved).update(is_booked=False, passenger=None)
+            touched = {schedule.pk} | {s.pk for _, legs in placed for s, _, _ in legs}
+            transaction.on_commit(lambda: invalidate_seat_maps(touched))
+    except ReaccommodationError:
+        # Outside the rolled-back transaction, so the seats still held go back on sale
+        release_hold(token)
+        raise
+
+    return {
+        'schedule': schedule.pk,
+        'moved': list(moved.values()),
+        'unplaced': [
+            {'passenger': seat.passenger_id, 'seat': seat.seat_number, 'class_name': seat.flight_class.name}
+            for unit in unplaced for seat in unit
+        ],
+    }
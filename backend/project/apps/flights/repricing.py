@@ -0,0 +1,135 @@
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count
+
+from .models import FareLadderStep, FlightClass, FlightClassFare, FlightSeat
+from .seatmaps import invalidate_seat_maps
+from .signals import fares_repriced
+
+
+REPRICE_BATCH_SIZE = 2000
+
+CENT = Decimal('0.01')
+
+
+# ---------------------- LADDERS ----------------------
+
+def load_ladders():
+    """fare type id -> [(min load factor, multiplier)], highest step first"""
+    ladders = {}
+    for fare_type_id, min_load_factor, multiplier in (
+        FareLadderStep.objects
+        .order_by('fare_type_id', '-min_load_factor')
+        .values_list('fare_type_id', 'min_load_factor', 'multiplier')
+    ):
+        ladders.setdefault(fare_type_id, []).append((min_load_factor, multiplier))
+    return ladders
+
+
+def ladder_price(base_price, load_factor, steps):
+    """base_price x the multiplier of the highest step load_factor reaches"""
+    for min_load_factor, multiplier in steps:
+        if load_factor >= min_load_factor:
+            return (base_price * multiplier).quantize(CENT)
+    return base_price
+
+
+# ---------------------- REPRICER ----------------------
+
+def upcoming_classes(today=None):
+    """Classes of schedules still to fly and selling"""
+    return FlightClass.objects.filter(
+        scheduled_flight__flight_date__gte=today or date.today(),
+        scheduled_flight__is_active=True,
+    ).exclude(scheduled_flight__status='cancelled')
+
+
+def reprice_fares(classes=None, batch_size=REPRICE_BATCH_SIZE, dry_run=False):
+    """
+    Reprice every FlightClassFare of classes (default: upcoming_classes())
+    from the booked share of its class and its fare type's ladder.
+
+    Load factors come from one GROUP BY over the booked seats, fares are
+    streamed in one query, and only fares whose price moves are written,
+    batch_size at a time with bulk_update(). Fare types without ladder
+    steps are left alone. A fare's base_price is filled from its current
+    price the first time it changes, so repeated runs do not compound; a
+    price saved by hand clears it, so the next run builds on that price.
+
+    After each batch commits, fares_repriced is sent with the changes:
+    [{'fare', 'flight_class', 'schedule', 'old_price', 'new_price', 'load_factor'}].
+
+    Returns {'fares': fares looked at, 'changed': fares repriced}.
+    """
+    if classes is None:
+        classes = upcoming_classes()
+    ladders = load_ladders()
+    if not ladders:
+        return {'fares': 0, 'changed': 0}
+
+    booked = dict(
+        FlightSeat.objects
+        .filter(flight_class__in=classes, is_booked=True)
+        .values('flight_class_id')
+        .annotate(booked=Count('id'))
+        .values_list('flight_class_id', 'booked')
+    )
+
+    fares = (
+        FlightClassFare.objects
+        .filter(flight_class__in=classes, fare_type_id__in=ladders)
+        .values_list('id', 'flight_class_id', 'flight_class__scheduled_flight_id',
+                     'flight_class__capacity', 'fare_type_id', 'price', 'base_price')
+        .iterator(chunk_size=batch_size)
+    )
+
+    scanned = changed = 0
+    batch = []
+    for fare_id, class_id, schedule_id, capacity, fare_type_id, price, base_price in fares:
+        scanned += 1
+        if not capacity:
+            continue
+        load_factor = min(Decimal(booked.get(class_id, 0)) / capacity, Decimal(1))
+        base = price if base_price is None else base_price
+        new_price = ladder_price(base, load_factor, ladders[fare_type_id])
+        if new_price == price:
+            continue
+
+        batch.append({
+            'fare': fare_id,
+            'flight_class': class_id,
+            'schedule': schedule_id,
+            'old_price': price,
+            'new_price': new_price,
+            'base_price': base,
+            'load_factor': load_factor.quantize(Decimal('0.001')),
+        })
+        if len(batch) >= batch_size:
+            changed += _write(batch, dry_run)
+            batch = []
+
+    if batch:
+        changed += _write(batch, dry_run)
+    return {'fares': scanned, 'changed': changed}
+
+
+def _write(changes, dry_run):
+    if dry_run:
+        return len(changes)
+
+    feed = [{key: value for key, value in c.items() if key != 'base_price'} for c in changes]
+    schedule_ids = {c['schedule'] for c in changes}
+
+    def publish():
+        invalidate_seat_maps(schedule_ids)
+        fares_repriced.send(sender=FlightClassFare, changes=feed)
+
+    with transaction.atomic():
+        FlightClassFare.objects.bulk_update(
+            [FlightClassFare(pk=c['fare'], price=c['new_price'], base_price=c['base_price']) for c in changes],
+            ['price', 'base_price'],
+        )
+        transaction.on_commit(publish)
+    return len(changes)
@@ -0,0 +1,202 @@
+from bisect import bisect_left, insort
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Aircraft, Airport, FlightSchedule
+
+
+# Schedules this many days either side of a window are loaded, so flights
+# crossing midnight at the edges are still seen
+EDGE_DAYS = 1
+
+
+class Block:
+    """One scheduled flight of an aircraft: departure to arrival between two airports."""
+    __slots__ = ('start', 'end', 'schedule', 'origin', 'destination')
+
+    def __init__(self, start, end, schedule, origin, destination):
+        self.start = start
+        self.end = end
+        self.schedule = schedule
+        self.origin = origin
+        self.destination = destination
+
+    def __lt__(self, other):
+        return (self.start, self.end) < (other.start, other.end)
+
+    def as_dict(self):
+        return {
+            'schedule': self.schedule,
+            'departure': self.start.isoformat(),
+            'arrival': self.end.isoformat(),
+            'origin': self.origin,
+            'destination': self.destination,
+        }
+
+
+def flight_times(flight_date, departure_time, arrival_time, delay_minutes=None, rescheduled_to=None):
+    """
+    (departure, arrival) as naive local datetimes. An arrival at or before
+    the departure time lands the next day; delays and reschedules move the
+    whole block.
+    """
+    start = datetime.combine(flight_date, departure_time)
+    end = datetime.combine(flight_date, arrival_time)
+    if end <= start:
+        end += timedelta(days=1)
+    if rescheduled_to is not None:
+        if timezone.is_aware(rescheduled_to):
+            rescheduled_to = timezone.localtime(rescheduled_to).replace(tzinfo=None)
+        shift = rescheduled_to - start
+    else:
+        shift = timedelta(minutes=delay_minutes or 0)
+    return start + shift, end + shift
+
+
+# ---------------------- INDEX ----------------------
+
+class RotationIndex:
+    """
+    The flights of each aircraft, sorted by departure.
+
+    Checking a new flight against an aircraft's rotation is a binary search
+    for its place plus a look at the flights either side: the aircraft must
+    have spent the arrival airport's min_turnaround_minutes on the ground
+    after the previous flight and before the next one.
+    """
+
+    def __init__(self, turnaround):
+        self.turnaround = turnaround  # airport id -> timedelta
+        self.blocks = defaultdict(list)
+
+    @classmethod
+    def load(cls, date_from, date_to, aircraft=None, exclude=None, airports=()):
+        """
+        Index of every operating schedule from date_from to date_to, with the
+        turnaround times of the airports they land at plus airports (those a
+        new flight lands at). Two queries.
+        """
+        schedules = (
+            FlightSchedule.objects
+            .filter(is_active=True,
+                    flight_date__gte=date_from - timedelta(days=EDGE_DAYS),
+                    flight_date__lte=date_to + timedelta(days=EDGE_DAYS))
+            .exclude(status='cancelled')
+        )
+        if aircraft is not None:
+            schedules = schedules.filter(aircraft_id__in=aircraft)
+        if exclude is not None:
+            schedules = schedules.exclude(pk=exclude)
+
+        index = cls(dict(
+            (pk, timedelta(minutes=minutes))
+            for pk, minutes in Airport.objects
+            .filter(Q(pk__in=schedules.values('flight_leg__destination_id')) | Q(pk__in=airports))
+            .values_list('id', 'min_turnaround_minutes')
+        ))
+        for row in schedules.values_list(
+            'id', 'aircraft_id', 'flight_date', 'departure_time', 'arrival_time',
+            'delay_minutes', 'rescheduled_to', 'flight_leg__origin_id', 'flight_leg__destination_id',
+        ).iterator():
+            schedule_id, aircraft_id, origin, destination = row[0], row[1], row[7], row[8]
+            start, end = flight_times(*row[2:7])
+            index.blocks[aircraft_id].append(Block(start, end, schedule_id, origin, destination))
+
+        for blocks in index.blocks.values():
+            blocks.sort()
+        return index
+
+    def ground_time(self, airport):
+        return self.turnaround.get(airport, timedelta(0))
+
+    def neighbours(self, aircraft, start):
+        """The aircraft's flights just before and just after a departure."""
+        blocks = self.blocks.get(aircraft, [])
+        i = bisect_left(blocks, Block(start, start, None, None, None))
+        return (blocks[i - 1] if i else None), (blocks[i] if i < len(blocks) else None)
+
+    def conflicts(self, aircraft, block):
+        """Flights of the aircraft that leave block too little ground time."""
+        before, after = self.neighbours(aircraft, block.start)
+        clashes = []
+        if before is not None and before.end + self.ground_time(before.destination) > block.start:
+            clashes.append(before)
+        if after is not None and block.end + self.ground_time(block.destination) > after.start:
+            clashes.append(after)
+        return clashes
+
+    def add(self, aircraft, block):
+        insort(self.blocks[aircraft], block)
+
+    def validate(self):
+        """
+        Every turnaround or overlap conflict in the index, plus 'position'
+        warnings where a flight leaves from somewhere other than where the
+        aircraft last landed.
+        """
+        problems = []
+        for aircraft, blocks in self.blocks.items():
+            for before, after in zip(blocks, blocks[1:]):
+                needed = self.ground_time(before.destination)
+                ground = after.start - before.end
+                if ground < needed:
+                    problems.append({
+                        'aircraft': aircraft,
+                        'type': 'overlap' if ground < timedelta(0) else 'turnaround',
+                        'ground_minutes': int(ground.total_seconds() // 60),
+                        'required_minutes': int(needed.total_seconds() // 60),
+                        'flights': [before.as_dict(), after.as_dict()],
+                    })
+                elif before.destination != after.origin:
+                    problems.append({
+                        'aircraft': aircraft,
+                        'type': 'position',
+                        'flights': [before.as_dict(), after.as_dict()],
+                    })
+        return problems
+
+    def suggest(self, block, candidates):
+        """
+        Aircraft of candidates that can fly block, best first: those already
+        at the departure airport, then the one with the least idle time
+        before it.
+        """
+        ranked = []
+        for aircraft in candidates:
+            if self.conflicts(aircraft, block):
+                continue
+            before, _ = self.neighbours(aircraft, block.start)
+            positioned = before is None or before.destination == block.origin
+            idle = block.start - before.end if before is not None else timedelta.max
+            ranked.append((not positioned, idle, aircraft))
+        ranked.sort()
+        return [aircraft for _, _, aircraft in ranked]
+
+
+# ---------------------- SERVICES ----------------------
+
+def check_schedule(aircraft, flight_leg, flight_date, departure_time, arrival_time, exclude=None):
+    """
+    Flights of aircraft that a new or changed schedule would clash with.
+    Without a flight_leg only the previous flight's turnaround is known.
+    """
+    origin, destination = (flight_leg.origin_id, flight_leg.destination_id) if flight_leg else (None, None)
+    index = RotationIndex.load(flight_date, flight_date, aircraft=[aircraft.pk], exclude=exclude,
+                               airports=[destination] if destination else [])
+    start, end = flight_times(flight_date, departure_time, arrival_time)
+    return index.conflicts(aircraft.pk, Block(start, end, exclude, origin, destination))
+
+
+def suggest_aircraft(flight_leg, flight_date, departure_time, arrival_time):
+    """Active aircraft of the leg's airline able to fly it, best first."""
+    candidates = list(
+        Aircraft.objects
+        .filter(airline_id=flight_leg.route.airline_id, is_active=True)
+        .values_list('id', flat=True)
+    )
+    index = RotationIndex.load(flight_date, flight_date, aircraft=candidates, airports=[flight_leg.destination_id])
+    start, end = flight_times(flight_date, departure_time, arrival_time)
+    return index.suggest(Block(start, end, None, flight_leg.origin_id, flight_leg.destination_id), candidates)
@@ -0,0 +1,255 @@
+import re
+from collections import defaultdict
+from itertools import groupby
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from apps.common.bulk import insert_ignoring_conflicts
+from .models import (
+    FlightClass, FlightClassFare, FlightSchedule, FlightSeat, SeatMapSection, SeatMapTemplate
+)
+
+
+SEAT_BATCH_SIZE = 2000
+
+SEAT_MAP_CACHE_PREFIX = 'seatmap:'
+SEAT_MAP_TTL = 60 * 60
+
+# Cell states in the seat map grid
+NO_SEAT = '_'
+AVAILABLE = 'A'
+BOOKED = 'B'
+HELD = 'H'
+
+SEAT_NUMBER = re.compile(r'^(\d+)([A-Z]+)$')
+
+
+# ---------------------- SEAT MAP MATERIALISATION ----------------------
+
+def _insert_seats(rows):
+    """
+    Insert the (flight_class_id, flight_class_fare_id, seat_number,
+    is_booked, hold_token) rows, skipping seats that already exist.
+    Returns the number of seats inserted.
+    """
+    return insert_ignoring_conflicts(
+        FlightSeat, ('flight_class', 'flight_class_fare', 'seat_number', 'is_booked', 'hold_token'),
+        rows, batch_size=SEAT_BATCH_SIZE,
+    )
+
+
+def _active_layouts(aircraft_ids):
+    """aircraft id -> [(class name, default fare type id, [seat numbers])]"""
+    templates = (
+        SeatMapTemplate.objects
+        .filter(aircraft_id__in=aircraft_ids, is_active=True)
+        .prefetch_related('sections')
+    )
+    return {
+        template.aircraft_id: [
+            (section.class_name, section.default_fare_type_id, section.seat_numbers())
+            for section in template.sections.all()
+        ]
+        for template in templates
+    }
+
+
+def materialise_seat_maps(schedules):
+    """
+    Create the FlightSeat rows of every class of the given schedules from
+    their aircraft's active SeatMapTemplate.
+
+    Reads are a fixed four queries whatever the number of schedules, and
+    all seats go out in batched executemany() inserts inside one
+    transaction. Seats that already exist are left alone (unique
+    flight_class + seat_number), so the job can be re-run. Each seat gets the class's fare for the section's
+    default fare type, or the class's cheapest fare if it does not sell it.
+
+    schedules: FlightSchedule queryset or iterable of schedule ids.
+    Returns {'schedules', 'seats' (inserted), 'skipped': [(schedule id, class name, reason)]}.
+    """
+    if not hasattr(schedules, 'values_list'):
+        schedules = FlightSchedule.objects.filter(pk__in=list(schedules))
+    schedule_aircraft = dict(schedules.values_list('id', 'aircraft_id'))
+
+    layouts = _active_layouts(set(schedule_aircraft.values()))
+
+    classes = {
+        (schedule_id, name): class_id
+        for class_id, schedule_id, name in FlightClass.objects
+        .filter(scheduled_flight_id__in=schedule_aircraft)
+        .values_list('id', 'scheduled_flight_id', 'name')
+    }
+
+    # class id -> {fare type id: fare id}, plus the cheapest fare as fallback
+    fares = defaultdict(dict)
+    cheapest = {}
+    for fare_id, class_id, fare_type_id in (
+        FlightClassFare.objects
+        .filter(flight_class__scheduled_flight_id__in=schedule_aircraft)
+        .order_by('-price')
+        .values_list('id', 'flight_class_id', 'fare_type_id')
+    ):
+        fares[class_id][fare_type_id] = fare_id
+        cheapest[class_id] = fare_id
+
+    seats = []
+    skipped = []
+    for schedule_id, aircraft_id in schedule_aircraft.items():
+        layout = layouts.get(aircraft_id)
+        if layout is None:
+            skipped.append((schedule_id, None, "Aircraft has no active seat map template."))
+            continue
+
+        for class_name, fare_type_id, seat_numbers in layout:
+            class_id = classes.get((schedule_id, class_name))
+            if class_id is None:
+                skipped.append((schedule_id, class_name, "Schedule has no such flight class."))
+                continue
+            fare_id = fares[class_id].get(fare_type_id, cheapest.get(class_id))
+            if fare_id is None:
+                skipped.append((schedule_id, class_name, "Flight class has no fares."))
+                continue
+
+            seats.extend((class_id, fare_id, number, False, '') for number in seat_numbers)
+
+    with transaction.atomic():
+        inserted = _insert_seats(seats)
+        transaction.on_commit(lambda: invalidate_seat_maps(schedule_aircraft))
+
+    return {'schedules': len(schedule_aircraft), 'seats': inserted, 'skipped': skipped}
+
+
+# ---------------------- COMPACT SEAT MAP ----------------------
+
+def run_length(cells):
+    """'AAAB__' -> '3A1B2_'"""
+    return ''.join(f"{len(list(run))}{cell}" for cell, run in groupby(cells))
+
+
+def merge_letters(layouts):
+    """
+    One letters row covering the seat_letters of every section of a class:
+    each letter once, in order, with an aisle before a letter wherever a
+    section has one. Rows of a narrower section show '_' where they lack a
+    letter.
+    """
+    letters, aisles = set(), set()
+    for layout in layouts:
+        letters.update(layout.replace('-', ''))
+        aisles.update(block[0] for block in layout.split('-')[1:] if block)
+    return ''.join(('-' if letter in aisles else '') + letter for letter in sorted(letters)).lstrip('-')
+
+
+def build_seat_map(schedule_id):
+    """
+    Seat map of a schedule as a row x letter grid per class.
+
+    seats is the grid read row by row, one cell per letter, run-length
+    encoded: '_' no seat, 'A' available, 'B' booked, 'H' held. seat_fares
+    is the same grid with the index into fares ('a' = fares[0]) per seat.
+    letters carries the aisles ('-') from the seat map template when the
+    aircraft has one. Four queries whatever the number of seats.
+
+    Returns (seat map, seconds until the first hold in it expires or None).
+    """
+    schedule = FlightSchedule.objects.filter(pk=schedule_id).values('id', 'aircraft_id').first()
+    if schedule is None:
+        return None, None
+
+    classes = list(
+        FlightClass.objects
+        .filter(scheduled_flight_id=schedule_id)
+        .order_by('id')
+        .values_list('id', 'name')
+    )
+    layouts = defaultdict(list)
+    for class_name, seat_letters in (
+        SeatMapSection.objects
+        .filter(template__aircraft_id=schedule['aircraft_id'], template__is_active=True)
+        .order_by('first_row')
+        .values_list('class_name', 'seat_letters')
+    ):
+        layouts[class_name].append(seat_letters)
+
+    now = timezone.now()
+    first_expiry = None
+    seats = defaultdict(dict)
+    for class_id, seat_number, is_booked, held_until, fare_id in (
+        FlightSeat.objects
+        .filter(flight_class__scheduled_flight_id=schedule_id)
+        .values_list('flight_class_id', 'seat_number', 'is_booked', 'held_until', 'flight_class_fare_id')
+        .iterator()
+    ):
+        match = SEAT_NUMBER.match(seat_number)
+        if not match:
+            continue
+        if is_booked:
+            state = BOOKED
+        elif held_until is not None and held_until > now:
+            state = HELD
+            first_expiry = held_until if first_expiry is None else min(first_expiry, held_until)
+        else:
+            state = AVAILABLE
+        row, letter = match.groups()
+        seats[class_id][(int(row), letter)] = (state, fare_id)
+
+    fares = defaultdict(list)
+    for fare_id, class_id, fare_type, price in (
+        FlightClassFare.objects
+        .filter(flight_class__scheduled_flight_id=schedule_id)
+        .order_by('price')
+        .values_list('id', 'flight_class_id', 'fare_type__name', 'price')
+    ):
+        fares[class_id].append({'id': fare_id, 'fare_type': fare_type, 'price': f"{price:f}"})
+
+    result = []
+    for class_id, name in classes:
+        grid = seats[class_id]
+        if name in layouts:
+            letters = merge_letters(layouts[name])
+        else:
+            letters = ''.join(sorted({letter for _, letter in grid}))
+        rows = sorted({row for row, _ in grid})
+        fare_index = {fare['id']: chr(ord('a') + i) for i, fare in enumerate(fares[class_id])}
+
+        states, seat_fares = [], []
+        for row in rows:
+            for letter in letters.replace('-', ''):
+                state, fare_id = grid.get((row, letter), (NO_SEAT, None))
+                states.append(state)
+                seat_fares.append(fare_index.get(fare_id, NO_SEAT))
+
+        result.append({
+            'id': class_id,
+            'name': name,
+            'letters': letters,
+            'rows': rows,
+            'seats': run_length(states),
+            'fares': fares[class_id],
+            'seat_fares': run_length(seat_fares),
+        })
+
+    expires_in = (first_expiry - now).total_seconds() if first_expiry else None
+    return {'schedule': schedule_id, 'classes': result}, expires_in
+
+
+def get_seat_map(schedule_id):
+    """
+    Cached snapshot of build_seat_map(); rebuilt after seat changes and
+    when the first hold in it lapses.
+    """
+    key = f"{SEAT_MAP_CACHE_PREFIX}{schedule_id}"
+    seat_map = cache.get(key)
+    if seat_map is None:
+        seat_map, expires_in = build_seat_map(schedule_id)
+        if seat_map is not None:
+            ttl = SEAT_MAP_TTL if expires_in is None else min(SEAT_MAP_TTL, int(expires_in) + 1)
+            cache.set(key, seat_map, ttl)
+    return seat_map
+
+
+def invalidate_seat_maps(schedule_ids):
+    cache.delete_many([f"{SEAT_MAP_CACHE_PREFIX}{schedule_id}" for schedule_id in schedule_ids])
@@ -1,9 +1,13 @@
 from rest_framework import serializers
 from datetime import date, datetime, time
+from django.db import transaction
 
+from apps.common.serializers import UniqueConstraintErrorsMixin
+from .rotation import check_schedule
 from .models import (
     Aircraft, Airport, Terminal, FlightRoute, FlightLeg, FlightSchedule,
-    FareType, FlightClass, FlightClassFare, FlightSeat, Passenger
+    FareType, FlightClass, FlightClassFare, FlightSeat, Passenger,
+    SeatMapSection
 )
 
 
@@ -40,21 +44,20 @@ class AircraftSerializer(serializers.ModelSerializer):
 
 # ---------------------- AIRPORT ----------------------
 
-class AirportSerializer(serializers.ModelSerializer):
+class AirportSerializer(UniqueConstraintErrorsMixin, serializers.ModelSerializer):
+
+    unique_errors = {
+        'code': ('code', "Airport code must be unique globally."),
+    }
 
     class Meta:
         model = Airport
         fields = '__all__'
         read_only_fields =['id']
+        extra_kwargs = {'code': {'validators': []}}
 
     def validate_code(self, value):
-        value = value.upper()
-        qs = Airport.objects.filter(code=value)
-        if self.instance:
-            qs = qs.exclude(pk=self.instance.pk)
-        if qs.exists():
-            raise serializers.ValidationError("Airport code must be unique globally.")
-        return value
+        return value.upper()
 
     def validate_latitude(self, value):
         if value < -90 or value > 90:
@@ -88,12 +91,18 @@ class AirportSerializer(serializers.ModelSerializer):
 
 # ---------------------- TERMINAL ----------------------
 
-class TerminalSerializer(serializers.ModelSerializer):
+class TerminalSerializer(UniqueConstraintErrorsMixin, serializers.ModelSerializer):
+
+    unique_errors = {
+        'flights_terminal_airport_code_uniq': ('code', "Terminal code '{code}' already exists for this airport."),
+        ('airport', 'name'): ('name', "Terminal '{name}' already exists for this airport."),
+    }
 
     class Meta:
         model = Terminal
         fields = '__all__'
         read_only_fields =['id','airport']
+        validators = []
 
 
     def validate(self, data):
@@ -108,29 +117,26 @@ class TerminalSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError({"airport": "Cannot assign a terminal to an inactive airport."})
 
         if code:
-            code = code.upper()
-            qs = Terminal.objects.filter(code=code, airport=airport)
-            if self.instance:
-                qs = qs.exclude(pk=self.instance.pk)
-            if qs.exists():
-                raise serializers.ValidationError(
-                    {"code": f"Terminal code '{code}' already exists for this airport."}
-                )
-            data["code"] = code  
+            data["code"] = code.upper()
 
         return data
 
 # ---------------------- FLIGHT ROUTE ----------------------
-class FlightRouteSerializer(serializers.ModelSerializer):
+class FlightRouteSerializer(UniqueConstraintErrorsMixin, serializers.ModelSerializer):
+
+    unique_errors = {
+        'flights_flightroute_airline_flight_number_uniq':
+            ('flight_number', "Flight number '{flight_number}' already exists for this airline."),
+    }
 
     class Meta:
         model = FlightRoute
         fields = '__all__'
         read_only_fields = ['id']
+        validators = []
 
     def validate(self, data):
         airline = data.get('airline')
-        flight_number = data.get('flight_number')
         origin = data.get('origin')
         destination = data.get('destination')
         operational_days = data.get('operational_days')
@@ -144,12 +150,6 @@ class FlightRouteSerializer(serializers.ModelSerializer):
         if hasattr(airline, 'is_active') and not airline.is_active:
             errors['airline'] = "Cannot create a flight route for an inactive airline."
 
-        qs = FlightRoute.objects.filter(airline=airline, flight_number=flight_number)
-        if self.instance:
-            qs = qs.exclude(pk=self.instance.pk)
-        if qs.exists():
-            errors['flight_number'] = f"Flight number '{flight_number}' already exists for this airline."
-
         if operational_days < 1 or operational_days > 7:
             errors['operational_days'] = "Operational days must be between 1 and 7."
 
@@ -160,15 +160,20 @@ class FlightRouteSerializer(serializers.ModelSerializer):
 
 # ---------------------- FLIGHT LEG ----------------------
 
-class FlightLegSerializer(serializers.ModelSerializer):
+class FlightLegSerializer(UniqueConstraintErrorsMixin, serializers.ModelSerializer):
+
+    unique_errors = {
+        'flights_flightleg_route_stop_order_uniq':
+            ('stop_order', "Stop order {stop_order} already exists for this route."),
+    }
 
     class Meta:
         model = FlightLeg
         fields = '__all__'
         read_only_fields = ['id', 'route']
+        validators = []
 
     def validate(self, data):
-        route = data.get('route')
         stop_order = data.get('stop_order')
         origin = data.get('origin')
         destination = data.get('destination')
@@ -197,13 +202,6 @@ class FlightLegSerializer(serializers.ModelSerializer):
             if duration_minutes != calculated_duration:
                 errors['duration_minutes'] = f"Duration_minutes does not match the difference between departure and arrival ({calculated_duration} mins)."
 
-        # 5️Unique stop_order per route
-        qs = FlightLeg.objects.filter(route=route, stop_order=stop_order)
-        if self.instance:
-            qs = qs.exclude(pk=self.instance.pk)
-        if qs.exists():
-            errors['stop_order'] = f"Stop order {stop_order} already exists for this route."
-
         if errors:
             raise serializers.ValidationError(errors)
 
@@ -230,9 +228,9 @@ class FlightScheduleSerializer(serializers.ModelSerializer):
 
         errors = {}
 
-        # Arrival must be after departure
-        if departure_time >= arrival_time:
-            errors['arrival_time'] = "Arrival time must be after departure time."
+        # An arrival time before the departure time lands the next day
+        if departure_time == arrival_time:
+            errors['arrival_time'] = "Arrival time must differ from departure time."
 
         # Flight date cannot be in the past
         if flight_date < date.today():
@@ -250,21 +248,15 @@ class FlightScheduleSerializer(serializers.ModelSerializer):
         if rescheduled_to is not None and status != "rescheduled":
             errors['rescheduled_to'] = "Rescheduled datetime can only be set if status is 'rescheduled'."
 
-        # Optional: Prevent overlapping schedule for same aircraft on same date
-        overlapping_qs = FlightSchedule.objects.filter(
-            flight_date=flight_date,
-            aircraft=aircraft
-        )
-        if self.instance:
-            overlapping_qs = overlapping_qs.exclude(pk=self.instance.pk)
-
-        for schedule in overlapping_qs:
-            existing_departure = datetime.combine(schedule.flight_date, schedule.departure_time)
-            existing_arrival = datetime.combine(schedule.flight_date, schedule.arrival_time)
-            new_departure = datetime.combine(flight_date, departure_time)
-            new_arrival = datetime.combine(flight_date, arrival_time)
-            if (new_departure < existing_arrival) and (new_arrival > existing_departure):
-                errors['aircraft'] = f"Aircraft '{aircraft}' has an overlapping flight on this date."
+        # Aircraft must not overlap its other flights, allowing turnaround time
+        flight_leg = flight_leg or getattr(self.instance, 'flight_leg', None) or self.context.get('flight_leg')
+        clashes = check_schedule(aircraft, flight_leg, flight_date, departure_time, arrival_time,
+                                 exclude=getattr(self.instance, 'pk', None))
+        if clashes:
+            errors['aircraft'] = (
+                f"Aircraft '{aircraft}' needs more ground time around schedule "
+                f"{', '.join(str(block.schedule) for block in clashes)}."
+            )
 
         if errors:
             raise serializers.ValidationError(errors)
@@ -274,11 +266,17 @@ class FlightScheduleSerializer(serializers.ModelSerializer):
 
 # ---------------------- FARE TYPE ----------------------
 
-class FareTypeSerializer(serializers.ModelSerializer):
+class FareTypeSerializer(UniqueConstraintErrorsMixin, serializers.ModelSerializer):
+
+    unique_errors = {
+        'flights_faretype_name_ci_uniq': ('name', "Fare type '{name}' already exists."),
+    }
+
     class Meta:
         model = FareType
         fields = '__all__'
         read_only_fields = ['id']
+        validators = []
 
     def validate(self, data):
         errors = {}
@@ -291,13 +289,6 @@ class FareTypeSerializer(serializers.ModelSerializer):
         if not name or not name.strip():
             errors['name'] = "Fare type name cannot be empty."
 
-        # Name must be unique
-        qs = FareType.objects.filter(name__iexact=name)
-        if self.instance:
-            qs = qs.exclude(pk=self.instance.pk)
-        if qs.exists():
-            errors['name'] = f"Fare type '{name}' already exists."
-
         # Extra baggage logic
         if extra_baggage_allowed and baggage_allowance == 0:
             errors['extra_baggage_allowed'] = "Extra baggage cannot be allowed if baggage allowance is zero."
@@ -309,16 +300,22 @@ class FareTypeSerializer(serializers.ModelSerializer):
 
 # ---------------------- FLIGHT CLASS ----------------------
 
-class FlightClassSerializer(serializers.ModelSerializer):
+class FlightClassSerializer(UniqueConstraintErrorsMixin, serializers.ModelSerializer):
 
     ALLOWED_CLASSES = ["Economy", "Business", "Premium"]
+
+    unique_errors = {
+        'flights_flightclass_schedule_name_uniq':
+            ('name', "'{name}' class already exists for this flight schedule."),
+    }
+
     class Meta:
         model = FlightClass
         fields = '__all__'
         read_only_fields = ['id', 'scheduled_flight']
+        validators = []
 
     def validate(self, data):
-        scheduled_flight = data.get('scheduled_flight')
         name = data.get('name')
         capacity = data.get('capacity')
 
@@ -334,13 +331,6 @@ class FlightClassSerializer(serializers.ModelSerializer):
         if capacity is None or capacity <= 0:
             errors['capacity'] = "Capacity must be a positive integer."
 
-        # Name must be unique per scheduled flight
-        qs = FlightClass.objects.filter(scheduled_flight=scheduled_flight, name=name)
-        if self.instance:
-            qs = qs.exclude(pk=self.instance.pk)
-        if qs.exists():
-            errors['name'] = f"'{name}' class already exists for this flight schedule."
-
         if errors:
             raise serializers.ValidationError(errors)
 
@@ -348,16 +338,20 @@ class FlightClassSerializer(serializers.ModelSerializer):
     
 # ---------------------- FLIGHT CLASS FARE ----------------------
 
-class FlightClassFareSerializer(serializers.ModelSerializer):
+class FlightClassFareSerializer(UniqueConstraintErrorsMixin, serializers.ModelSerializer):
+
+    unique_errors = {
+        ('flight_class', 'fare_type'):
+            ('fare_type', "The fare type '{fare_type}' already exists for flight class '{flight_class}'."),
+    }
 
     class Meta:
         model = FlightClassFare
         fields = '__all__'
         read_only_fields = ['id', 'flight_class']
+        validators = []
 
     def validate(self, data):
-        flight_class = data.get('flight_class')
-        fare_type = data.get('fare_type')
         price = data.get('price')
 
         errors = {}
@@ -366,13 +360,6 @@ class FlightClassFareSerializer(serializers.ModelSerializer):
         if price is None or price <= 0:
             errors['price'] = "Price must be a positive number."
 
-        # Unique combination of flight_class and fare_type
-        qs = FlightClassFare.objects.filter(flight_class=flight_class, fare_type=fare_type)
-        if self.instance:
-            qs = qs.exclude(pk=self.instance.pk)
-        if qs.exists():
-            errors['fare_type'] = f"The fare type '{fare_type}' already exists for flight class '{flight_class}'."
-
         if errors:
             raise serializers.ValidationError(errors)
 
@@ -380,12 +367,18 @@ class FlightClassFareSerializer(serializers.ModelSerializer):
 
 # ---------------------- FLIGHT SEAT ----------------------
 
-class FlightSeatSerializer(serializers.ModelSerializer):
+class FlightSeatSerializer(UniqueConstraintErrorsMixin, serializers.ModelSerializer):
+
+    unique_errors = {
+        'flights_flightseat_class_seat_number_uniq':
+            ('seat_number', "Seat '{seat_number}' already exists for this flight class."),
+    }
 
     class Meta:
         model = FlightSeat
         fields = '__all__'
-        read_only_fields = ['id', 'flight_class', 'flight_class_fare']
+        read_only_fields = ['id', 'flight_class', 'flight_class_fare', 'held_until', 'hold_token']
+        validators = []
 
     def validate(self, data):
         flight_class = data.get('flight_class')
@@ -398,13 +391,6 @@ class FlightSeatSerializer(serializers.ModelSerializer):
         if not seat_number or not seat_number.strip():
             errors['seat_number'] = "Seat number cannot be empty."
 
-        # Seat number must be unique per flight_class
-        qs = FlightSeat.objects.filter(flight_class=flight_class, seat_number=seat_number)
-        if self.instance:
-            qs = qs.exclude(pk=self.instance.pk)
-        if qs.exists():
-            errors['seat_number'] = f"Seat '{seat_number}' already exists for this flight class."
-
         # flight_class_fare must belong to the same flight_class
         if flight_class_fare.flight_class != flight_class:
             errors['flight_class_fare'] = "Selected fare does not belong to this flight class."
@@ -450,4 +436,252 @@ class PassengerSerializer(serializers.ModelSerializer):
         if errors:
             raise serializers.ValidationError(errors)
 
-        return data
\ No newline at end of file
+        return data
+
+
+# ---------------------- SEAT MAPS ----------------------
+
+class SeatMapSectionSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = SeatMapSection
+        fields = '__all__'
+        read_only_fields = ['id', 'template']
+
+    def validate(self, data):
+        first_row = data.get('first_row')
+        last_row = data.get('last_row')
+        class_name = data.get('class_name')
+
+        errors = {}
+
+        if class_name not in FlightClassSerializer.ALLOWED_CLASSES:
+            errors['class_name'] = f"Class name must be one of {FlightClassSerializer.ALLOWED_CLASSES}."
+
+        if first_row and last_row and last_row < first_row:
+            errors['last_row'] = "Last row cannot be before first row."
+
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        return data
+
+
+class MaterialiseSeatMapsSerializer(serializers.Serializer):
+    """Schedules to create seats for: explicit ids or a date range."""
+    schedule_ids = serializers.ListField(child=serializers.IntegerField(), required=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    def validate(self, data):
+        if not data.get('schedule_ids') and not (data.get('date_from') and data.get('date_to')):
+            raise serializers.ValidationError("Provide schedule_ids or both date_from and date_to.")
+        if data.get('date_from') and data.get('date_to') and data['date_to'] < data['date_from']:
+            raise serializers.ValidationError({"date_to": "date_to cannot be before date_from."})
+        return data
+
+    def get_schedules(self):
+        data = self.validated_data
+        schedules = FlightSchedule.objects.filter(is_active=True)
+        if data.get('schedule_ids'):
+            schedules = schedules.filter(pk__in=data['schedule_ids'])
+        if data.get('date_from'):
+            schedules = schedules.filter(flight_date__gte=data['date_from'])
+        if data.get('date_to'):
+            schedules = schedules.filter(flight_date__lte=data['date_to'])
+        return schedules
+
+
+# ---------------------- GROUP SEATING ----------------------
+
+class PartyMemberSerializer(serializers.Serializer):
+    """A passenger of a party, referenced locally (e.g. 'A1' guards 'I1')."""
+    ref = serializers.CharField(max_length=10)
+    passenger_type = serializers.ChoiceField(choices=Passenger.PASSENGER_TYPE_CHOICES)
+    guardian = serializers.CharField(max_length=10, required=False, allow_null=True, allow_blank=True)
+
+
+class PartySerializer(serializers.Serializer):
+    passengers = PartyMemberSerializer(many=True, allow_empty=False)
+
+    def validate_passengers(self, passengers):
+        """Guardian rules of PassengerSerializer, checked across the party in memory."""
+        refs = [p['ref'] for p in passengers]
+        if len(set(refs)) != len(refs):
+            raise serializers.ValidationError("Passenger refs must be unique within the party.")
+
+        adults = {p['ref'] for p in passengers if p['passenger_type'] == 'adult'}
+        infants_per_adult = {}
+        errors = {}
+
+        for p in passengers:
+            guardian = p.get('guardian') or None
+            p['guardian'] = guardian
+            if p['passenger_type'] == 'adult':
+                if guardian is not None:
+                    errors[p['ref']] = "Adult passenger cannot have a guardian."
+            elif not guardian:
+                errors[p['ref']] = "Child or infant must have a guardian assigned."
+            elif guardian not in adults:
+                errors[p['ref']] = f"Guardian '{guardian}' is not an adult in this party."
+            elif p['passenger_type'] == 'infant':
+                infants_per_adult[guardian] = infants_per_adult.get(guardian, 0) + 1
+                if infants_per_adult[guardian] > 1:
+                    errors[p['ref']] = f"Adult '{guardian}' can travel with only one infant."
+
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        return passengers
+
+
+class GroupPassengerMemberSerializer(PartyMemberSerializer):
+    first_name = serializers.CharField(max_length=30)
+    last_name = serializers.CharField(max_length=30)
+    email = serializers.EmailField(max_length=50, required=False, allow_null=True)
+    contact_number = serializers.CharField(max_length=15, required=False, allow_null=True, allow_blank=True)
+
+
+class GroupPassengerSerializer(PartySerializer):
+    """
+    A whole party of passengers created at once. Guardians are given by
+    local ref, so adults and their dependents can be sent together.
+    """
+    passengers = GroupPassengerMemberSerializer(many=True, allow_empty=False, max_length=18)
+
+    def validate_passengers(self, passengers):
+        passengers = super().validate_passengers(passengers)
+        if sum(p['passenger_type'] != 'infant' for p in passengers) > 9:
+            raise serializers.ValidationError("A booking can seat at most 9 passengers.")
+        return passengers
+
+    def create(self, validated_data):
+        """Two inserts: adults first, then dependents pointing at the new adult ids."""
+        fields = ('passenger_type', 'first_name', 'last_name', 'email', 'contact_number')
+        members = validated_data['passengers']
+
+        with transaction.atomic():
+            adults = [m for m in members if m['passenger_type'] == 'adult']
+            created = dict(zip(
+                (m['ref'] for m in adults),
+                Passenger.objects.bulk_create(
+                    Passenger(**{f: m.get(f) for f in fields}) for m in adults
+                ),
+            ))
+            dependents = [m for m in members if m['passenger_type'] != 'adult']
+            created.update(zip(
+                (m['ref'] for m in dependents),
+                Passenger.objects.bulk_create(
+                    Passenger(guardian=created[m['guardian']], **{f: m.get(f) for f in fields})
+                    for m in dependents
+                ),
+            ))
+
+        # In request order
+        return [(m['ref'], created[m['ref']]) for m in members]
+
+
+class SeatHoldSerializer(PartySerializer):
+    hold_minutes = serializers.IntegerField(min_value=1, max_value=60, required=False)
+
+
+class ReleaseHoldSerializer(serializers.Serializer):
+    hold_token = serializers.CharField(max_length=32)
+
+
+# ---------------------- FARE QUOTES ----------------------
+
+class QuoteSegmentSerializer(serializers.Serializer):
+    flight_class = serializers.IntegerField()
+    fare_type = serializers.IntegerField()
+
+
+class PassengerCountSerializer(serializers.Serializer):
+    adult = serializers.IntegerField(min_value=1, max_value=9)
+    child = serializers.IntegerField(min_value=0, max_value=8, default=0)
+    infant = serializers.IntegerField(min_value=0, max_value=9, default=0)
+
+    def validate(self, data):
+        if data['adult'] + data['child'] > 9:
+            raise serializers.ValidationError("A booking can seat at most 9 passengers.")
+        if data['infant'] > data['adult']:
+            raise serializers.ValidationError({"infant": "Each infant must travel with an adult."})
+        return data
+
+
+class QuoteRequestSerializer(serializers.Serializer):
+    segments = QuoteSegmentSerializer(many=True, allow_empty=False)
+    passengers = PassengerCountSerializer()
+
+
+class SeatPassengerSerializer(serializers.Serializer):
+    seat = serializers.IntegerField(min_value=1)
+    passenger = serializers.IntegerField(min_value=1)
+
+
+class BookQuoteSerializer(serializers.Serializer):
+    hold_tokens = serializers.ListField(child=serializers.CharField(max_length=32), allow_empty=False)
+    passengers = SeatPassengerSerializer(many=True, required=False)
+
+    def validate_passengers(self, passengers):
+        """{seat id: passenger id}, checked against the passengers in one query."""
+        seats = {item['seat']: item['passenger'] for item in passengers}
+        if len(seats) != len(passengers):
+            raise serializers.ValidationError("Each seat can be given one passenger.")
+        types = dict(Passenger.objects.filter(pk__in=set(seats.values())).values_list('id', 'passenger_type'))
+        if set(seats.values()) - set(types):
+            raise serializers.ValidationError("Unknown passenger.")
+        if 'infant' in types.values():
+            raise serializers.ValidationError("Infants sit on a guardian's lap, not in a seat.")
+        return seats
+
+
+# ---------------------- ROTATIONS ----------------------
+
+class RotationCheckSerializer(serializers.Serializer):
+    date_from = serializers.DateField()
+    days = serializers.IntegerField(min_value=1, max_value=31, default=7)
+
+
+class SuggestAircraftSerializer(serializers.Serializer):
+    flight_leg = serializers.PrimaryKeyRelatedField(queryset=FlightLeg.objects.select_related('route'))
+    flight_date = serializers.DateField()
+    departure_time = serializers.TimeField()
+    arrival_time = serializers.TimeField()
+
+
+# ---------------------- FLIGHT STATUS ----------------------
+
+class StatusUpdateSerializer(serializers.Serializer):
+    schedule = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=FlightSchedule.STATUS_CHOICES)
+    delay_minutes = serializers.IntegerField(min_value=1, required=False, allow_null=True, default=None)
+    rescheduled_to = serializers.DateTimeField(required=False, allow_null=True, default=None)
+
+    def validate(self, data):
+        # Same rules as FlightScheduleSerializer, checked without queries
+        errors = {}
+        status = data['status']
+        if status == "delayed" and data['delay_minutes'] is None:
+            errors['delay_minutes'] = "Delay minutes are required when status is 'delayed'."
+        if data['delay_minutes'] is not None and status != "delayed":
+            errors['delay_minutes'] = "Delay minutes can only be set if status is 'delayed'."
+        if status == "rescheduled" and data['rescheduled_to'] is None:
+            errors['rescheduled_to'] = "Rescheduled datetime is required when status is 'rescheduled'."
+        if data['rescheduled_to'] is not None and status != "rescheduled":
+            errors['rescheduled_to'] = "Rescheduled datetime can only be set if status is 'rescheduled'."
+        if errors:
+            raise serializers.ValidationError(errors)
+        return data
+
+
+class BulkStatusUpdateSerializer(serializers.Serializer):
+    updates = StatusUpdateSerializer(many=True, allow_empty=False, max_length=1000)
+
+    def validate_updates(self, updates):
+        seen = set()
+        for update in updates:
+            if update['schedule'] in seen:
+                raise serializers.ValidationError(f"Schedule {update['schedule']} is updated more than once.")
+            seen.add(update['schedule'])
+        return updates
@@ -0,0 +1,49 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from .models import FlightClass, FlightClassFare, FlightSeat
+from .seatmaps import invalidate_seat_maps
+
+
+# Sent after a repricing batch commits: changes=[{'fare', 'flight_class',
+# 'schedule', 'old_price', 'new_price', 'load_factor'}]. Connect downstream
+# caches (search results, fare calendars) here.
+fares_repriced = Signal()
+
+# Keep cached seat maps in step with single-row writes. Bulk writers call
+# invalidate_seat_maps() themselves.
+
+def _schedule_of(sender, instance):
+    """Schedule of a seat's or fare's class, without a query when the class is already loaded."""
+    if sender.flight_class.is_cached(instance):
+        return instance.flight_class.scheduled_flight_id
+    return (
+        FlightClass.objects.filter(pk=instance.flight_class_id)
+        .values_list('scheduled_flight_id', flat=True).first()
+    )
+
+
+@receiver([post_save, post_delete], sender=FlightSeat)
+@receiver([post_save, post_delete], sender=FlightClassFare)
+def seat_changed(sender, instance, **kwargs):
+    schedule_id = _schedule_of(sender, instance)
+    if schedule_id is not None:
+        transaction.on_commit(lambda: invalidate_seat_maps([schedule_id]))
+
+
+@receiver([post_save, post_delete], sender=FlightClass)
+def flight_class_changed(sender, instance, **kwargs):
+    transaction.on_commit(lambda: invalidate_seat_maps([instance.scheduled_flight_id]))
+
+
+# A price set by hand (admin, API) is the new base of the fare ladder. The
+# repricer writes with bulk_update(), which sends no signals.
+
+@receiver(pre_save, sender=FlightClassFare)
+def fare_saving(sender, instance, **kwargs):
+    if instance.pk is None or instance.base_price is None:
+        return
+    stored = FlightClassFare.objects.filter(pk=instance.pk).values_list('price', 'base_price').first()
+    if stored is not None and instance.price != stored[0] and instance.base_price == stored[1]:
+        instance.base_price = None
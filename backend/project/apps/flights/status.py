@@ -0,0 +1,233 @@
+import asyncio
+import json
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import FlightSchedule
+
+
+STATUS_FIELDS = ('status', 'delay_minutes', 'rescheduled_to')
+
+# Events are kept in the cache this long for late subscribers (Last-Event-ID)
+EVENT_TTL = getattr(settings, 'FLIGHT_STATUS_EVENT_TTL', 10 * 60)
+
+# How often each worker's hub looks for new events
+POLL_INTERVAL = getattr(settings, 'FLIGHT_STATUS_POLL_INTERVAL', 1.0)
+
+# A missing event is waited for this many polls before it is skipped
+GAP_POLLS = 5
+
+# Comment sent on idle streams so proxies keep the connection open
+HEARTBEAT_SECONDS = 15
+
+MAX_BACKFILL = 500
+QUEUE_SIZE = 100
+
+SEQ_KEY = 'flightstatus:seq'
+EVENT_PREFIX = 'flightstatus:event:'
+
+
+# ---------------------- INGEST ----------------------
+
+def apply_status_updates(updates):
+    """
+    Apply a batch of validated status updates ([{'schedule', 'status',
+    'delay_minutes', 'rescheduled_to'}]) in one transaction: one locking
+    read and one bulk_update() of the schedules that actually change.
+    Events for the changed schedules are published once the transaction
+    commits.
+
+    Returns {'updated': [ids], 'unchanged': [ids], 'missing': [ids], 'cancelled': [ids]}.
+    """
+    by_id = {update['schedule']: update for update in updates}
+
+    with transaction.atomic():
+        schedules = list(
+            FlightSchedule.objects
+            .select_for_update(of=('self',))
+            .filter(pk__in=by_id)
+            .select_related('flight_leg__route')
+            .only('id', 'flight_date', 'flight_leg__route__flight_number', *STATUS_FIELDS)
+        )
+
+        changed, unchanged, cancelled = [], [], []
+        for schedule in schedules:
+            update = by_id[schedule.pk]
+            values = {field: update.get(field) for field in STATUS_FIELDS}
+            if all(getattr(schedule, field) == value for field, value in values.items()):
+                unchanged.append(schedule.pk)
+                continue
+            if values['status'] == 'cancelled' and schedule.status != 'cancelled':
+                cancelled.append(schedule.pk)
+            for field, value in values.items():
+                setattr(schedule, field, value)
+            changed.append(schedule)
+
+        if changed:
+            FlightSchedule.objects.bulk_update(changed, STATUS_FIELDS)
+            updated_at = timezone.now().isoformat()
+            events = [dict(status_event(schedule), updated_at=updated_at) for schedule in changed]
+            transaction.on_commit(lambda: publish_status_events(events))
+
+    found = {schedule.pk for schedule in schedules}
+    return {
+        'updated': [schedule.pk for schedule in changed],
+        'unchanged': unchanged,
+        'missing': [pk for pk in by_id if pk not in found],
+        'cancelled': cancelled,
+    }
+
+
+def status_event(schedule):
+    return {
+        'schedule': schedule.pk,
+        'flight_number': schedule.flight_leg.route.flight_number,
+        'flight_date': schedule.flight_date.isoformat(),
+        'status': schedule.status,
+        'delay_minutes': schedule.delay_minutes,
+        'rescheduled_to': schedule.rescheduled_to.isoformat() if schedule.rescheduled_to else None,
+    }
+
+
+# ---------------------- EVENT LOG ----------------------
+
+def publish_status_events(events):
+    """
+    Append events to the shared event log: a sequence counter plus one
+    cache key per event, so every worker's hub sees them.
+    """
+    if not events:
+        return
+    cache.add(SEQ_KEY, 0, None)
+    last = cache.incr(SEQ_KEY, len(events))
+    first = last - len(events) + 1
+    cache.set_many(
+        {f"{EVENT_PREFIX}{seq}": (seq, event) for seq, event in enumerate(events, start=first)},
+        EVENT_TTL,
+    )
+
+
+async def read_events(after, upto):
+    """Logged events with after < seq <= upto, oldest first; expired ones are absent."""
+    keys = [f"{EVENT_PREFIX}{seq}" for seq in range(after + 1, upto + 1)]
+    found = await cache.aget_many(keys)
+    return [found[key] for key in keys if key in found]
+
+
+# ---------------------- SUBSCRIBERS ----------------------
+
+class StatusHub:
+    """
+    Fan-out of status events to the streams open in this worker.
+
+    A single task polls the event log every POLL_INTERVAL seconds and puts
+    each event on the queue of every stream subscribed to its schedule, so
+    an idle stream costs one parked coroutine and no cache or database
+    traffic. The task runs only while there are subscribers.
+    """
+
+    def __init__(self):
+        self.subscribers = defaultdict(set)
+        self.task = None
+
+    def subscribe(self, schedule_ids):
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        for schedule_id in schedule_ids:
+            self.subscribers[schedule_id].add(queue)
+        if self.task is None or self.task.done() or self.task.get_loop() is not asyncio.get_running_loop():
+            self.task = asyncio.create_task(self.poll())
+        return queue
+
+    def unsubscribe(self, queue, schedule_ids):
+        for schedule_id in schedule_ids:
+            queues = self.subscribers.get(schedule_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self.subscribers[schedule_id]
+
+    def dispatch(self, seq, event):
+        for queue in self.subscribers.get(event['schedule'], ()):
+            if queue.full():
+                # Slow reader: drop its oldest event rather than block the hub
+                queue.get_nowait()
+            queue.put_nowait((seq, event))
+
+    async def poll(self):
+        last = await cache.aget(SEQ_KEY, 0)
+        missed = 0
+        while self.subscribers:
+            await asyncio.sleep(POLL_INTERVAL)
+            seq = await cache.aget(SEQ_KEY, 0)
+            if seq < last:
+                # Counter lost (cache flushed); follow the new sequence
+                last = seq
+            if seq == last:
+                continue
+
+            found = dict(await read_events(last, seq))
+            for event_seq in range(last + 1, seq + 1):
+                event = found.get(event_seq)
+                if event is None and missed < GAP_POLLS:
+                    # Counted but not written yet; retry on the next poll
+                    missed += 1
+                    break
+                if event is not None:
+                    self.dispatch(event_seq, event)
+                missed = 0
+                last = event_seq
+
+
+hub = StatusHub()
+
+
+def sse_message(data, event='status', event_id=None):
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.insert(0, f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, cls=JSONEncoder)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def status_stream(schedule_ids, last_event_id=None):
+    """
+    Server-Sent Events for schedule_ids: the current status of each, then
+    every change as it is published. A client reconnecting with
+    Last-Event-ID first gets the logged events it missed.
+    """
+    queue = hub.subscribe(schedule_ids)
+    sent = 0
+    try:
+        yield f"retry: {int(POLL_INTERVAL * 3000)}\n\n"
+
+        if last_event_id is not None:
+            seq = await cache.aget(SEQ_KEY, 0)
+            start = max(last_event_id, seq - MAX_BACKFILL)
+            for event_seq, event in await read_events(start, seq):
+                if event['schedule'] in schedule_ids:
+                    sent = event_seq
+                    yield sse_message(event, event_id=event_seq)
+        else:
+            async for schedule in (
+                FlightSchedule.objects
+                .filter(pk__in=schedule_ids)
+                .select_related('flight_leg__route')
+                .only('id', 'flight_date', 'flight_leg__route__flight_number', *STATUS_FIELDS)
+            ):
+                yield sse_message(status_event(schedule))
+
+        while True:
+            try:
+                seq, event = await asyncio.wait_for(queue.get(), HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if seq > sent:
+                yield sse_message(event, event_id=seq)
+    finally:
+        hub.unsubscribe(queue, schedule_ids)
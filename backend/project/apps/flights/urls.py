@@ -0,0 +1,17 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from apps.flights.views import *
+
+router = DefaultRouter()
+router.register(r'airports', AirportViewSet, basename='airport')
+router.register(r'terminals', TerminalViewSet, basename='terminal')
+router.register(r'fare-types', FareTypeViewSet, basename='fare-type')
+router.register(r'schedules', FlightScheduleViewSet, basename='flight-schedule')
+router.register(r'classes', FlightClassViewSet, basename='flight-class')
+router.register(r'passengers', PassengerViewSet, basename='passenger')
+router.register(r'quotes', FareQuoteViewSet, basename='fare-quote')
+
+urlpatterns = [
+    path('api/flights/status-events/', flight_status_events, name='flight-status-events'),
+    path('api/flights/', include(router.urls)),
+]
@@ -1,3 +1,248 @@
+from datetime import date, timedelta
+
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import render
+from django.views.decorators.http import require_GET
 
 # Create your views here.
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+
+from apps.common.idempotency import idempotent
+from apps.common.views import CompiledListMixin
+from .allocation import SeatAllocationError, allocate_group, release_hold
+from .manifest import OUTPUTS, render_manifest
+from .models import Airport, Terminal, FareType, FlightSchedule, FlightClass
+from .serializers import (
+    AirportSerializer, TerminalSerializer, FareTypeSerializer, MaterialiseSeatMapsSerializer,
+    SeatHoldSerializer, ReleaseHoldSerializer, QuoteRequestSerializer, BookQuoteSerializer,
+    BulkStatusUpdateSerializer, GroupPassengerSerializer, PassengerSerializer,
+    RotationCheckSerializer, SuggestAircraftSerializer
+)
+from .quotes import QuoteError, book_quote, create_quote, get_quote
+from .reaccommodation import ReaccommodationError, reaccommodate
+from .rotation import RotationIndex, suggest_aircraft
+from .seatmaps import get_seat_map, materialise_seat_maps
+from .status import apply_status_updates, status_stream
+
+
+class AirportViewSet(CompiledListMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Airport lookup for search forms.
+    """
+    queryset = Airport.objects.filter(is_active=True).order_by('code')
+    serializer_class = AirportSerializer
+
+
+class TerminalViewSet(CompiledListMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Terminal.objects.filter(is_active=True).order_by('airport', 'name')
+    serializer_class = TerminalSerializer
+
+
+class FareTypeViewSet(CompiledListMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = FareType.objects.all().order_by('name')
+    serializer_class = FareTypeSerializer
+
+
+class FlightScheduleViewSet(viewsets.GenericViewSet):
+    """
+    Operations on scheduled flights.
+    """
+    queryset = FlightSchedule.objects.all()
+    permission_classes = [IsAdminUser]
+
+    @action(detail=True, methods=['get'], url_path='seat-map', permission_classes=[AllowAny])
+    def seat_map(self, request, pk=None):
+        """Compact seat map for seat selection; see seatmaps.build_seat_map()."""
+        seat_map = get_seat_map(int(pk)) if pk.isdigit() else None
+        if seat_map is None:
+            raise NotFound()
+        return Response(seat_map)
+
+    @action(detail=True, methods=['post'], url_path='materialise-seats')
+    def materialise_seats(self, request, pk=None):
+        result = materialise_seat_maps([self.get_object().pk])
+        return Response(result, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'], url_path='materialise-seats',
+            serializer_class=MaterialiseSeatMapsSerializer)
+    def materialise_seats_bulk(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        result = materialise_seat_maps(serializer.get_schedules())
+        return Response(result, status=status.HTTP_201_CREATED)
+
+    def manifest_response(self, schedules, filename):
+        output = self.request.query_params.get('output', 'csv')
+        if output not in OUTPUTS:
+            raise ValidationError({"output": f"Choose one of: {', '.join(OUTPUTS)}."})
+        response = StreamingHttpResponse(render_manifest(schedules, output), content_type=OUTPUTS[output])
+        response['Content-Disposition'] = f'attachment; filename="{filename}.{output}"'
+        return response
+
+    @action(detail=True, methods=['get'])
+    def manifest(self, request, pk=None):
+        """Passenger manifest, streamed: ?output=csv (default) or ndjson."""
+        schedule = self.get_object()
+        return self.manifest_response([schedule.pk], f"manifest-{schedule.pk}")
+
+    @action(detail=False, methods=['get'])
+    def manifests(self, request):
+        """Manifests of every departure on ?date=YYYY-MM-DD in one stream."""
+        try:
+            flight_date = date.fromisoformat(request.query_params.get('date', ''))
+        except ValueError:
+            raise ValidationError({"date": "Give the departure date as YYYY-MM-DD."})
+        schedules = FlightSchedule.objects.filter(flight_date=flight_date, is_active=True).values('pk')
+        return self.manifest_response(schedules, f"manifests-{flight_date.isoformat()}")
+
+    @action(detail=False, methods=['get'], url_path='rotation-check', serializer_class=RotationCheckSerializer)
+    def rotation_check(self, request):
+        """Turnaround conflicts and misplaced aircraft across the fleet for ?date_from=&days=."""
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        date_from = serializer.validated_data['date_from']
+        date_to = date_from + timedelta(days=serializer.validated_data['days'] - 1)
+        problems = RotationIndex.load(date_from, date_to).validate()
+        return Response({'date_from': date_from, 'date_to': date_to, 'problems': problems})
+
+    @action(detail=False, methods=['post'], url_path='suggest-aircraft', serializer_class=SuggestAircraftSerializer)
+    def suggest_aircraft(self, request):
+        """Aircraft of the leg's airline free to fly a new schedule, best first."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response({'aircraft': suggest_aircraft(**serializer.validated_data)})
+
+    @action(detail=True, methods=['post'])
+    def reaccommodate(self, request, pk=None):
+        """Move the passengers of a cancelled flight onto alternative flights."""
+        try:
+            result = reaccommodate(self.get_object())
+        except ReaccommodationError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_409_CONFLICT)
+        return Response(result, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'], url_path='status', serializer_class=BulkStatusUpdateSerializer)
+    @idempotent
+    def bulk_status(self, request):
+        """Status feed from operations: up to 1000 updates applied in one transaction."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        result = apply_status_updates(serializer.validated_data['updates'])
+        return Response(result, status=status.HTTP_200_OK)
+
+
+class FlightClassViewSet(viewsets.GenericViewSet):
+    """
+    Seat holds for a cabin class of a scheduled flight.
+    """
+    queryset = FlightClass.objects.select_related('scheduled_flight')
+    permission_classes = [IsAuthenticated]
+
+    @action(detail=True, methods=['post'], url_path='hold-seats', serializer_class=SeatHoldSerializer)
+    def hold_seats(self, request, pk=None):
+        """Seat a party together (children next to their guardian) and hold the seats."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        kwargs = {}
+        if 'hold_minutes' in serializer.validated_data:
+            kwargs['hold_minutes'] = serializer.validated_data['hold_minutes']
+        try:
+            result = allocate_group(self.get_object(), serializer.validated_data['passengers'], **kwargs)
+        except SeatAllocationError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_409_CONFLICT)
+        return Response(result, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'], url_path='release-hold', serializer_class=ReleaseHoldSerializer)
+    def release_hold(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        released = release_hold(serializer.validated_data['hold_token'])
+        return Response({"released": released}, status=status.HTTP_200_OK)
+
+
+class PassengerViewSet(viewsets.GenericViewSet):
+    """
+    Passengers of a booking.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @action(detail=False, methods=['post'], serializer_class=GroupPassengerSerializer)
+    @idempotent
+    def group(self, request):
+        """Create a party in one go; children and infants name their guardian by ref."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        created = serializer.save()
+        data = [
+            {'ref': ref, **PassengerSerializer(passenger).data} for ref, passenger in created
+        ]
+        return Response(data, status=status.HTTP_201_CREATED)
+
+
+class FareQuoteViewSet(viewsets.GenericViewSet):
+    """
+    Price an itinerary once (search), read the stored quote back (review)
+    and book it (pay) without re-pricing.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = QuoteRequestSerializer
+    lookup_value_regex = '[^/]+'
+
+    def create(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            quote = create_quote(user=request.user, **serializer.validated_data)
+        except QuoteError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(quote, status=status.HTTP_201_CREATED)
+
+    def retrieve(self, request, pk=None):
+        try:
+            return Response(get_quote(pk, request.user))
+        except QuoteError as exc:
+            raise NotFound(str(exc))
+
+    @action(detail=True, methods=['post'], serializer_class=BookQuoteSerializer)
+    @idempotent
+    def book(self, request, pk=None):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            result = book_quote(pk, serializer.validated_data['hold_tokens'], request.user,
+                                serializer.validated_data.get('passengers'))
+        except QuoteError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_409_CONFLICT)
+        return Response(result, status=status.HTTP_201_CREATED)
+
+
+# Async so one worker can hold thousands of idle streams; run under ASGI.
+STREAM_MAX_SCHEDULES = 20
+
+
+@require_GET
+async def flight_status_events(request):
+    """
+    Server-Sent Events stream of status changes for
+    ?schedules=<id>,<id>,... (up to STREAM_MAX_SCHEDULES flights).
+    """
+    try:
+        schedule_ids = {int(pk) for pk in request.GET.get('schedules', '').split(',') if pk}
+        last_event_id = request.headers.get('Last-Event-ID')
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return HttpResponseBadRequest("schedules and Last-Event-ID must be integers.")
+    if not schedule_ids or len(schedule_ids) > STREAM_MAX_SCHEDULES:
+        return HttpResponseBadRequest(f"Give between 1 and {STREAM_MAX_SCHEDULES} schedules.")
+
+    response = StreamingHttpResponse(
+        status_stream(schedule_ids, last_event_id), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
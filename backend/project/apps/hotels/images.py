@@ -0,0 +1,284 @@
+import hashlib
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from itertools import chain
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import HotelImage, RoomTypeImage, StoredImage
+
+
+# Variant name -> width in pixels. Originals are never scaled up, so a
+# photo narrower than a variant has no such variant.
+IMAGE_VARIANTS = getattr(settings, 'HOTEL_IMAGE_VARIANTS', {
+    'thumb': 320,
+    'small': 640,
+    'medium': 1024,
+    'large': 1600,
+})
+IMAGE_FORMAT = getattr(settings, 'HOTEL_IMAGE_FORMAT', 'JPEG')
+IMAGE_QUALITY = getattr(settings, 'HOTEL_IMAGE_QUALITY', 82)
+
+# Resizing processes; None is one per CPU
+IMAGE_WORKERS = getattr(settings, 'HOTEL_IMAGE_WORKERS', None)
+
+# Images claimed per round trip; the originals of a batch are held in memory
+CLAIM_BATCH_SIZE = 32
+
+# A claim not finished in this long is taken to have crashed and is retried
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+LINK_BATCH_SIZE = 500
+HASH_CHUNK_SIZE = 1 << 20
+
+EXTENSIONS = {'JPEG': 'jpg', 'WEBP': 'webp', 'PNG': 'png'}
+
+# EXIF orientations that turn the photo by 90 degrees
+ROTATED = (5, 6, 7, 8)
+
+
+# ---------------------- UPLOADS ----------------------
+
+def content_hash(file):
+    """sha256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    file.seek(0)
+    for chunk in file.chunks(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def store_upload(file, name):
+    """
+    The StoredImage holding file's content: the existing one when the same
+    photo was uploaded before, else a new pending one with file saved as
+    its original.
+    """
+    sha256 = content_hash(file)
+    stored = StoredImage.objects.filter(sha256=sha256).first()
+    if stored is not None:
+        return stored
+
+    stored = StoredImage(sha256=sha256)
+    stored.original.save(os.path.basename(name), file, save=False)
+    try:
+        with transaction.atomic():
+            stored.save()
+    except IntegrityError:
+        # The same photo was uploaded concurrently; keep the first copy
+        stored.original.delete(save=False)
+        return StoredImage.objects.get(sha256=sha256)
+    return stored
+
+
+def attach_upload(instance):
+    """
+    pre_save of HotelImage / RoomTypeImage: a newly uploaded image is stored
+    (once per content) as a StoredImage and the row points at its original,
+    so the request only hashes and writes the file. Variants are generated
+    later by process_images().
+    """
+    image = instance.image
+    if not image or image._committed:
+        return
+    stored = store_upload(image.file, image.name)
+    instance.image = stored.original.name
+    instance.stored = stored
+
+
+def link_existing_images(batch_size=LINK_BATCH_SIZE):
+    """
+    Point HotelImage and RoomTypeImage rows saved before StoredImage existed
+    at a StoredImage of their file's content, queuing it for processing.
+    Duplicates end up sharing the first copy. Rows whose file cannot be read
+    are skipped. Returns {'linked', 'stored', 'unreadable'}.
+    """
+    result = {'linked': 0, 'stored': 0, 'unreadable': 0}
+    for model in (HotelImage, RoomTypeImage):
+        last = 0
+        while True:
+            rows = list(
+                model.objects.filter(pk__gt=last, stored__isnull=True).exclude(image='')
+                .order_by('pk').only('pk', 'image')[:batch_size]
+            )
+            if not rows:
+                break
+            last = rows[-1].pk
+            linked = []
+            for row in rows:
+                try:
+                    with row.image.open('rb') as file:
+                        sha256 = content_hash(file)
+                except Exception:
+                    result['unreadable'] += 1
+                    continue
+                row.stored, created = StoredImage.objects.get_or_create(
+                    sha256=sha256, defaults={'original': row.image.name}
+                )
+                row.image = row.stored.original.name
+                result['stored'] += created
+                linked.append(row)
+            model.objects.bulk_update(linked, ['stored', 'image'])
+            result['linked'] += len(linked)
+    return result
+
+
+# ---------------------- RENDERING ----------------------
+
+def render_variants(data, variants=IMAGE_VARIANTS, output=IMAGE_FORMAT, quality=IMAGE_QUALITY):
+    """
+    (width, height, {name: (encoded bytes, width, height)}) of an encoded
+    photo, upright as its EXIF orientation says.
+
+    Pure Pillow, no Django or database, so it runs in a pool process. JPEGs
+    are decoded at the smallest scale still covering the largest variant,
+    and each variant is resized from the next larger one.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as image:
+        orientation = image.getexif().get(0x0112, 1)
+        rotated = orientation in ROTATED
+        width, height = image.size[::-1] if rotated else image.size
+        wanted = [(name, w) for name, w in sorted(variants.items(), key=lambda item: -item[1]) if w < width]
+        if wanted:
+            largest = (wanted[0][1], round(height * wanted[0][1] / width))
+            image.draft('RGB', largest[::-1] if rotated else largest)
+
+        current = ImageOps.exif_transpose(image) if orientation != 1 else image
+        if output == 'JPEG' and current.mode != 'RGB':
+            current = current.convert('RGB')
+
+        rendered = {}
+        for name, w in wanted:
+            h = max(1, round(height * w / width))
+            # Each step shrinks by under 2x, where Hamming looks as sharp as
+            # Lanczos at a third of the cost
+            current = current.resize((w, h), Image.Resampling.HAMMING)
+            buffer = io.BytesIO()
+            current.save(buffer, format=output, quality=quality)
+            rendered[name] = (buffer.getvalue(), w, h)
+    return width, height, rendered
+
+
+def _render(job):
+    pk, data = job
+    try:
+        return pk, render_variants(data), ''
+    except Exception as exc:
+        return pk, None, f"{type(exc).__name__}: {exc}"
+
+
+# ---------------------- PROCESSING ----------------------
+
+def claim_images(batch_size, now):
+    """
+    Up to batch_size pending images, plus any whose claim timed out, marked
+    processing. Concurrent workers skip each other's rows where the
+    database supports it.
+    """
+    with transaction.atomic():
+        ids = list(
+            StoredImage.objects.select_for_update(skip_locked=True)
+            .filter(Q(status='pending') | Q(status='processing', claimed_at__lt=now - CLAIM_TIMEOUT))
+            .order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        StoredImage.objects.filter(pk__in=ids).update(status='processing', claimed_at=now)
+    return list(StoredImage.objects.filter(pk__in=ids).only('pk', 'sha256', 'original'))
+
+
+def variant_name(sha256, name):
+    return f"image_variants/{sha256[:2]}/{sha256}/{name}.{EXTENSIONS.get(IMAGE_FORMAT, IMAGE_FORMAT.lower())}"
+
+
+def _read(image):
+    """(original bytes, '') of a stored image, or (None, error) if storage cannot give it."""
+    try:
+        with image.original.open('rb') as file:
+            return file.read(), ''
+    except Exception as exc:
+        return None, f"{type(exc).__name__}: {exc}"
+
+
+def _save_variants(image, rendered):
+    width, height, variants = rendered
+    saved = {}
+    for name, (data, w, h) in variants.items():
+        path = variant_name(image.sha256, name)
+        if default_storage.exists(path):
+            default_storage.delete(path)
+        saved[name] = {'name': default_storage.save(path, ContentFile(data)), 'width': w, 'height': h}
+    image.width, image.height, image.variants = width, height, saved
+
+
+def process_images(limit=None, workers=None, batch_size=CLAIM_BATCH_SIZE):
+    """
+    Generate the variants of pending StoredImages in a process pool until
+    none are left (or limit are done).
+
+    Storage reads and writes stay in this process, so any storage backend
+    works; the pool only decodes, resizes and encodes. Images whose original
+    cannot be read or decoded, or whose variants cannot be saved, are marked
+    failed with the error, so one bad file never holds up the queue.
+    Returns {'processed', 'failed', 'variants'}.
+    """
+    result = {'processed': 0, 'failed': 0, 'variants': 0}
+    with ProcessPoolExecutor(max_workers=workers or IMAGE_WORKERS) as pool:
+        while limit is None or result['processed'] + result['failed'] < limit:
+            size = batch_size if limit is None else min(batch_size, limit - result['processed'] - result['failed'])
+            batch = {image.pk: image for image in claim_images(size, timezone.now())}
+            if not batch:
+                break
+
+            jobs, unreadable = [], []
+            for pk, image in batch.items():
+                data, error = _read(image)
+                if data is None:
+                    unreadable.append((pk, None, error))
+                else:
+                    jobs.append((pk, data))
+
+            done = []
+            for pk, rendered, error in chain(unreadable, pool.map(_render, jobs)):
+                image = batch[pk]
+                image.processed_at = timezone.now()
+                if rendered is not None:
+                    try:
+                        _save_variants(image, rendered)
+                    except Exception as exc:
+                        rendered, error = None, f"{type(exc).__name__}: {exc}"
+                if rendered is None:
+                    image.status, image.error = 'failed', error
+                    result['failed'] += 1
+                else:
+                    image.status, image.error = 'ready', ''
+                    result['processed'] += 1
+                    result['variants'] += len(image.variants)
+                done.append(image)
+            StoredImage.objects.bulk_update(
+                done, ['status', 'width', 'height', 'variants', 'error', 'processed_at']
+            )
+    return result
+
+
+# ---------------------- URLS ----------------------
+
+def image_urls(stored, original, request=None):
+    """
+    {'original': url, variant name: url} for an image row's StoredImage and
+    its own image field. Variants appear once processed.
+    """
+    build = request.build_absolute_uri if request is not None else (lambda url: url)
+    urls = {'original': build(original.url) if original else None}
+    if stored is not None and stored.status == 'ready':
+        for name, variant in stored.variants.items():
+            urls[name] = build(default_storage.url(variant['name']))
+    return urls
@@ -0,0 +1,276 @@
+from bisect import bisect_right
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from apps.common.bulk import insert_ignoring_conflicts
+from .models import Room, RoomAvailability, RoomType
+from .rollups import refresh_calendar
+
+
+UPSERT_BATCH_SIZE = 1000
+INSERT_BATCH_SIZE = 2000
+ROOM_TYPES_PER_BATCH = 500
+
+# The rolling job keeps availability this many days ahead
+ROLLING_DAYS = getattr(settings, 'HOTEL_INVENTORY_DAYS', 365)
+
+# Nights priced at RoomType.weekend_price, Monday=0
+WEEKEND_DAYS = getattr(settings, 'HOTEL_WEEKEND_DAYS', (4, 5))
+
+# Pushes may cover dates up to this far ahead
+HORIZON_DAYS = getattr(settings, 'CHANNEL_HORIZON_DAYS', 730)
+
+# Most (room type, date) cells one push may expand to
+MAX_CELLS = getattr(settings, 'CHANNEL_MAX_CELLS', 150000)
+
+RATE_FIELDS = (
+    'price_per_night', 'weekend_surcharge', 'seasonal_surcharge', 'discount_percentage',
+    'tax_percentage', 'available_rooms', 'blocked_rooms', 'is_available', 'min_stay_nights',
+)
+
+ONE_DAY = timedelta(days=1)
+ZERO = Decimal('0.00')
+
+
+# ---------------------- DEFAULTS ----------------------
+
+def room_type_defaults(room_type_ids):
+    """
+    room type id -> (price_per_night, weekend_surcharge, available_rooms,
+    blocked_rooms) for new availability rows: the base price, the weekend
+    price as a surcharge over it, and the room type's rooms less those
+    blocked. Two queries.
+    """
+    blocked = dict(
+        Room.objects
+        .filter(room_type_id__in=room_type_ids, status='blocked')
+        .order_by()
+        .values('room_type_id')
+        .annotate(count=Count('id'))
+        .values_list('room_type_id', 'count')
+    )
+    defaults = {}
+    for pk, base_price, weekend_price, total_rooms in (
+        RoomType.objects.filter(pk__in=room_type_ids)
+        .values_list('pk', 'base_price', 'weekend_price', 'total_rooms')
+    ):
+        surcharge = max(weekend_price - base_price, ZERO) if weekend_price is not None else ZERO
+        held = blocked.get(pk, 0)
+        defaults[pk] = (base_price, surcharge, max(total_rooms - held, 0), held)
+    return defaults
+
+
+def default_values(defaults, day):
+    """Field values of a new row on day from one room_type_defaults() entry."""
+    price, surcharge, available, blocked = defaults
+    return {
+        'price_per_night': price,
+        'weekend_surcharge': surcharge if day.weekday() in WEEKEND_DAYS else ZERO,
+        'available_rooms': available,
+        'blocked_rooms': blocked,
+    }
+
+
+# ---------------------- EXPANSION ----------------------
+
+def expand_updates(updates):
+    """
+    {(room_type_id, date): {field: value}} for validated updates
+    ({'room_type', 'dates': (first, last), 'weekdays', <RATE_FIELDS>}).
+    Where updates overlap, later ones win field by field.
+    """
+    cells = {}
+    for update in updates:
+        values = {field: update[field] for field in RATE_FIELDS if field in update}
+        weekdays = update.get('weekdays')
+        day, last = update['dates']
+        while day <= last:
+            if weekdays is None or day.weekday() in weekdays:
+                cells.setdefault((update['room_type'], day), {}).update(values)
+            day += ONE_DAY
+    return cells
+
+
+def count_cells(updates):
+    """Upper bound of expand_updates() size, without expanding."""
+    return sum((last - first).days + 1 for first, last in (update['dates'] for update in updates))
+
+
+# ---------------------- UPSERT ----------------------
+
+def apply_inventory(hotel, updates):
+    """
+    Apply a channel-manager push of rate and allotment ranges to a hotel's
+    RoomAvailability in one transaction.
+
+    Existing rows in the pushed window are read once under a row lock, so
+    fields a range leaves out keep their stored values; the changed and new
+    rows are then written with INSERT ... ON CONFLICT (room_type, date) DO
+    UPDATE in batches. Fields a push leaves out of a new row come from the
+    room type (see room_type_defaults()). The hotel calendar is refreshed
+    on commit.
+
+    Returns {'cells', 'created', 'updated', 'unchanged'}.
+    """
+    cells = expand_updates(updates)
+    if not cells:
+        return {'cells': 0, 'created': 0, 'updated': 0, 'unchanged': 0}
+
+    room_type_ids = {room_type_id for room_type_id, _ in cells}
+    dates = {day for _, day in cells}
+    defaults = room_type_defaults(room_type_ids)
+
+    with transaction.atomic():
+        stored = {
+            (row[0], row[1]): dict(zip(RATE_FIELDS, row[2:]))
+            for row in RoomAvailability.objects
+            .select_for_update()
+            .filter(room_type_id__in=room_type_ids, date__gte=min(dates), date__lte=max(dates))
+            .values_list('room_type_id', 'date', *RATE_FIELDS)
+        }
+
+        rows = []
+        created = updated = 0
+        for (room_type_id, day), values in cells.items():
+            current = stored.get((room_type_id, day))
+            if current is None:
+                created += 1
+                values = dict(default_values(defaults[room_type_id], day), **values)
+            elif all(current[field] == value for field, value in values.items()):
+                continue
+            else:
+                updated += 1
+                values = dict(current, **values)
+            rows.append(RoomAvailability(room_type_id=room_type_id, date=day, **values))
+
+        RoomAvailability.objects.bulk_create(
+            rows,
+            batch_size=UPSERT_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['room_type', 'date'],
+            update_fields=RATE_FIELDS,
+        )
+        if rows:
+            changed = {row.date for row in rows}
+            transaction.on_commit(lambda: refresh_calendar([hotel.pk], changed))
+
+    return {'cells': len(cells), 'created': created, 'updated': updated, 'unchanged': len(cells) - created - updated}
+
+
+# ---------------------- ROLLING HORIZON ----------------------
+
+def extend_availability(days=ROLLING_DAYS, today=None, batch_size=ROOM_TYPES_PER_BATCH):
+    """
+    Create the missing RoomAvailability rows of every active room type of
+    an active hotel, so each stays sellable days ahead of today.
+
+    Room types are walked in primary-key batches of batch_size, each in its
+    own transaction: one query finds how far each room type already reaches,
+    and only the dates after that (or the whole horizon, if there are gaps)
+    are generated from room_type_defaults() and executemany()-inserted with
+    ON CONFLICT DO NOTHING. Memory is bounded by the batch, and a nightly
+    run inserts one day per room type.
+
+    Returns {'room_types', 'rows'}.
+    """
+    today = today or timezone.localdate()
+    horizon = [today + timedelta(days=i) for i in range(days)]
+    room_types = (
+        RoomType.objects
+        .filter(is_active=True, hotel__is_active=True)
+        .order_by('pk')
+        .values_list('pk', 'hotel_id')
+    )
+
+    result = {'room_types': 0, 'rows': 0}
+    last = 0
+    while True:
+        batch = list(room_types.filter(pk__gt=last)[:batch_size])
+        if not batch:
+            return result
+        last = batch[-1][0]
+        result['room_types'] += len(batch)
+        result['rows'] += _extend_batch(batch, horizon)
+
+
+def _extend_batch(room_types, horizon):
+    room_type_ids = [pk for pk, _ in room_types]
+    reach = {
+        pk: (latest, count)
+        for pk, latest, count in RoomAvailability.objects
+        .filter(room_type_id__in=room_type_ids, date__gte=horizon[0], date__lte=horizon[-1])
+        .order_by()
+        .values('room_type_id')
+        .annotate(latest=Max('date'), count=Count('id'))
+        .values_list('room_type_id', 'latest', 'count')
+    }
+    defaults = room_type_defaults(room_type_ids)
+
+    new_dates = set()
+    hotel_ids = set()
+    for pk, hotel_id in room_types:
+        missing = _missing_days(horizon, reach.get(pk))
+        if missing:
+            hotel_ids.add(hotel_id)
+            new_dates.update(missing)
+    if not new_dates:
+        return 0
+
+    rows = _new_rows(room_type_ids, horizon, reach, defaults)
+    with transaction.atomic():
+        inserted = insert_ignoring_conflicts(RoomAvailability, INSERT_FIELDS, rows, batch_size=INSERT_BATCH_SIZE)
+        transaction.on_commit(lambda: refresh_calendar(hotel_ids, new_dates))
+    return inserted
+
+
+def _missing_days(horizon, reach):
+    """
+    Days of the sorted horizon to insert for a room type whose rows from
+    horizon[0] reach (latest, count): those after latest, or the whole
+    horizon when there are gaps before it (existing days are skipped by
+    the insert).
+    """
+    if reach is None:
+        return horizon
+    latest, count = reach
+    if count != (latest - horizon[0]).days + 1:
+        return horizon
+    return horizon[bisect_right(horizon, latest):]
+
+
+INSERT_FIELDS = (
+    'room_type', 'date', 'price_per_night', 'weekend_surcharge', 'available_rooms', 'blocked_rooms',
+    'seasonal_surcharge', 'discount_percentage', 'tax_percentage', 'is_available', 'min_stay_nights',
+)
+
+
+def _new_rows(room_type_ids, horizon, reach, defaults):
+    """INSERT_FIELDS rows, adapted for the database, generated lazily."""
+    meta = RoomAvailability._meta
+
+    def prep(name, value):
+        return meta.get_field(name).get_db_prep_save(value, connection)
+
+    dates = {day: prep('date', day) for day in horizon}
+    constants = tuple(
+        prep(name, meta.get_field(name).get_default())
+        for name in ('seasonal_surcharge', 'discount_percentage', 'tax_percentage', 'is_available', 'min_stay_nights')
+    )
+    for pk in room_type_ids:
+        if pk not in defaults:
+            continue
+        price, surcharge, available, blocked = defaults[pk]
+        price = prep('price_per_night', price)
+        weekday_surcharge = prep('weekend_surcharge', ZERO)
+        weekend_surcharge = prep('weekend_surcharge', surcharge)
+        for day in _missing_days(horizon, reach.get(pk)):
+            yield (
+                pk, dates[day], price,
+                weekend_surcharge if day.weekday() in WEEKEND_DAYS else weekday_surcharge,
+                available, blocked,
+            ) + constants
@@ -0,0 +1,45 @@
+"""Synthetic hotel data for the bench_* commands. Run inside a rolled-back transaction."""
+from decimal import Decimal
+
+from apps.common.models import ServiceProvider, User
+from apps.hotels.models import Hotel, RoomType
+
+
+class Rollback(Exception):
+    pass
+
+
+def create_hotel_provider(code='BH'):
+    owner = User.objects.create_user(
+        f"bench-{code}@example.com", None, first_name='Bench', phone_number=f"bench-{code}"
+    )
+    return ServiceProvider.objects.create(
+        owner=owner, name=f"Bench {code}", code=code, provider_type='hotel',
+        country='India', gstin_number='0000000000',
+    )
+
+
+def create_hotels(provider, count, cities=10, fields=None):
+    """count hotels; fields(i) may return values overriding those of hotel i."""
+    return Hotel.objects.bulk_create(
+        (
+            Hotel(**dict(
+                dict(service_provider=provider, name=f"Bench Hotel {i}", slug=f"bench-hotel-{i}",
+                     star_rating=i % 5 + 1, address=f"{i} Bench Road", city=f"City {i % cities}",
+                     state='Bench', pincode='000000', phone='0000000000',
+                     cancellation_policy='Free cancellation', description=f"Bench hotel number {i}"),
+                **(fields(i) if fields else {})
+            ))
+            for i in range(count)
+        ),
+        batch_size=2000,
+    )
+
+
+def create_room_types(hotels, per_hotel, rooms=10):
+    return RoomType.objects.bulk_create(
+        RoomType(hotel=hotel, name=f"Room {n}", slug=f"room-{n}", description='Bench room',
+                 base_price=Decimal(2000 + 500 * n), weekend_price=Decimal(2500 + 500 * n),
+                 total_rooms=rooms)
+        for hotel in hotels for n in range(per_hotel)
+    )
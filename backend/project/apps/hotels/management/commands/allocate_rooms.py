@@ -0,0 +1,40 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.hotels.allocation import allocate_rooms
+from apps.hotels.models import HotelBooking
+
+
+class Command(BaseCommand):
+    help = "Assign physical rooms to the day's confirmed arrivals; run each morning before check-in"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=date.fromisoformat, help="Arrival day, YYYY-MM-DD (default today)")
+        parser.add_argument('--hotel', type=int, action='append', help="Hotel id; repeat for several (default all)")
+        parser.add_argument('--dry-run', action='store_true', help="Plan and report without saving")
+
+    def handle(self, *args, **options):
+        day = options['date'] or timezone.localdate()
+        hotels = options['hotel'] or list(
+            HotelBooking.objects.filter(check_in_date=day, status='confirmed', booking_rooms__room__isnull=True)
+            .order_by('hotel').values_list('hotel', flat=True).distinct()
+        )
+
+        start = time.perf_counter()
+        allocated = unallocated = count = 0
+        for hotel_id in hotels:
+            result = allocate_rooms(hotel_id, day, options['dry_run'])
+            allocated += len(result['allocated'])
+            unallocated += len(result['unallocated'])
+            count += 1
+            for row in result['unallocated']:
+                self.stderr.write(
+                    f"hotel {hotel_id}: no free room of type {row['room_type']} for booking {row['booking']}"
+                )
+        self.stdout.write(
+            f"{allocated} rooms {'planned' if options['dry_run'] else 'allocated'}, {unallocated} without a room "
+            f"at {count} hotels for {day} in {time.perf_counter() - start:.2f}s"
+        )
@@ -0,0 +1,41 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from apps.hotels.inventory import extend_availability
+
+from ._benchdata import Rollback, create_hotel_provider, create_hotels, create_room_types
+
+
+class Command(BaseCommand):
+    help = "Time extend_availability() over synthetic room types (rolled back)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--room-types', type=int, default=2000)
+        parser.add_argument('--days', type=int, default=365)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options['room_types'], options['days'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, room_type_count, days):
+        hotels = create_hotels(create_hotel_provider(), max(room_type_count // 5, 1))
+        create_room_types(hotels, 5)
+        today = timezone.localdate()
+
+        for label, day in (('first run', today), ('next night', today + timedelta(days=1)), ('rerun', today + timedelta(days=1))):
+            start = time.perf_counter()
+            result = extend_availability(days, today=day)
+            elapsed = time.perf_counter() - start
+            rate = result['rows'] / elapsed if elapsed else 0
+            self.stdout.write(
+                f"{label:>10}: {result['room_types']} room types, {result['rows']} rows "
+                f"in {elapsed:.2f}s ({rate:,.0f} rows/s)"
+            )
@@ -0,0 +1,76 @@
+import random
+import time
+import tracemalloc
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from apps.hotels.exports import OUTPUTS, booked_between, render_export
+from apps.hotels.models import BookingRoom, Guest, HotelBooking
+
+from ._benchdata import Rollback, create_hotel_provider, create_hotels, create_room_types
+
+
+class Command(BaseCommand):
+    help = "Time the streamed booking export in each output format (rolled back)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bookings', type=int, default=100000)
+        parser.add_argument('--hotels', type=int, default=100)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options['bookings'], options['hotels'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, booking_count, hotel_count):
+        rng = random.Random(50)
+        hotels = create_hotels(create_hotel_provider(), hotel_count)
+        room_types = {}
+        for room_type in create_room_types(hotels, 3):
+            room_types.setdefault(room_type.hotel_id, []).append(room_type)
+
+        guest = Guest.objects.create(first_name='Bench', last_name='Guest', email='bench@example.com', phone='9999999999')
+        today = timezone.localdate()
+        bookings = HotelBooking.objects.bulk_create(
+            (
+                HotelBooking(booking_reference=f"BENCH{i:010d}", primary_guest=guest, hotel=rng.choice(hotels),
+                             check_in_date=today, check_out_date=today, total_nights=2,
+                             subtotal=Decimal('6000.00'), tax_amount=Decimal('720.00'), total_amount=Decimal('6720.00'),
+                             paid_amount=Decimal('6720.00'), status='confirmed', payment_status='paid',
+                             coupon_code=rng.choice((None, 'WELCOME10')),
+                             contact_email='bench@example.com', contact_phone='9999999999')
+                for i in range(booking_count)
+            ),
+            batch_size=2000,
+        )
+        lines = BookingRoom.objects.bulk_create(
+            (
+                BookingRoom(booking=booking, room_type=rng.choice(room_types[booking.hotel_id]),
+                            room_price_per_night=Decimal('3000.00'), total_room_price=Decimal('6000.00'),
+                            tax_amount=Decimal('720.00'))
+                for booking in bookings for _ in range(rng.randint(1, 2))
+            ),
+            batch_size=2000,
+        )
+        self.stdout.write(f"{len(bookings)} bookings with {len(lines)} lines")
+
+        for output in OUTPUTS:
+            start = time.perf_counter()
+            size = sum(len(chunk) for chunk in render_export(booked_between(today, today), output))
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f"{output:>8}: {len(lines)} rows, {size / 2 ** 20:.1f} MB in {elapsed:.2f}s, {len(lines) / elapsed:.0f} rows/s"
+            )
+
+        tracemalloc.start()
+        for _ in render_export(booked_between(today, today), 'csv'):
+            pass
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self.stdout.write(f"{'memory':>8}: {peak / 2 ** 20:.1f} MB peak while streaming csv")
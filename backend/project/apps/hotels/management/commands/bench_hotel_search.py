@@ -0,0 +1,90 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from apps.hotels.models import Hotel, HotelCalendarDay
+from apps.hotels.rollups import available_for_stay, with_lead_rate
+from apps.hotels.search import rebuild_search_index, search_hotels
+
+from ._benchdata import Rollback, create_hotel_provider, create_hotels
+
+
+NAMES = ('grand', 'royal', 'palace', 'residency', 'inn', 'suites', 'heritage', 'lagoon', 'orchid',
+         'sapphire', 'meridian', 'lotus', 'crown', 'harbour', 'summit', 'garden', 'comfort', 'plaza')
+# Descriptions mix these with filler words from a 5000-word vocabulary
+WORDS = ('pool', 'spa', 'beach', 'rooftop', 'breakfast', 'airport', 'shuttle', 'business', 'family',
+         'quiet', 'lake', 'view', 'fort', 'market', 'station', 'wifi', 'gym', 'restaurant', 'bar', 'sea')
+CITIES = ('Mumbai', 'Delhi', 'Bengaluru', 'Chennai', 'Kolkata', 'Hyderabad', 'Pune', 'Jaipur', 'Goa', 'Udaipur')
+
+QUERIES = (
+    ('name', 'grand palace', {}),
+    ('prefix', 'sapph', {}),
+    ('name + city', 'royal udaipur', {}),
+    ('description', 'rooftop pool', {}),
+    ('typo', 'herritage', {'fuzzy': True}),
+    ('available', 'lotus', {'available': True}),
+    ('cheapest', 'lotus', {'available': True, 'by_price': True}),
+)
+
+
+class Command(BaseCommand):
+    help = "Time hotel full-text search over synthetic hotels (rolled back)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hotels', type=int, default=100000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options['hotels'], options['repeat'], random.Random(options['seed']))
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, hotel_count, repeat, rng):
+        self.stdout.write(f"Creating {hotel_count} hotels...")
+        hotels = create_hotels(create_hotel_provider(), hotel_count, fields=lambda i: {
+            'name': ' '.join(rng.sample(NAMES, 2)).title() + f" {i}",
+            'city': rng.choice(CITIES),
+            'short_description': ' '.join(rng.sample(WORDS, 3)),
+            'description': ' '.join(rng.sample(WORDS, 4) + [f"w{rng.randrange(5000)}" for _ in range(40)]),
+        })
+
+        start = time.perf_counter()
+        rebuild_search_index()
+        self.stdout.write(f"Indexed in {time.perf_counter() - start:.2f}s")
+
+        # Every third hotel free for the bench stay
+        check_in = timezone.localdate() + timedelta(days=7)
+        HotelCalendarDay.objects.bulk_create(
+            HotelCalendarDay(hotel=hotel, date=check_in + timedelta(days=night), available_rooms=3, is_available=True,
+                             min_price=Decimal(rng.randrange(1500, 20000)))
+            for hotel in hotels[::3] for night in range(2)
+        )
+        within = Hotel.objects.filter(is_active=True)
+        available = available_for_stay(within, check_in, check_in + timedelta(days=2))
+
+        for label, query, flags in QUERIES:
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                hotels = search_hotels(
+                    query, available if flags.get('available') else within, fuzzy=flags.get('fuzzy', False),
+                )
+                if flags.get('by_price'):
+                    hotels = with_lead_rate(hotels, check_in).order_by('lead_price')
+                results = list(hotels[:20].values_list('pk', flat=True))
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            self.stdout.write(
+                f"{label:>12} {query!r:>16}: {len(results):>2} results, "
+                f"median {statistics.median(timings):.1f} ms, max {timings[-1]:.1f} ms"
+            )
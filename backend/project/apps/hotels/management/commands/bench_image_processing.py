@@ -0,0 +1,83 @@
+import io
+import struct
+import tempfile
+import time
+
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+
+from apps.hotels.images import process_images
+from apps.hotels.models import HotelImage, RoomTypeImage, StoredImage
+
+from ._benchdata import Rollback, create_hotel_provider, create_hotels, create_room_types
+
+
+def photo(width, height):
+    """A JPEG that compresses like a photo: gradients with sensor-like noise."""
+    from PIL import Image
+
+    noise = Image.effect_noise((width, height), 24)
+    base = Image.merge('RGB', (
+        Image.linear_gradient('L').resize((width, height)),
+        noise,
+        Image.linear_gradient('L').rotate(90).resize((width, height)),
+    ))
+    buffer = io.BytesIO()
+    base.save(buffer, format='JPEG', quality=90)
+    return buffer.getvalue()
+
+
+def unique(data, i):
+    """data with a JPEG comment making its bytes, and so its hash, distinct."""
+    comment = f"bench photo {i}".encode()
+    return data[:2] + b'\xff\xfe' + struct.pack('>H', len(comment) + 2) + comment + data[2:]
+
+
+class Command(BaseCommand):
+    help = "Time photo uploads and variant generation for a backlog of photos (rolled back, temporary media)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--images', type=int, default=10000, help="Distinct hotel photos uploaded")
+        parser.add_argument('--shared', type=int, default=5,
+                            help="Photos uploaded again for every room type, to be stored once")
+        parser.add_argument('--room-types', type=int, default=20)
+        parser.add_argument('--size', default='3000x2000', help="Original WIDTHxHEIGHT")
+        parser.add_argument('--workers', type=int, help="Resizing processes (default one per CPU)")
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as media, override_settings(MEDIA_ROOT=media):
+            try:
+                with transaction.atomic():
+                    self.run(options)
+                    raise Rollback
+            except Rollback:
+                pass
+
+    def run(self, options):
+        hotel = create_hotels(create_hotel_provider(), 1)[0]
+        room_types = create_room_types([hotel], options['room_types'])
+        width, height = (int(side) for side in options['size'].split('x'))
+        data = photo(width, height)
+
+        start = time.perf_counter()
+        for i in range(options['images']):
+            HotelImage.objects.create(hotel=hotel, image=ContentFile(unique(data, i), name=f"photo-{i}.jpg"))
+        for room_type in room_types:
+            for i in range(options['shared']):
+                RoomTypeImage.objects.create(room_type=room_type, image=ContentFile(unique(data, i), name=f"room-{i}.jpg"))
+        uploads = options['images'] + options['shared'] * len(room_types)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f"  upload: {uploads} photos of {len(data) / 1e6:.1f} MB stored as {StoredImage.objects.count()} "
+            f"in {elapsed:.2f}s, {1000 * elapsed / uploads:.1f} ms per request"
+        )
+
+        start = time.perf_counter()
+        result = process_images(workers=options['workers'])
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f" process: {result['processed']} photos, {result['variants']} variants, {result['failed']} failed "
+            f"in {elapsed:.1f}s, {result['processed'] / elapsed:.1f} photos/s"
+        )
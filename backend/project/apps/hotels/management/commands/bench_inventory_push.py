@@ -0,0 +1,65 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from apps.hotels.inventory import apply_inventory
+from apps.hotels.rollups import refresh_calendar
+
+from ._benchdata import Rollback, create_hotel_provider, create_hotels, create_room_types
+
+
+class Command(BaseCommand):
+    help = "Time apply_inventory() for full-year channel-manager pushes (rolled back)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--room-types', type=int, default=20)
+        parser.add_argument('--days', type=int, default=365)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options['room_types'], options['days'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, room_type_count, days):
+        hotel = create_hotels(create_hotel_provider(), 1)[0]
+        room_types = create_room_types([hotel], room_type_count)
+        first = timezone.localdate() + timedelta(days=1)
+        last = first + timedelta(days=days - 1)
+
+        def push(price, available, min_stay):
+            # A season split in three ranges per room type, as channel managers send them
+            middle = first + timedelta(days=days // 2)
+            return [
+                {'room_type': room_type.pk, 'dates': dates, 'price_per_night': price + offset,
+                 'available_rooms': available, 'min_stay_nights': min_stay}
+                for room_type in room_types
+                for offset, dates in ((0, (first, middle)), (500, (middle + timedelta(days=1), last)))
+            ] + [
+                {'room_type': room_type.pk, 'dates': (first, last), 'weekdays': {4, 5}, 'weekend_surcharge': 750}
+                for room_type in room_types
+            ]
+
+        for label, updates in (
+            ('initial load', push(8000, 5, 1)),
+            ('same push', push(8000, 5, 1)),
+            ('full change', push(8500, 4, 2)),
+        ):
+            start = time.perf_counter()
+            with transaction.atomic():
+                result = apply_inventory(hotel, updates)
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f"{label:>12}: {result['cells']} cells, {result['created']} created, "
+                f"{result['updated']} updated in {elapsed:.3f}s"
+            )
+
+        # Runs on commit in production; the bench transaction never commits
+        start = time.perf_counter()
+        written = refresh_calendar([hotel.pk], [first + timedelta(days=i) for i in range(days)])
+        self.stdout.write(f"{'calendar':>12}: {written} days refreshed in {time.perf_counter() - start:.3f}s")
@@ -0,0 +1,61 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.hotels.models import HotelReview
+from apps.hotels.reviews import ingest_reviews, reconcile_ratings
+
+from ._benchdata import Rollback, create_hotel_provider, create_hotels
+
+
+class Command(BaseCommand):
+    help = "Time single review saves, bulk review ingestion and reconciliation (rolled back)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hotels', type=int, default=1000)
+        parser.add_argument('--reviews', type=int, default=100000, help="Reviews bulk-ingested")
+        parser.add_argument('--single', type=int, default=2000, help="Reviews saved one at a time")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options['hotels'], options['reviews'], options['single'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, hotel_count, review_count, single_count):
+        rng = random.Random(47)
+        hotels = [hotel.pk for hotel in create_hotels(create_hotel_provider(), hotel_count)]
+
+        start = time.perf_counter()
+        for _ in range(single_count):
+            with transaction.atomic():
+                HotelReview.objects.create(hotel_id=rng.choice(hotels), rating=rng.randint(1, 5))
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f"{'single':>9}: {single_count} reviews in {elapsed:.2f}s, {single_count / elapsed:.0f}/s")
+
+        def imported(offset):
+            # A few popular hotels get most reviews, as on review sites
+            for i in range(review_count):
+                yield HotelReview(
+                    hotel_id=hotels[min(int(rng.paretovariate(1.2)) - 1, hotel_count - 1)],
+                    rating=rng.randint(1, 5), source='bench', external_id=str(offset + i),
+                )
+
+        for label in ('ingest', 're-import'):
+            start = time.perf_counter()
+            result = ingest_reviews(imported(0))
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f"{label:>9}: {result['created']} created, {result['skipped']} skipped over "
+                f"{result['hotels']} hotel updates in {elapsed:.2f}s, {review_count / elapsed:.0f}/s"
+            )
+
+        start = time.perf_counter()
+        drifted = reconcile_ratings()
+        self.stdout.write(
+            f"{'reconcile':>9}: {hotel_count} hotels, {len(drifted)} drifted in {time.perf_counter() - start:.2f}s"
+        )
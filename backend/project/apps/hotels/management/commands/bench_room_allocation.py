@@ -0,0 +1,74 @@
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from apps.hotels.allocation import allocate_rooms
+from apps.hotels.models import BookingRoom, Guest, HotelBooking, Room
+
+from ._benchdata import Rollback, create_hotel_provider, create_hotels, create_room_types
+
+
+class Command(BaseCommand):
+    help = "Time allocate_rooms() for a day of arrivals at a large hotel (rolled back)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--arrivals', type=int, default=1000)
+        parser.add_argument('--room-types', type=int, default=8)
+        parser.add_argument('--future', type=int, default=500, help="Later bookings already holding a room")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options['arrivals'], options['room_types'], options['future'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, arrival_count, room_type_count, future_count):
+        rng = random.Random(49)
+        today = timezone.localdate()
+        hotel = create_hotels(create_hotel_provider(), 1)[0]
+        # A fifth more rooms than arrivals, so a few preferences cannot be met
+        per_type = arrival_count * 6 // 5 // room_type_count + 1
+        room_types = create_room_types([hotel], room_type_count, rooms=per_type)
+        rooms = Room.objects.bulk_create(
+            Room(room_type=room_type, room_number=f"{n + 1:04d}", floor=n % 20 + 1,
+                 is_smoking_allowed=n % 7 == 0, bed_type=rng.choice(('', '', 'twin', 'king')))
+            for room_type in room_types for n in range(per_type)
+        )
+
+        guest = Guest.objects.create(first_name='Bench', last_name='Guest', email='bench@example.com', phone='9999999999')
+        stays = [(today, today + timedelta(days=rng.randint(1, 7)), rng.choice(room_types), None)
+                 for _ in range(arrival_count)]
+        stays += [(today + timedelta(days=rng.randint(2, 10)), today + timedelta(days=12), room.room_type, room)
+                  for room in rng.sample(rooms, future_count)]
+        bookings = HotelBooking.objects.bulk_create(
+            HotelBooking(booking_reference=f"BENCH{i:010d}", primary_guest=guest, hotel=hotel,
+                         check_in_date=check_in, check_out_date=check_out, total_nights=(check_out - check_in).days,
+                         subtotal=Decimal('3000'), total_amount=Decimal('3000'), status='confirmed',
+                         contact_email='bench@example.com', contact_phone='9999999999')
+            for i, (check_in, check_out, _, _) in enumerate(stays)
+        )
+        BookingRoom.objects.bulk_create(
+            BookingRoom(booking=booking, room_type=room_type, room=room,
+                        room_price_per_night=Decimal('3000'), total_room_price=Decimal('3000'),
+                        smoking_preference=rng.random() < 0.1,
+                        bed_preference=rng.choice((None, None, 'twin', 'King Bed')),
+                        floor_preference=rng.choice((None, None, 'high', 'low', str(rng.randint(1, 20)))))
+            for booking, (_, _, room_type, room) in zip(bookings, stays)
+        )
+
+        for label, dry_run in (('dry run', True), ('allocate', False), ('re-run', False)):
+            start = time.perf_counter()
+            result = allocate_rooms(hotel, today, dry_run)
+            elapsed = time.perf_counter() - start
+            missed = sum(bool(row['missed']) for row in result['allocated'])
+            self.stdout.write(
+                f"{label:>9}: {len(result['allocated'])} allocated ({missed} missing a wish), "
+                f"{len(result['unallocated'])} without a room in {elapsed:.3f}s"
+            )
@@ -0,0 +1,36 @@
+import sys
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.hotels.exports import OUTPUTS, booked_between, render_export
+
+
+class Command(BaseCommand):
+    help = "Stream the bookings made on a range of days, with their room lines, for finance"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date-from', type=date.fromisoformat, help="First booking day (default yesterday)")
+        parser.add_argument('--date-to', type=date.fromisoformat, help="Last booking day (default --date-from)")
+        parser.add_argument('--hotel', type=int, action='append', help="Hotel id; repeat for several (default all)")
+        parser.add_argument('--output', choices=list(OUTPUTS), default='csv')
+        parser.add_argument('--file', help="Write to this file instead of stdout")
+
+    def handle(self, *args, **options):
+        date_from = options['date_from'] or timezone.localdate() - timedelta(days=1)
+        date_to = options['date_to'] or date_from
+        if date_to < date_from:
+            raise CommandError("--date-to must not be before --date-from")
+
+        binary = options['output'] == 'parquet'
+        if options['file']:
+            out = open(options['file'], 'wb') if binary else open(options['file'], 'w', newline='')
+        else:
+            out = sys.stdout.buffer if binary else sys.stdout
+        try:
+            for chunk in render_export(booked_between(date_from, date_to, options['hotel']), options['output']):
+                out.write(chunk)
+        finally:
+            if options['file']:
+                out.close()
@@ -0,0 +1,23 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.hotels.inventory import ROLLING_DAYS, ROOM_TYPES_PER_BATCH, extend_availability
+
+
+class Command(BaseCommand):
+    help = "Create missing RoomAvailability rows so active room types stay sellable (run nightly)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=ROLLING_DAYS)
+        parser.add_argument('--date-from', type=date.fromisoformat, default=None)
+        parser.add_argument('--batch-size', type=int, default=ROOM_TYPES_PER_BATCH)
+
+    def handle(self, *args, **options):
+        if options['days'] < 1 or options['batch_size'] < 1:
+            raise CommandError("--days and --batch-size must be at least 1")
+        start = time.perf_counter()
+        result = extend_availability(options['days'], options['date_from'], options['batch_size'])
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f"{result['room_types']} room types, {result['rows']} rows created in {elapsed:.2f}s")
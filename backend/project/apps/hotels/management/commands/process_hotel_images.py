@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.hotels.images import link_existing_images, process_images
+
+
+class Command(BaseCommand):
+    help = "Generate thumbnails and responsive variants of uploaded hotel and room type photos"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, help="Resizing processes (default one per CPU)")
+        parser.add_argument('--limit', type=int, help="Stop after this many images")
+        parser.add_argument('--link-existing', action='store_true',
+                            help="First queue photos uploaded before variants were generated")
+        parser.add_argument('--watch', type=float, metavar='SECONDS',
+                            help="Keep running, looking for new uploads every SECONDS")
+
+    def handle(self, *args, **options):
+        if options['link_existing']:
+            start = time.perf_counter()
+            linked = link_existing_images()
+            self.stdout.write(
+                f"{linked['linked']} images linked to {linked['stored']} new stored photos, "
+                f"{linked['unreadable']} unreadable skipped in {time.perf_counter() - start:.2f}s"
+            )
+
+        while True:
+            start = time.perf_counter()
+            result = process_images(limit=options['limit'], workers=options['workers'])
+            if result['processed'] or result['failed'] or not options['watch']:
+                elapsed = time.perf_counter() - start
+                self.stdout.write(
+                    f"{result['processed']} images processed, {result['failed']} failed, "
+                    f"{result['variants']} variants in {elapsed:.2f}s"
+                )
+            if not options['watch']:
+                return
+            time.sleep(options['watch'])
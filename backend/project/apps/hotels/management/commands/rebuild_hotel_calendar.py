@@ -0,0 +1,31 @@
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+
+from apps.hotels.models import Hotel
+from apps.hotels.rollups import HOTELS_PER_BATCH, refresh_calendar
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-day hotel calendar from RoomAvailability"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hotel', type=int, action='append', help="Hotel id; repeat for several (default all)")
+        parser.add_argument('--date-from', type=date.fromisoformat, default=date.today())
+        parser.add_argument('--days', type=int, default=365)
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        dates = [options['date_from'] + timedelta(days=i) for i in range(options['days'])]
+        hotels = Hotel.objects.order_by('pk').values_list('pk', flat=True)
+        if options['hotel']:
+            hotels = hotels.filter(pk__in=options['hotel'])
+
+        hotel_ids = list(hotels)
+        written = 0
+        for i in range(0, len(hotel_ids), HOTELS_PER_BATCH):
+            written += refresh_calendar(hotel_ids[i:i + HOTELS_PER_BATCH], dates)
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f"{len(hotel_ids)} hotels, {written} calendar days written in {elapsed:.2f}s")
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.hotels.ranking import refresh_ranking
+
+
+class Command(BaseCommand):
+    help = "Recompute Hotel.ranking_score, the default search order; run nightly"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--city', action='append', help="City; repeat for several (default all)")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        result = refresh_ranking(options['city'])
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f"{result['hotels']} hotels in {result['cities']} cities ranked, "
+            f"{result['updated']} scores changed in {elapsed:.2f}s"
+        )
@@ -0,0 +1,16 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.hotels.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text hotel search index from the hotel table"
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        with transaction.atomic():
+            rebuild_search_index()
+        self.stdout.write(f"Search index rebuilt in {time.perf_counter() - start:.2f}s")
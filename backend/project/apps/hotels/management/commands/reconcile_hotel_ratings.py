@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.hotels.reviews import reconcile_ratings
+
+
+class Command(BaseCommand):
+    help = (
+        "Check Hotel.total_reviews / rating_total / average_rating against the published "
+        "reviews plus legacy ratings and report drift; run periodically"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help="Rewrite drifted hotels from their reviews and legacy ratings")
+        parser.add_argument('--fail', action='store_true', help="Exit with an error if any hotel drifted")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        drifted = reconcile_ratings(fix=options['fix'])
+        for row in drifted[:50]:
+            self.stdout.write(
+                f"hotel {row['hotel']}: {row['total_reviews']} reviews / {row['rating_total']} "
+                f"(avg {row['average_rating']}), expected {row['expected_reviews']} / "
+                f"{row['expected_total']} (avg {row['expected_average']})"
+            )
+        action = 'fixed' if options['fix'] else 'found'
+        self.stdout.write(f"{len(drifted)} drifted hotels {action} in {time.perf_counter() - start:.2f}s")
+        if options['fail'] and drifted and not options['fix']:
+            raise CommandError(f"{len(drifted)} hotels have drifted rating aggregates.")
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-19 13:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HotelCalendarDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('min_price', models.DecimalField(blank=True, decimal_places=2, help_text='Lowest final price of a sellable room type; empty when sold out', max_digits=12, null=True)),
+                ('available_rooms', models.PositiveIntegerField(default=0)),
+                ('is_available', models.BooleanField(default=False)),
+                ('hotel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='calendar_days', to='hotels.hotel')),
+            ],
+            options={
+                'verbose_name': 'Hotel Calendar Day',
+                'verbose_name_plural': 'Hotel Calendar Days',
+                'ordering': ['hotel', 'date'],
+                'unique_together': {('hotel', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,61 @@
+from django.db import migrations
+
+
+SQLITE = [
+    "CREATE VIRTUAL TABLE hotels_hotel_search USING fts5("
+    "name, city, short_description, description, "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE VIRTUAL TABLE hotels_hotel_search_vocab USING fts5vocab(hotels_hotel_search, 'row')",
+    # Name matches count most, then city, tagline and description
+    "INSERT INTO hotels_hotel_search (hotels_hotel_search, rank) VALUES ('rank', 'bm25(10.0, 5.0, 2.0, 1.0)')",
+    "INSERT INTO hotels_hotel_search (rowid, name, city, short_description, description) "
+    "SELECT id, name, city, COALESCE(short_description, ''), description FROM hotels_hotel",
+]
+
+SQLITE_REVERSE = [
+    "DROP TABLE hotels_hotel_search_vocab",
+    "DROP TABLE hotels_hotel_search",
+]
+
+POSTGRES = [
+    "CREATE TABLE hotels_hotel_search ("
+    "hotel_id bigint PRIMARY KEY REFERENCES hotels_hotel (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+    "document tsvector NOT NULL)",
+    "CREATE INDEX hotels_hotel_search_document ON hotels_hotel_search USING gin (document)",
+    "CREATE TABLE hotels_hotel_search_word (word text PRIMARY KEY)",
+    "CREATE INDEX hotels_hotel_search_word_like ON hotels_hotel_search_word (word text_pattern_ops)",
+    "INSERT INTO hotels_hotel_search (hotel_id, document) "
+    "SELECT id, setweight(to_tsvector('simple', name), 'A') || "
+    "setweight(to_tsvector('simple', city), 'B') || "
+    "setweight(to_tsvector('simple', COALESCE(short_description, '')), 'C') || "
+    "setweight(to_tsvector('simple', description), 'D') FROM hotels_hotel",
+    "INSERT INTO hotels_hotel_search_word (word) "
+    "SELECT DISTINCT unnest(tsvector_to_array(document)) FROM hotels_hotel_search",
+]
+
+POSTGRES_REVERSE = [
+    "DROP TABLE hotels_hotel_search_word",
+    "DROP TABLE hotels_hotel_search",
+]
+
+
+def run(statements):
+    def apply(apps, schema_editor):
+        for sql in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+    return apply
+
+
+class Migration(migrations.Migration):
+    """Full-text index of hotels; see apps.hotels.search."""
+
+    dependencies = [
+        ('hotels', '0002_hotel_calendar'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({'sqlite': SQLITE, 'postgresql': POSTGRES}),
+            run({'sqlite': SQLITE_REVERSE, 'postgresql': POSTGRES_REVERSE}),
+        ),
+    ]
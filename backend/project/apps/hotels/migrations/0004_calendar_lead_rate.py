@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 14:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0003_hotel_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hotelcalendarday',
+            name='lead_room_type',
+            field=models.ForeignKey(blank=True, help_text='Room type selling at min_price', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='hotels.roomtype'),
+        ),
+        migrations.AddIndex(
+            model_name='hotelcalendarday',
+            index=models.Index(fields=['date', 'min_price'], name='hotels_hote_date_2d545d_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-19 14:08
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0004_calendar_lead_rate'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='hotel',
+            options={'ordering': ['-ranking_score', 'name'], 'verbose_name': 'Hotel', 'verbose_name_plural': 'Hotels'},
+        ),
+        migrations.AddField(
+            model_name='hotel',
+            name='ranking_score',
+            field=models.FloatField(default=0, help_text='Default sort order, recomputed by rebuild_hotel_ranking'),
+        ),
+        migrations.AddIndex(
+            model_name='hotel',
+            index=models.Index(django.db.models.functions.text.Lower('city'), models.OrderBy(models.F('ranking_score'), descending=True), name='hotel_city_ranking_idx'),
+        ),
+    ]
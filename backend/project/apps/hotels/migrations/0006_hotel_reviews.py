@@ -0,0 +1,54 @@
+# Generated by Django 5.2.7 on 2026-10-19 14:12
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+from django.db.models.functions import Round
+
+
+def backfill_rating_total(apps, schema_editor):
+    # Hotels rated before reviews were stored keep their average as new reviews arrive
+    Hotel = apps.get_model('hotels', 'Hotel')
+    Hotel.objects.update(rating_total=Round(F('average_rating') * F('total_reviews')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0005_hotel_ranking_score'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hotel',
+            name='rating_total',
+            field=models.PositiveIntegerField(default=0, help_text='Sum of published review ratings; see reviews.py'),
+        ),
+        migrations.RunPython(backfill_rating_total, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='HotelReview',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating', models.PositiveSmallIntegerField(validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5)])),
+                ('title', models.CharField(blank=True, max_length=200)),
+                ('comment', models.TextField(blank=True)),
+                ('is_published', models.BooleanField(default=True)),
+                ('source', models.CharField(default='website', max_length=50)),
+                ('external_id', models.CharField(blank=True, max_length=100, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('booking', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='review', to='hotels.hotelbooking')),
+                ('hotel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to='hotels.hotel')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='hotel_reviews', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Hotel Review',
+                'verbose_name_plural': 'Hotel Reviews',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['hotel', '-created_at'], name='hotels_hote_hotel_i_0fcebd_idx')],
+                'constraints': [models.UniqueConstraint(fields=('source', 'external_id'), name='hotels_hotelreview_source_external_id_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.7 on 2026-10-19 14:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0006_hotel_reviews'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(help_text='Hash of the uploaded file', max_length=64, unique=True)),
+                ('original', models.ImageField(upload_to='images/%Y/%m/')),
+                ('width', models.PositiveIntegerField(blank=True, null=True)),
+                ('height', models.PositiveIntegerField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], db_index=True, default='pending', max_length=20)),
+                ('variants', models.JSONField(blank=True, default=dict, help_text="{name: {'name', 'width', 'height'}}")),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Stored Image',
+                'verbose_name_plural': 'Stored Images',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='hotelimage',
+            name='stored',
+            field=models.ForeignKey(blank=True, help_text='Set from image on save; see images.py', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='hotels.storedimage'),
+        ),
+        migrations.AddField(
+            model_name='roomtypeimage',
+            name='stored',
+            field=models.ForeignKey(blank=True, help_text='Set from image on save; see images.py', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='hotels.storedimage'),
+        ),
+    ]
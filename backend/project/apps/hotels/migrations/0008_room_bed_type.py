@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 14:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0007_stored_images'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='room',
+            name='bed_type',
+            field=models.CharField(blank=True, choices=[('single', 'Single Bed'), ('double', 'Double Bed'), ('queen', 'Queen Bed'), ('king', 'King Bed'), ('twin', 'Twin Beds')], help_text="When this room's beds differ from its room type's", max_length=20),
+        ),
+    ]
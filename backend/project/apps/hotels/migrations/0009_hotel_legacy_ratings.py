@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:14
+
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+
+def backfill_legacy_ratings(apps, schema_editor):
+    # What the aggregates count beyond the stored reviews was rated before
+    # reviews were stored (see 0006); keep it as a baseline for reconciliation
+    Hotel = apps.get_model('hotels', 'Hotel')
+    HotelReview = apps.get_model('hotels', 'HotelReview')
+    published = HotelReview.objects.filter(hotel=OuterRef('pk'), is_published=True).order_by().values('hotel')
+    count = Coalesce(Subquery(published.annotate(n=Count('pk')).values('n')), Value(0))
+    total = Coalesce(Subquery(published.annotate(n=Sum('rating')).values('n')), Value(0))
+    Hotel.objects.update(
+        legacy_reviews=Greatest(F('total_reviews') - count, Value(0)),
+        legacy_rating_total=Greatest(F('rating_total') - total, Value(0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0008_room_bed_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hotel',
+            name='legacy_rating_total',
+            field=models.PositiveIntegerField(default=0, help_text='Part of rating_total with no HotelReview row'),
+        ),
+        migrations.AddField(
+            model_name='hotel',
+            name='legacy_reviews',
+            field=models.PositiveIntegerField(default=0, help_text='Part of total_reviews with no HotelReview row'),
+        ),
+        migrations.RunPython(backfill_legacy_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotels', '0009_hotel_legacy_ratings'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='hotelreview',
+            constraint=models.UniqueConstraint(fields=('hotel', 'user'), name='hotels_hotelreview_hotel_user_uniq'),
+        ),
+    ]
@@ -4,6 +4,8 @@ from apps.common.models import ServiceProvider
 
 
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Lower
 from django.core.validators import MinValueValidator, MaxValueValidator, RegexValidator
 from django.utils.translation import gettext_lazy as _
 from decimal import Decimal
@@ -85,30 +87,76 @@ class Hotel(models.Model):
     average_rating = models.DecimalField( max_digits=3, decimal_places=2, default=Decimal('0.00'), validators=[MinValueValidator(0), MaxValueValidator(5)])
 
     total_reviews = models.PositiveIntegerField(default=0)
+    rating_total = models.PositiveIntegerField(default=0, help_text="Sum of published review ratings; see reviews.py")
+    # Ratings counted before HotelReview rows were stored; reconciliation adds these to the reviews
+    legacy_reviews = models.PositiveIntegerField(default=0, help_text="Part of total_reviews with no HotelReview row")
+    legacy_rating_total = models.PositiveIntegerField(default=0, help_text="Part of rating_total with no HotelReview row")
     
     # Rooms
     total_rooms = models.PositiveIntegerField(default=0)
+
+    # Ranking
+    ranking_score = models.FloatField(default=0, help_text="Default sort order, recomputed by rebuild_hotel_ranking")
     
     class Meta:
-        ordering = ['-is_featured', 'name']
+        ordering = ['-ranking_score', 'name']
         verbose_name = _('Hotel')
         verbose_name_plural = _('Hotels')
         indexes = [
             models.Index(fields=['city', 'is_active']),
             models.Index(fields=['name', 'city']),
             models.Index(fields=['-average_rating']),
+            # Cities are matched case-insensitively; see ranking.in_city()
+            models.Index(Lower('city'), F('ranking_score').desc(), name='hotel_city_ranking_idx'),
         ]
     
     def __str__(self):
         return f"{self.name} - {self.city}"
 
 
+# ------------------- Stored Images --------------------
+
+class StoredImage(models.Model):
+    """
+    One uploaded photo, stored once however many HotelImage and
+    RoomTypeImage rows show it, with the resized variants generated for it
+    by images.process_images()
+    """
+    sha256 = models.CharField(max_length=64, unique=True, help_text="Hash of the uploaded file")
+    original = models.ImageField(upload_to='images/%Y/%m/')
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    ]
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', db_index=True)
+    variants = models.JSONField(default=dict, blank=True, help_text="{name: {'name', 'width', 'height'}}")
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = _('Stored Image')
+        verbose_name_plural = _('Stored Images')
+
+    def __str__(self):
+        return f"{self.original.name} ({self.status})"
+
+
 # ------------------- Hotel Images --------------------
 
 class HotelImage(models.Model):
     """Hotel property images"""
     hotel = models.ForeignKey(Hotel, on_delete=models.CASCADE, related_name='images')
     image = models.ImageField(upload_to='hotels/%Y/%m/')
+    stored = models.ForeignKey( StoredImage, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', help_text="Set from image on save; see images.py" )
     caption = models.CharField(max_length=200, blank=True, null=True)
     is_primary = models.BooleanField(default=False)
     display_order = models.PositiveIntegerField(default=0)
@@ -250,6 +298,7 @@ class RoomTypeImage(models.Model):
    
     room_type = models.ForeignKey(RoomType, on_delete=models.CASCADE, related_name='images')
     image = models.ImageField(upload_to='room_types_media/%Y/%m/')
+    stored = models.ForeignKey( StoredImage, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', help_text="Set from image on save; see images.py" )
     caption = models.CharField(max_length=200, blank=True, null=True)
     is_primary = models.BooleanField(default=False)
     display_order = models.PositiveIntegerField(default=0)
@@ -317,6 +366,7 @@ class Room(models.Model):
     ]
     status = models.CharField(max_length=20,choices=STATUS_CHOICES,default='available',db_index=True)    
     is_smoking_allowed = models.BooleanField(default=False)
+    bed_type = models.CharField( max_length=20, choices=RoomType.BED_TYPE_CHOICES, blank=True, help_text="When this room's beds differ from its room type's" )
 
     
     class Meta:
@@ -368,18 +418,54 @@ class RoomAvailability(models.Model):
             models.Index(fields=['date', 'is_available']),
         ]
     
+    @staticmethod
+    def price_after_charges(price_per_night, weekend_surcharge, seasonal_surcharge, discount_percentage, tax_percentage):
+        """final_price from raw column values, for callers reading values_list() rows"""
+        base = price_per_night + weekend_surcharge + seasonal_surcharge
+        discounted = base - (base * discount_percentage / 100)
+        tax = discounted * tax_percentage / 100
+        return discounted + tax
+
     @property
     def final_price(self):
         """Calculate final price after all charges and discounts"""
-        base = self.price_per_night + self.weekend_surcharge + self.seasonal_surcharge
-        discounted = base - (base * self.discount_percentage / 100)
-        tax = discounted * self.tax_percentage / 100
-        return discounted + tax
+        return self.price_after_charges(
+            self.price_per_night, self.weekend_surcharge, self.seasonal_surcharge,
+            self.discount_percentage, self.tax_percentage,
+        )
     
     def __str__(self):
         return f"{self.room_type.name} on {self.date}"
 
 
+#----------------------- Hotel Calendar (Daily Rollup) -------------------------
+
+class HotelCalendarDay(models.Model):
+    """
+    Per-hotel daily summary of RoomAvailability for the month grid and the
+    "from" price of search results, kept current by rollups.refresh_calendar()
+    """
+    hotel = models.ForeignKey(Hotel, on_delete=models.CASCADE, related_name='calendar_days')
+    date = models.DateField()
+
+    min_price = models.DecimalField( max_digits=12, decimal_places=2, null=True, blank=True, help_text="Lowest final price of a sellable room type; empty when sold out" )
+    lead_room_type = models.ForeignKey( RoomType, on_delete=models.SET_NULL, null=True, blank=True, related_name='+', help_text="Room type selling at min_price" )
+    available_rooms = models.PositiveIntegerField(default=0)
+    is_available = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ['hotel', 'date']
+        verbose_name = _('Hotel Calendar Day')
+        verbose_name_plural = _('Hotel Calendar Days')
+        unique_together = [['hotel', 'date']]
+        indexes = [
+            models.Index(fields=['date', 'min_price']),
+        ]
+
+    def __str__(self):
+        return f"{self.hotel.name} on {self.date}"
+
+
 
 # --------------------- Guest ------------------------
 
@@ -440,6 +526,8 @@ class Guest(models.Model):
 
 class HotelBooking(models.Model):
     """Main booking record"""
+    booking_reference = models.CharField( max_length=15, unique=True, db_index=True, help_text="Unique booking reference number" )
+
     # Guest Info
     primary_guest = models.ForeignKey( Guest, on_delete=models.CASCADE, related_name='primary_bookings' )
     
@@ -566,3 +654,42 @@ class BookingRoom(models.Model):
     
     def __str__(self):
         return f"{self.booking.booking_reference} - {self.room_type.name}"
+
+
+# --------------------- Hotel Reviews ---------------------
+
+class HotelReview(models.Model):
+    """
+    Guest review of a hotel. Published ratings are counted into
+    Hotel.total_reviews / rating_total / average_rating by reviews.py.
+    """
+    hotel = models.ForeignKey(Hotel, on_delete=models.CASCADE, related_name='reviews')
+    user = models.ForeignKey( User, on_delete=models.SET_NULL, null=True, blank=True, related_name='hotel_reviews' )
+    booking = models.OneToOneField( HotelBooking, on_delete=models.SET_NULL, null=True, blank=True, related_name='review' )
+
+    rating = models.PositiveSmallIntegerField(validators=[MinValueValidator(1), MaxValueValidator(5)])
+    title = models.CharField(max_length=200, blank=True)
+    comment = models.TextField(blank=True)
+    is_published = models.BooleanField(default=True)
+
+    # Imported reviews keep their id at the source, so a re-run import skips them
+    source = models.CharField(max_length=50, default='website')
+    external_id = models.CharField(max_length=100, null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = _('Hotel Review')
+        verbose_name_plural = _('Hotel Reviews')
+        indexes = [
+            models.Index(fields=['hotel', '-created_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'external_id'], name='hotels_hotelreview_source_external_id_uniq'),
+            # One review per guest and hotel; imported reviews have no user
+            models.UniqueConstraint(fields=['hotel', 'user'], name='hotels_hotelreview_hotel_user_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.hotel.name} - {self.rating}/5"
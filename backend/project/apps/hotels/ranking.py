@@ -0,0 +1,143 @@
+import math
+from datetime import timedelta
+from itertools import groupby
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from apps.common.bulk import update_by_id
+from .models import Hotel, HotelBooking
+
+
+# Share of the score each signal contributes; the score runs from 0 to 100
+RANKING_WEIGHTS = getattr(settings, 'HOTEL_RANKING_WEIGHTS', {
+    'rating': 0.35,
+    'reviews': 0.15,
+    'bookings': 0.20,
+    'stars': 0.10,
+    'distance': 0.10,
+    'verified': 0.05,
+    'featured': 0.05,
+})
+
+# Bookings made in this many days count towards a hotel's popularity
+BOOKING_WINDOW_DAYS = getattr(settings, 'HOTEL_RANKING_BOOKING_DAYS', 90)
+
+# A rating counts at face value once it has about this many reviews; fewer
+# pull it towards the city's average, so one 5-star review does not top the list
+PRIOR_REVIEWS = getattr(settings, 'HOTEL_RANKING_PRIOR_REVIEWS', 20)
+
+# Distance from the city centre at which the location signal halves
+HALF_DISTANCE_KM = 5
+
+BOOKED_STATUSES = ('confirmed', 'checked_in', 'checked_out')
+
+CITIES_PER_BATCH = 50
+UPDATE_BATCH_SIZE = 1000
+
+
+def in_city(hotels, city):
+    """hotels in city, any case, through the (city, ranking_score) index."""
+    return hotels.alias(city_key=Lower('city')).filter(city_key=city.lower())
+
+
+# ---------------------- SCORING ----------------------
+
+def _share(count, most):
+    """count on a log scale against the city's most, 0 to 1."""
+    return math.log1p(count) / math.log1p(most) if most else 0.0
+
+
+def city_scores(hotels, bookings):
+    """
+    {hotel id: score} for the hotels of one city, given as (id, average_rating,
+    total_reviews, star_rating, verified, distance_from_city_center_km,
+    is_featured) rows. Review and booking counts are weighed against the
+    city's busiest hotel, so small towns rank on the same 0-100 scale as
+    metros.
+    """
+    reviews = sum(row[2] for row in hotels)
+    mean = sum(float(row[1]) * row[2] for row in hotels) / reviews if reviews else 0.0
+    most_reviews = max(row[2] for row in hotels)
+    most_bookings = max(bookings.get(row[0], 0) for row in hotels)
+
+    scores = {}
+    for hotel_id, rating, review_count, stars, verified, distance, featured in hotels:
+        rating = (float(rating) * review_count + mean * PRIOR_REVIEWS) / (review_count + PRIOR_REVIEWS)
+        distance = HALF_DISTANCE_KM if distance is None else float(distance)
+        signals = {
+            'rating': rating / 5,
+            'reviews': _share(review_count, most_reviews),
+            'bookings': _share(bookings.get(hotel_id, 0), most_bookings),
+            'stars': stars / 5,
+            'distance': HALF_DISTANCE_KM / (HALF_DISTANCE_KM + distance),
+            'verified': float(verified),
+            'featured': float(featured),
+        }
+        scores[hotel_id] = round(100 * sum(RANKING_WEIGHTS[name] * value for name, value in signals.items()), 4)
+    return scores
+
+
+def recent_bookings(since, hotel_ids=None):
+    """{hotel id: bookings made since since that were not cancelled}"""
+    bookings = HotelBooking.objects.filter(booked_at__gte=since, status__in=BOOKED_STATUSES)
+    if hotel_ids is not None:
+        bookings = bookings.filter(hotel_id__in=hotel_ids)
+    return dict(bookings.order_by().values('hotel').annotate(count=Count('pk')).values_list('hotel', 'count'))
+
+
+# ---------------------- BATCH JOB ----------------------
+
+def refresh_ranking(cities=None, now=None):
+    """
+    Recompute Hotel.ranking_score for every hotel, or those of cities.
+
+    Cities are read CITIES_PER_BATCH at a time, each hotel scored against
+    its own city, and only changed scores are written. Returns {'cities',
+    'hotels', 'updated'}.
+    """
+    now = now or timezone.now()
+    keyed = Hotel.objects.alias(city_key=Lower('city'))
+    if cities:
+        keys = sorted({city.lower() for city in cities})
+    else:
+        keys = list(
+            Hotel.objects.annotate(city_key=Lower('city')).order_by('city_key')
+            .values_list('city_key', flat=True).distinct()
+        )
+
+    since = now - timedelta(days=BOOKING_WINDOW_DAYS)
+    result = {'cities': 0, 'hotels': 0, 'updated': 0}
+    for i in range(0, len(keys), CITIES_PER_BATCH):
+        hotels = keyed.filter(city_key__in=keys[i:i + CITIES_PER_BATCH])
+        bookings = recent_bookings(since, hotels.values('pk'))
+        rows = (
+            hotels.annotate(key=Lower('city')).order_by('key', 'pk')
+            .values_list(
+                'key', 'id', 'average_rating', 'total_reviews', 'star_rating', 'verified',
+                'distance_from_city_center_km', 'is_featured', 'ranking_score',
+            )
+        )
+        changed = []
+        for _, city_rows in groupby(rows, key=lambda row: row[0]):
+            city_rows = list(city_rows)
+            current = {row[1]: row[-1] for row in city_rows}
+            scores = city_scores([row[1:-1] for row in city_rows], bookings)
+            changed.extend((score, pk) for pk, score in scores.items() if current[pk] != score)
+            result['cities'] += 1
+            result['hotels'] += len(city_rows)
+        _save_scores(changed)
+        result['updated'] += len(changed)
+    return result
+
+
+def _save_scores(changed):
+    """
+    Write the (score, hotel id) pairs. Sends no post_save, so the search
+    index is left alone.
+    """
+    with transaction.atomic():
+        update_by_id(Hotel, 'ranking_score', changed, batch_size=UPDATE_BATCH_SIZE)
@@ -0,0 +1,191 @@
+from collections import defaultdict
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, F, FloatField, Sum, Value, When
+from django.db.models.functions import Cast
+
+from .models import Hotel, HotelReview
+
+
+INGEST_BATCH_SIZE = 1000
+HOTELS_PER_BATCH = 1000
+
+CENT = Decimal('0.01')
+
+
+# ---------------------- AGGREGATES ----------------------
+
+def apply_rating_deltas(deltas):
+    """
+    Add {hotel id: (reviews, rating sum)} to the hotels' running
+    total_reviews and rating_total, and recompute average_rating from them,
+    with one UPDATE per hotel.
+
+    The arithmetic happens in the database (F() expressions), so concurrent
+    writers never overwrite each other, and hotels are updated in id order
+    so two batches cannot deadlock. Call this last in a transaction: the
+    hotel row stays locked from the UPDATE until the commit.
+    """
+    for hotel_id in sorted(deltas):
+        count, total = deltas[hotel_id]
+        if not count and not total:
+            continue
+        new_count = F('total_reviews') + count
+        new_total = F('rating_total') + total
+        Hotel.objects.filter(pk=hotel_id).update(
+            total_reviews=new_count,
+            rating_total=new_total,
+            average_rating=Case(
+                When(total_reviews__lte=-count, then=Value(Decimal('0.00'))),
+                default=Cast(Cast(new_total, FloatField()) / new_count, DecimalField(max_digits=3, decimal_places=2)),
+                output_field=DecimalField(max_digits=3, decimal_places=2),
+            ),
+        )
+
+
+def counted(review):
+    """(reviews, rating sum) the review contributes to its hotel's aggregates."""
+    return (1, review.rating) if review.is_published else (0, 0)
+
+
+# ---------------------- INGESTION ----------------------
+
+def ingest_reviews(reviews, batch_size=INGEST_BATCH_SIZE):
+    """
+    Bulk-import unsaved HotelReview instances. Reviews whose (source,
+    external_id) is already stored are skipped, so a re-run import adds
+    nothing.
+
+    Each batch is one transaction: an existence check, a bulk insert, then
+    one aggregate UPDATE per hotel in the batch, so hotel rows are locked
+    only for the final statements of each batch. Returns {'created',
+    'skipped', 'hotels'}.
+    """
+    result = {'created': 0, 'skipped': 0, 'hotels': 0}
+    batch = []
+    for review in reviews:
+        batch.append(review)
+        if len(batch) >= batch_size:
+            _ingest(batch, result)
+            batch = []
+    if batch:
+        _ingest(batch, result)
+    return result
+
+
+def _ingest(batch, result):
+    keyed = defaultdict(set)
+    for review in batch:
+        if review.external_id is not None:
+            keyed[review.source].add(review.external_id)
+
+    with transaction.atomic():
+        existing = set()
+        for source, external_ids in keyed.items():
+            existing.update(
+                (source, external_id) for external_id in HotelReview.objects
+                .filter(source=source, external_id__in=external_ids)
+                .values_list('external_id', flat=True)
+            )
+        new, seen = [], set()
+        for review in batch:
+            key = (review.source, review.external_id)
+            if review.external_id is not None and (key in existing or key in seen):
+                continue
+            seen.add(key)
+            new.append(review)
+        HotelReview.objects.bulk_create(new)
+
+        deltas = defaultdict(lambda: [0, 0])
+        for review in new:
+            count, total = counted(review)
+            deltas[review.hotel_id][0] += count
+            deltas[review.hotel_id][1] += total
+        apply_rating_deltas(deltas)
+
+    result['created'] += len(new)
+    result['skipped'] += len(batch) - len(new)
+    result['hotels'] += len(deltas)
+
+
+# ---------------------- RECONCILIATION ----------------------
+
+def reconcile_ratings(fix=False, batch_size=HOTELS_PER_BATCH):
+    """
+    Compare every hotel's running aggregates with its published reviews plus
+    its legacy baseline (ratings counted before reviews were stored) and
+    report the hotels that drifted, as [{'hotel', 'total_reviews',
+    'rating_total', 'average_rating', 'expected_reviews', 'expected_total',
+    'expected_average'}].
+
+    Hotels are checked batch_size at a time without locks. With fix=True
+    each drifted hotel is locked and rewritten from a fresh count. A batch
+    being ingested at the time adds its delta after the lock is released,
+    so its reviews are not counted twice.
+    """
+    drifted = []
+    last = 0
+    while True:
+        hotels = list(
+            Hotel.objects.filter(pk__gt=last).order_by('pk')
+            .values_list('pk', 'total_reviews', 'rating_total', 'average_rating',
+                         'legacy_reviews', 'legacy_rating_total')[:batch_size]
+        )
+        if not hotels:
+            return drifted
+        last = hotels[-1][0]
+        actual = _published_totals([row[0] for row in hotels])
+        for pk, count, total, average, legacy_count, legacy_total in hotels:
+            published = actual.get(pk, (0, 0))
+            expected = (legacy_count + published[0], legacy_total + published[1])
+            expected_average = expected_average_of(published, expected, average)
+            # Databases round a half cent differently, so the average may be a cent off
+            if (count, total) != expected or abs(average - expected_average) > CENT:
+                drifted.append({
+                    'hotel': pk, 'total_reviews': count, 'rating_total': total, 'average_rating': average,
+                    'expected_reviews': expected[0], 'expected_total': expected[1],
+                    'expected_average': expected_average,
+                })
+                if fix:
+                    _fix(pk)
+
+
+def average_of(count, total):
+    return (Decimal(total) / count).quantize(CENT, ROUND_HALF_UP) if count else Decimal('0.00')
+
+
+def expected_average_of(published, expected, average):
+    """
+    average_rating the hotel should have. Until its first stored review a
+    legacy-rated hotel keeps the average it was imported with, which
+    rating_total only approximates (it is rounded to a whole sum).
+    """
+    if not published[0] and expected[0]:
+        return average
+    return average_of(*expected)
+
+
+def _published_totals(hotel_ids):
+    return {
+        hotel_id: (count, total or 0)
+        for hotel_id, count, total in HotelReview.objects
+        .filter(hotel_id__in=hotel_ids, is_published=True)
+        .order_by().values('hotel')
+        .annotate(count=Count('pk'), total=Sum('rating'))
+        .values_list('hotel', 'count', 'total')
+    }
+
+
+def _fix(hotel_id):
+    with transaction.atomic():
+        average, legacy_count, legacy_total = (
+            Hotel.objects.select_for_update().filter(pk=hotel_id)
+            .values_list('average_rating', 'legacy_reviews', 'legacy_rating_total').get()
+        )
+        published = _published_totals([hotel_id]).get(hotel_id, (0, 0))
+        count, total = legacy_count + published[0], legacy_total + published[1]
+        Hotel.objects.filter(pk=hotel_id).update(
+            total_reviews=count, rating_total=total,
+            average_rating=expected_average_of(published, (count, total), average),
+        )
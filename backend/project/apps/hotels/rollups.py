@@ -0,0 +1,146 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, FilteredRelation, OuterRef, Q, Subquery
+
+from .models import HotelCalendarDay, RoomAvailability
+
+
+HOTELS_PER_BATCH = 200
+READ_CHUNK_SIZE = 5000
+
+CENT = Decimal('0.01')
+ONE_DAY = timedelta(days=1)
+
+CALENDAR_FIELDS = ('min_price', 'lead_room_type', 'available_rooms', 'is_available')
+
+
+# ---------------------- HOTEL CALENDAR ----------------------
+
+def refresh_calendar(hotel_ids, dates):
+    """
+    Recompute the HotelCalendarDay rows of hotel_ids on dates from
+    RoomAvailability: days are upserted, and days left without any
+    availability rows are removed. Two reads and one upsert per batch of
+    HOTELS_PER_BATCH hotels.
+
+    Single-row saves are picked up by signals; bulk writers call this
+    themselves. Returns the number of calendar days written.
+    """
+    hotel_ids = sorted(set(hotel_ids))
+    dates = set(dates)
+    if not hotel_ids or not dates:
+        return 0
+
+    written = 0
+    for i in range(0, len(hotel_ids), HOTELS_PER_BATCH):
+        written += _refresh(hotel_ids[i:i + HOTELS_PER_BATCH], dates)
+    return written
+
+
+def _refresh(hotel_ids, dates):
+    rows = (
+        RoomAvailability.objects
+        .filter(room_type__hotel_id__in=hotel_ids, date__gte=min(dates), date__lte=max(dates))
+        .values_list(
+            'room_type__hotel_id', 'date', 'room_type_id', 'available_rooms', 'is_available', 'room_type__is_active',
+            'price_per_night', 'weekend_surcharge', 'seasonal_surcharge', 'discount_percentage', 'tax_percentage',
+        )
+    )
+
+    days = {}
+    for hotel_id, day, room_type_id, rooms, is_available, active, *price in rows.iterator(chunk_size=READ_CHUNK_SIZE):
+        if day not in dates:
+            continue
+        summary = days.setdefault((hotel_id, day), [None, 0])
+        if is_available and active and rooms:
+            lead = (RoomAvailability.price_after_charges(*price), room_type_id)
+            if summary[0] is None or lead < summary[0]:
+                summary[0] = lead
+            summary[1] += rooms
+
+    with transaction.atomic():
+        stale = [
+            pk for pk, hotel_id, day in HotelCalendarDay.objects
+            .filter(hotel_id__in=hotel_ids, date__gte=min(dates), date__lte=max(dates))
+            .values_list('pk', 'hotel_id', 'date')
+            if day in dates and (hotel_id, day) not in days
+        ]
+        if stale:
+            HotelCalendarDay.objects.filter(pk__in=stale).delete()
+        HotelCalendarDay.objects.bulk_create(
+            [
+                HotelCalendarDay(
+                    hotel_id=hotel_id, date=day,
+                    min_price=lead[0].quantize(CENT) if lead else None,
+                    lead_room_type_id=lead[1] if lead else None,
+                    available_rooms=rooms, is_available=rooms > 0,
+                )
+                for (hotel_id, day), (lead, rooms) in days.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['hotel', 'date'],
+            update_fields=CALENDAR_FIELDS,
+            batch_size=1000,
+        )
+    return len(days)
+
+
+def calendar_days(hotel_id, date_from, date_to):
+    """
+    Every day from date_from up to (not including) date_to as {'date',
+    'min_price', 'available_rooms', 'is_available'}; days without
+    inventory are unavailable. One read of the (hotel, date) index.
+    """
+    stored = {
+        row['date']: row
+        for row in HotelCalendarDay.objects
+        .filter(hotel_id=hotel_id, date__gte=date_from, date__lt=date_to)
+        .values('date', 'min_price', 'available_rooms', 'is_available')
+    }
+    days = []
+    day = date_from
+    while day < date_to:
+        days.append(stored.get(day) or {'date': day, 'min_price': None, 'available_rooms': 0, 'is_available': False})
+        day += ONE_DAY
+    return days
+
+
+def available_for_stay(hotels, date_from, date_to, rooms=1):
+    """
+    hotels (a Hotel queryset) narrowed to those with at least rooms sellable
+    rooms on every night from date_from up to (not including) date_to.
+
+    The check is a correlated read of each hotel's calendar days on the
+    (hotel, date) index, so a ranked or sliced queryset stops checking once
+    it has enough hotels instead of scanning every hotel's calendar.
+    """
+    nights = (
+        HotelCalendarDay.objects
+        .filter(hotel=OuterRef('pk'), date__gte=date_from, date__lt=date_to,
+                is_available=True, available_rooms__gte=rooms)
+        .order_by()
+        .values('hotel')
+        .annotate(count=Count('pk'))
+        .values('count')
+    )
+    return hotels.annotate(available_nights=Subquery(nights)).filter(available_nights=(date_to - date_from).days)
+
+
+def with_lead_rate(hotels, day):
+    """
+    hotels (a Hotel queryset) annotated with lead_price and
+    lead_room_type_id / lead_room_type_name, the cheapest sellable room
+    on day, through one join on the calendar's (hotel, date) index. Sort or
+    filter on lead_price like any column; sold-out hotels have none.
+    """
+    return (
+        hotels
+        .annotate(lead=FilteredRelation('calendar_days', condition=Q(calendar_days__date=day)))
+        .annotate(
+            lead_price=F('lead__min_price'),
+            lead_room_type_id=F('lead__lead_room_type_id'),
+            lead_room_type_name=F('lead__lead_room_type__name'),
+        )
+    )
@@ -0,0 +1,296 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+
+from .models import Hotel
+
+
+SEARCH_TABLE = 'hotels_hotel_search'
+
+MAX_TERMS = 8
+INDEX_BATCH_SIZE = 500
+
+# Typo tolerance: misspelt terms are matched to indexed words of similar
+# length sharing their first letter, within this many edits
+TYPO_CANDIDATES = getattr(settings, 'HOTEL_SEARCH_TYPO_CANDIDATES', 5)
+
+WORD = re.compile(r'[^\W_]+')
+
+
+def terms_of(query):
+    """Lower-cased words of a user query, at most MAX_TERMS."""
+    return WORD.findall(query.lower())[:MAX_TERMS]
+
+
+def max_edits(term):
+    return 1 if len(term) <= 5 else 2
+
+
+def within_edits(a, b, limit):
+    """Levenshtein distance of a and b is at most limit."""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        current = [i]
+        for j, cb in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return False
+        previous = current
+    return previous[-1] <= limit
+
+
+# ---------------------- BACKENDS ----------------------
+
+class SearchBackend:
+    """
+    Full-text index of Hotel name, city, short_description and description.
+
+    Subclasses keep one row per hotel in SEARCH_TABLE (created by migration
+    0003) and answer ranked queries against it. Name matches rank above
+    city, tagline and description matches.
+    """
+
+    def index(self, hotel_ids):
+        """(Re)index the given hotels from the hotel table."""
+        raise NotImplementedError
+
+    def remove(self, hotel_ids):
+        raise NotImplementedError
+
+    def rebuild(self):
+        raise NotImplementedError
+
+    def filter(self, queryset, groups):
+        """
+        queryset (of Hotel) restricted to hotels matching groups and ordered
+        best match first, with the score as search_rank. groups is a list of
+        word groups that must all match, each matching any of its (word,
+        prefix) pairs. The index is joined in, so the queryset's own filters
+        apply in the same query.
+        """
+        raise NotImplementedError
+
+    def words(self, start):
+        """Indexed words beginning with start."""
+        raise NotImplementedError
+
+    def has_word(self, term, prefix):
+        raise NotImplementedError
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """FTS5 table whose rowid is the hotel id, plus an fts5vocab table of its words."""
+
+    def index(self, hotel_ids):
+        hotel_ids = list(hotel_ids)
+        placeholders = ', '.join(['%s'] * len(hotel_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})", hotel_ids)
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} (rowid, name, city, short_description, description) "
+                f"SELECT id, name, city, COALESCE(short_description, ''), description "
+                f"FROM {Hotel._meta.db_table} WHERE id IN ({placeholders})",
+                hotel_ids,
+            )
+
+    def remove(self, hotel_ids):
+        hotel_ids = list(hotel_ids)
+        placeholders = ', '.join(['%s'] * len(hotel_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})", hotel_ids)
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} (rowid, name, city, short_description, description) "
+                f"SELECT id, name, city, COALESCE(short_description, ''), description FROM {Hotel._meta.db_table}"
+            )
+            cursor.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')")
+
+    def filter(self, queryset, groups):
+        match = ' AND '.join(
+            '(' + ' OR '.join(f'"{word}"' + ('*' if prefix else '') for word, prefix in group) + ')'
+            for group in groups
+        )
+        # rank is bm25() with the column weights set by migration 0003
+        return queryset.extra(
+            tables=[SEARCH_TABLE],
+            where=[f"{SEARCH_TABLE}.rowid = {Hotel._meta.db_table}.id", f"{SEARCH_TABLE} MATCH %s"],
+            params=[match],
+            select={'search_rank': f"-{SEARCH_TABLE}.rank"},
+            order_by=[f"{SEARCH_TABLE}.rank"],
+        )
+
+    def words(self, start):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT term FROM {SEARCH_TABLE}_vocab WHERE term >= %s AND term < %s",
+                [start, start[:-1] + chr(ord(start[-1]) + 1)],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def has_word(self, term, prefix):
+        with connection.cursor() as cursor:
+            if prefix:
+                cursor.execute(
+                    f"SELECT 1 FROM {SEARCH_TABLE}_vocab WHERE term >= %s AND term < %s LIMIT 1",
+                    [term, term[:-1] + chr(ord(term[-1]) + 1)],
+                )
+            else:
+                cursor.execute(f"SELECT 1 FROM {SEARCH_TABLE}_vocab WHERE term = %s", [term])
+            return cursor.fetchone() is not None
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    tsvector per hotel under a GIN index, weighted A (name) to D
+    (description), plus a table of every indexed word for typo tolerance.
+    Uses the 'simple' configuration, like FTS5's unicode61 tokenizer.
+    """
+
+    DOCUMENT = (
+        "setweight(to_tsvector('simple', name), 'A') || "
+        "setweight(to_tsvector('simple', city), 'B') || "
+        "setweight(to_tsvector('simple', COALESCE(short_description, '')), 'C') || "
+        "setweight(to_tsvector('simple', description), 'D')"
+    )
+
+    def index(self, hotel_ids):
+        hotel_ids = list(hotel_ids)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} (hotel_id, document) "
+                f"SELECT id, {self.DOCUMENT} FROM {Hotel._meta.db_table} WHERE id = ANY(%s) "
+                f"ON CONFLICT (hotel_id) DO UPDATE SET document = EXCLUDED.document",
+                [hotel_ids],
+            )
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE}_word (word) "
+                f"SELECT DISTINCT unnest(tsvector_to_array(document)) FROM {SEARCH_TABLE} "
+                f"WHERE hotel_id = ANY(%s) ON CONFLICT DO NOTHING",
+                [hotel_ids],
+            )
+
+    def remove(self, hotel_ids):
+        # Words stay behind; a typo matched to one simply finds nothing
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE hotel_id = ANY(%s)", [list(hotel_ids)])
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {SEARCH_TABLE}, {SEARCH_TABLE}_word")
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} (hotel_id, document) "
+                f"SELECT id, {self.DOCUMENT} FROM {Hotel._meta.db_table}"
+            )
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE}_word (word) "
+                f"SELECT DISTINCT unnest(tsvector_to_array(document)) FROM {SEARCH_TABLE}"
+            )
+
+    def filter(self, queryset, groups):
+        tsquery = ' & '.join(
+            '(' + ' | '.join(word + (':*' if prefix else '') for word, prefix in group) + ')'
+            for group in groups
+        )
+        return queryset.extra(
+            tables=[SEARCH_TABLE],
+            where=[
+                f"{SEARCH_TABLE}.hotel_id = {Hotel._meta.db_table}.id",
+                f"{SEARCH_TABLE}.document @@ to_tsquery('simple', %s)",
+            ],
+            params=[tsquery],
+            select={'search_rank': f"ts_rank_cd({SEARCH_TABLE}.document, to_tsquery('simple', %s))"},
+            select_params=[tsquery],
+            order_by=['-search_rank'],
+        )
+
+    def words(self, start):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT word FROM {SEARCH_TABLE}_word WHERE word LIKE %s", [start + '%'])
+            return [row[0] for row in cursor.fetchall()]
+
+    def has_word(self, term, prefix):
+        with connection.cursor() as cursor:
+            if prefix:
+                cursor.execute(f"SELECT 1 FROM {SEARCH_TABLE}_word WHERE word LIKE %s LIMIT 1", [term + '%'])
+            else:
+                cursor.execute(f"SELECT 1 FROM {SEARCH_TABLE}_word WHERE word = %s", [term])
+            return cursor.fetchone() is not None
+
+
+BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def search_backend():
+    try:
+        return BACKENDS[connection.vendor]()
+    except KeyError:
+        raise NotImplementedError(f"Hotel search is not implemented for {connection.vendor}.")
+
+
+# ---------------------- SERVICES ----------------------
+
+def index_hotels(hotel_ids):
+    """(Re)index hotels after they are saved. Bulk writers call this themselves."""
+    hotel_ids = list(hotel_ids)
+    backend = search_backend()
+    for start in range(0, len(hotel_ids), INDEX_BATCH_SIZE):
+        backend.index(hotel_ids[start:start + INDEX_BATCH_SIZE])
+
+
+def remove_hotels(hotel_ids):
+    hotel_ids = list(hotel_ids)
+    backend = search_backend()
+    for start in range(0, len(hotel_ids), INDEX_BATCH_SIZE):
+        backend.remove(hotel_ids[start:start + INDEX_BATCH_SIZE])
+
+
+def rebuild_search_index():
+    search_backend().rebuild()
+
+
+def close_words(backend, term):
+    """Indexed words within max_edits() of term, sharing its first letter."""
+    limit = max_edits(term)
+    candidates = [
+        word for word in backend.words(term[0])
+        if abs(len(word) - len(term)) <= limit and within_edits(term, word, limit)
+    ]
+    candidates.sort(key=lambda word: abs(len(word) - len(term)))
+    return candidates[:TYPO_CANDIDATES]
+
+
+def search_hotels(query, queryset=None, prefix=True, fuzzy=False):
+    """
+    Hotels of queryset (default all) matching every word of query, best
+    first, annotated with search_rank. Compose availability, city or
+    activity filters on the queryset; they run in the same query as the
+    index lookup.
+
+    The last word matches as a prefix, for search as you type, unless
+    prefix=False. With fuzzy=True a word no indexed hotel contains is
+    replaced by the indexed words within one or two edits of it.
+    """
+    queryset = Hotel.objects.all() if queryset is None else queryset
+    terms = terms_of(query)
+    if not terms:
+        return queryset.none()
+
+    backend = search_backend()
+    groups = []
+    for index, term in enumerate(terms):
+        # Only the word being typed is a prefix; earlier ones are complete
+        as_prefix = prefix and index == len(terms) - 1
+        group = [(term, as_prefix)]
+        if fuzzy and not backend.has_word(term, as_prefix):
+            group.extend((word, False) for word in close_words(backend, term))
+        groups.append(group)
+    return backend.filter(queryset, groups)
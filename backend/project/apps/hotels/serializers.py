@@ -0,0 +1,238 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+from rest_framework import serializers
+
+from apps.common.serializers import UniqueConstraintErrorsMixin
+from .exports import OUTPUTS
+from .images import image_urls
+from .inventory import HORIZON_DAYS, MAX_CELLS, RATE_FIELDS, count_cells
+from .models import Hotel, HotelBooking, HotelImage, HotelReview, RoomTypeImage
+
+
+MAX_STAY_NIGHTS = 30
+
+
+# ---------------------- HOTEL CALENDAR ----------------------
+
+class CalendarQuerySerializer(serializers.Serializer):
+    month = serializers.DateField(input_formats=['%Y-%m'], required=False, help_text="First month, YYYY-MM")
+    months = serializers.IntegerField(min_value=1, max_value=3, default=1)
+
+
+class CalendarDaySerializer(serializers.Serializer):
+    """A day of rollups.calendar_days(), prices formatted as in search results."""
+    date = serializers.DateField()
+    min_price = serializers.DecimalField(max_digits=12, decimal_places=2, allow_null=True)
+    available_rooms = serializers.IntegerField()
+    is_available = serializers.BooleanField()
+
+
+# ---------------------- SEARCH ----------------------
+
+class HotelSearchSerializer(serializers.Serializer):
+    SORT_CHOICES = ['relevance', 'recommended', 'price', '-price']
+
+    q = serializers.CharField(max_length=200, required=False)
+    city = serializers.CharField(max_length=100, required=False)
+    check_in = serializers.DateField(required=False)
+    check_out = serializers.DateField(required=False)
+    rooms = serializers.IntegerField(min_value=1, max_value=10, default=1)
+    fuzzy = serializers.BooleanField(default=False, help_text="Tolerate typos")
+    min_price = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=Decimal('0'), required=False)
+    max_price = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=Decimal('0'), required=False)
+    sort = serializers.ChoiceField(choices=SORT_CHOICES, required=False,
+                                   help_text="Default relevance with a search text, else recommended")
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=20)
+
+    def validate(self, data):
+        if not data.get('q') and not data.get('city'):
+            raise serializers.ValidationError("Give a search text (q) or a city.")
+        check_in, check_out = data.get('check_in'), data.get('check_out')
+        if (check_in is None) != (check_out is None):
+            raise serializers.ValidationError("Give both check_in and check_out, or neither.")
+        if check_in is not None:
+            if check_out <= check_in:
+                raise serializers.ValidationError({"check_out": "Check-out must be after check-in."})
+            if (check_out - check_in).days > MAX_STAY_NIGHTS:
+                raise serializers.ValidationError({"check_out": f"Stays are limited to {MAX_STAY_NIGHTS} nights."})
+        elif 'min_price' in data or 'max_price' in data or data.get('sort') in ('price', '-price'):
+            raise serializers.ValidationError("Prices need check_in and check_out.")
+        if data.get('sort') == 'relevance' and not data.get('q'):
+            raise serializers.ValidationError({"sort": "Relevance needs a search text (q)."})
+        return data
+
+
+# Hotel columns HotelSearchResultSerializer reads; the search loads only these
+SEARCH_RESULT_COLUMNS = (
+    'id', 'name', 'slug', 'city', 'star_rating', 'average_rating', 'total_reviews', 'short_description',
+)
+
+
+class HotelSearchResultSerializer(serializers.ModelSerializer):
+    rank = serializers.FloatField(source='search_rank', allow_null=True, read_only=True)
+    lead_price = serializers.DecimalField(max_digits=12, decimal_places=2, allow_null=True, read_only=True,
+                                          help_text="Cheapest room on the check-in night")
+    lead_room_type = serializers.IntegerField(source='lead_room_type_id', allow_null=True, read_only=True)
+    lead_room_type_name = serializers.CharField(allow_null=True, read_only=True)
+    image = serializers.SerializerMethodField(help_text="Primary photo URLs, from primary_images")
+
+    class Meta:
+        model = Hotel
+        fields = [*SEARCH_RESULT_COLUMNS, 'rank', 'lead_price', 'lead_room_type', 'lead_room_type_name', 'image']
+
+    def get_image(self, hotel):
+        images = getattr(hotel, 'primary_images', None)
+        if not images:
+            return None
+        return image_urls(images[0].stored, images[0].image, self.context.get('request'))
+
+
+# ---------------------- IMAGES ----------------------
+
+class ImageUrlsField(serializers.Field):
+    """{'original', 'thumb', 'small', ...} URLs of a HotelImage / RoomTypeImage; variants appear once processed"""
+
+    def __init__(self, **kwargs):
+        kwargs.update(source='*', read_only=True)
+        super().__init__(**kwargs)
+
+    def to_representation(self, image):
+        return image_urls(image.stored, image.image, self.context.get('request'))
+
+
+class HotelImageSerializer(serializers.ModelSerializer):
+    urls = ImageUrlsField()
+
+    class Meta:
+        model = HotelImage
+        fields = ['id', 'caption', 'image_type', 'is_primary', 'display_order', 'urls']
+
+
+class RoomTypeImageSerializer(serializers.ModelSerializer):
+    urls = ImageUrlsField()
+
+    class Meta:
+        model = RoomTypeImage
+        fields = ['id', 'room_type', 'caption', 'is_primary', 'display_order', 'urls']
+
+
+# ---------------------- CHANNEL MANAGER ----------------------
+
+class DateRangeField(serializers.CharField):
+    """'YYYY-MM-DD..YYYY-MM-DD' (inclusive) or a single date, as (first, last)"""
+
+    def to_internal_value(self, data):
+        value = super().to_internal_value(data)
+        first, _, last = value.partition('..')
+        try:
+            first = date.fromisoformat(first.strip())
+            last = date.fromisoformat(last.strip()) if last else first
+        except ValueError:
+            raise serializers.ValidationError("Use YYYY-MM-DD..YYYY-MM-DD or a single YYYY-MM-DD.")
+        if last < first:
+            raise serializers.ValidationError("The range ends before it starts.")
+        today = timezone.localdate()
+        if first < today:
+            raise serializers.ValidationError("Past dates cannot be changed.")
+        if last > today + timedelta(days=HORIZON_DAYS):
+            raise serializers.ValidationError(f"Dates more than {HORIZON_DAYS} days ahead cannot be loaded.")
+        return first, last
+
+    def to_representation(self, value):
+        return f"{value[0].isoformat()}..{value[1].isoformat()}"
+
+
+class InventoryUpdateSerializer(serializers.Serializer):
+    room_type = serializers.IntegerField()
+    dates = DateRangeField()
+    weekdays = serializers.ListField(
+        child=serializers.IntegerField(min_value=0, max_value=6), required=False, allow_empty=False,
+        help_text="Only these days of the range, Monday=0",
+    )
+
+    price_per_night = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.01'), required=False)
+    weekend_surcharge = serializers.DecimalField(max_digits=8, decimal_places=2, min_value=Decimal('0'), required=False)
+    seasonal_surcharge = serializers.DecimalField(max_digits=8, decimal_places=2, min_value=Decimal('0'), required=False)
+    discount_percentage = serializers.DecimalField(max_digits=5, decimal_places=2, min_value=Decimal('0'), max_value=Decimal('100'), required=False)
+    tax_percentage = serializers.DecimalField(max_digits=5, decimal_places=2, min_value=Decimal('0'), max_value=Decimal('100'), required=False)
+    available_rooms = serializers.IntegerField(min_value=0, required=False)
+    blocked_rooms = serializers.IntegerField(min_value=0, required=False)
+    is_available = serializers.BooleanField(required=False)
+    min_stay_nights = serializers.IntegerField(min_value=1, required=False)
+
+    def validate(self, data):
+        if not any(field in data for field in RATE_FIELDS):
+            raise serializers.ValidationError("Give at least one rate or inventory value.")
+        if 'weekdays' in data:
+            data['weekdays'] = set(data['weekdays'])
+        return data
+
+
+class BulkInventorySerializer(serializers.Serializer):
+    """Channel-manager push for the hotel in context['hotel']"""
+    updates = InventoryUpdateSerializer(many=True, allow_empty=False)
+
+    def validate_updates(self, updates):
+        own = set(self.context['hotel'].room_types.values_list('pk', flat=True))
+        foreign = sorted({update['room_type'] for update in updates} - own)
+        if foreign:
+            raise serializers.ValidationError(f"Room types {foreign} do not belong to this hotel.")
+        if count_cells(updates) > MAX_CELLS:
+            raise serializers.ValidationError(f"A push may cover at most {MAX_CELLS} room-type days.")
+        return updates
+
+
+# ---------------------- REVIEWS ----------------------
+
+class ReviewQuerySerializer(serializers.Serializer):
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=20)
+
+
+class HotelReviewSerializer(UniqueConstraintErrorsMixin, serializers.ModelSerializer):
+    """Review of context['hotel'] by the requesting user, for one of their stays there."""
+    user_name = serializers.CharField(source='user.first_name', read_only=True, default=None)
+    booking = serializers.PrimaryKeyRelatedField(queryset=HotelBooking.objects.select_related('primary_guest'))
+
+    unique_errors = {
+        'hotels_hotelreview_hotel_user_uniq': ('non_field_errors', "You have already reviewed this hotel."),
+        'booking': ('booking', "This booking has already been reviewed."),
+    }
+
+    class Meta:
+        model = HotelReview
+        fields = ['id', 'rating', 'title', 'comment', 'booking', 'user_name', 'created_at']
+        read_only_fields = ['created_at']
+        validators = []
+
+    def validate_booking(self, booking):
+        request = self.context['request']
+        if booking.hotel_id != self.context['hotel'].pk or booking.primary_guest.user_id != request.user.pk:
+            raise serializers.ValidationError("Not one of your bookings at this hotel.")
+        if booking.status not in ('checked_in', 'checked_out'):
+            raise serializers.ValidationError("Only stays that went ahead can be reviewed.")
+        return booking
+
+
+# ---------------------- ROOM ALLOCATION ----------------------
+
+class AllocationSerializer(serializers.Serializer):
+    date = serializers.DateField(required=False, help_text="Arrival day (default today)")
+    dry_run = serializers.BooleanField(default=False)
+
+
+# ---------------------- BOOKING EXPORT ----------------------
+
+class BookingExportSerializer(serializers.Serializer):
+    date_from = serializers.DateField(required=False, help_text="First booking day (default yesterday)")
+    date_to = serializers.DateField(required=False, help_text="Last booking day (default date_from)")
+    hotel = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False)
+    output = serializers.ChoiceField(choices=list(OUTPUTS), default='csv')
+
+    def validate(self, data):
+        data.setdefault('date_from', timezone.localdate() - timedelta(days=1))
+        data.setdefault('date_to', data['date_from'])
+        if data['date_to'] < data['date_from']:
+            raise serializers.ValidationError({"date_to": "The last day must not be before the first."})
+        return data
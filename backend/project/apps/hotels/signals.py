@@ -0,0 +1,135 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .images import attach_upload
+from .models import Hotel, HotelCalendarDay, HotelImage, HotelReview, RoomAvailability, RoomType, RoomTypeImage
+from .reviews import apply_rating_deltas, counted
+from .rollups import refresh_calendar
+from .search import index_hotels, remove_hotels
+
+
+# Keep the hotel calendar in step with single-row writes. Bulk writers call
+# refresh_calendar() themselves.
+
+@receiver(post_save, sender=RoomAvailability)
+def availability_changed(sender, instance, **kwargs):
+    hotel_id = (
+        RoomType.objects.filter(pk=instance.room_type_id)
+        .values_list('hotel_id', flat=True).first()
+    )
+    if hotel_id is not None:
+        transaction.on_commit(lambda: refresh_calendar([hotel_id], [instance.date]))
+
+
+# A delete() sends one signal per row, so deletes are gathered on the
+# instance or queryset the delete started from (origin) and refreshed once
+# it commits. Rows going with their room type or hotel are left to those.
+
+def _deleting(origin, *models):
+    """Whether a delete() started from an instance or queryset of models."""
+    if isinstance(origin, QuerySet):
+        return issubclass(origin.model, models)
+    return isinstance(origin, models)
+
+
+def _pending_refresh(origin):
+    """({room type id: dates}, hotel ids) to refresh when origin's delete() commits."""
+    pending = getattr(origin, '_calendar_refresh', None)
+    if pending is None:
+        pending = origin._calendar_refresh = (defaultdict(set), set())
+        transaction.on_commit(lambda: _refresh_deleted(*pending))
+    return pending
+
+
+def _refresh_deleted(room_types, hotels):
+    dates = defaultdict(set)
+    for pk, hotel_id in RoomType.objects.filter(pk__in=room_types).values_list('id', 'hotel_id'):
+        dates[hotel_id].update(room_types[pk])
+    if hotels:
+        # A room type went: recompute every day its hotel had on the calendar
+        for hotel_id, day in HotelCalendarDay.objects.filter(hotel_id__in=hotels).values_list('hotel_id', 'date'):
+            dates[hotel_id].add(day)
+    if dates:
+        refresh_calendar(dates, set().union(*dates.values()))
+
+
+@receiver(post_delete, sender=RoomAvailability)
+def availability_deleted(sender, instance, origin=None, **kwargs):
+    if _deleting(origin, RoomType, Hotel):
+        return
+    room_types, _ = _pending_refresh(instance if origin is None else origin)
+    room_types[instance.room_type_id].add(instance.date)
+
+
+@receiver(post_delete, sender=RoomType)
+def room_type_deleted(sender, instance, origin=None, **kwargs):
+    if _deleting(origin, Hotel):
+        return
+    _, hotels = _pending_refresh(instance if origin is None else origin)
+    hotels.add(instance.hotel_id)
+
+
+@receiver(post_save, sender=RoomType)
+def room_type_changed(sender, instance, created, **kwargs):
+    # Activating or retiring a room type changes what its hotel can sell
+    if created:
+        return
+    dates = list(
+        instance.availability.filter(date__gte=timezone.localdate())
+        .values_list('date', flat=True)
+    )
+    transaction.on_commit(lambda: refresh_calendar([instance.hotel_id], dates))
+
+
+# Keep the full-text index in step with hotel saves; see search.index_hotels()
+
+@receiver(post_save, sender=Hotel)
+def hotel_saved(sender, instance, **kwargs):
+    transaction.on_commit(lambda: index_hotels([instance.pk]))
+
+
+@receiver(post_delete, sender=Hotel)
+def hotel_deleted(sender, instance, **kwargs):
+    transaction.on_commit(lambda: remove_hotels([instance.pk]))
+
+
+# Keep hotel rating aggregates in step with single-row review writes. The
+# pre_save snapshot and the aggregate update are only consistent when the
+# save runs in a transaction, as the admin and the reviews endpoint do.
+# ingest_reviews() applies its own deltas.
+
+@receiver(pre_save, sender=HotelReview)
+def review_saving(sender, instance, **kwargs):
+    stored = None
+    if instance.pk is not None:
+        stored = HotelReview.objects.filter(pk=instance.pk).values_list('hotel_id', 'rating', 'is_published').first()
+    instance._counted = (stored[0], *counted(HotelReview(rating=stored[1], is_published=stored[2]))) if stored else None
+
+
+@receiver(post_save, sender=HotelReview)
+def review_saved(sender, instance, **kwargs):
+    deltas = {instance.hotel_id: counted(instance)}
+    if instance._counted:
+        hotel_id, count, total = instance._counted
+        now = deltas.get(hotel_id, (0, 0))
+        deltas[hotel_id] = (now[0] - count, now[1] - total)
+    apply_rating_deltas(deltas)
+
+
+@receiver(post_delete, sender=HotelReview)
+def review_deleted(sender, instance, **kwargs):
+    count, total = counted(instance)
+    apply_rating_deltas({instance.hotel_id: (-count, -total)})
+
+
+# Store new photo uploads once per content; variants are made by process_images
+
+@receiver(pre_save, sender=HotelImage)
+@receiver(pre_save, sender=RoomTypeImage)
+def image_uploaded(sender, instance, **kwargs):
+    attach_upload(instance)
@@ -0,0 +1,10 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from apps.hotels.views import *
+
+router = DefaultRouter()
+router.register(r'hotels', HotelViewSet, basename='hotel')
+
+urlpatterns = [
+    path('api/hotels/', include(router.urls)),
+]
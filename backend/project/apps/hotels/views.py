@@ -1,3 +1,191 @@
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.db.models import F, Prefetch
+from django.http import StreamingHttpResponse
 from django.shortcuts import render
+from django.utils import timezone
 
 # Create your views here.
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.permissions import AllowAny, BasePermission, IsAdminUser, IsAuthenticated, IsAuthenticatedOrReadOnly
+from rest_framework.response import Response
+
+from apps.common.idempotency import idempotent
+from .allocation import allocate_rooms
+from .exports import OUTPUTS, booked_between, render_export
+from .inventory import apply_inventory
+from .models import Hotel, HotelImage, HotelReview, RoomTypeImage
+from .ranking import in_city
+from .rollups import available_for_stay, calendar_days, with_lead_rate
+from .search import search_hotels
+from .serializers import (
+    AllocationSerializer, BookingExportSerializer, BulkInventorySerializer, CalendarDaySerializer,
+    CalendarQuerySerializer, HotelImageSerializer, HotelReviewSerializer, HotelSearchResultSerializer,
+    HotelSearchSerializer, ReviewQuerySerializer, RoomTypeImageSerializer, SEARCH_RESULT_COLUMNS
+)
+
+
+class IsHotelPartner(BasePermission):
+    """
+    Staff, or the owner of the hotel's active hotel service provider.
+    """
+
+    def has_object_permission(self, request, view, obj):
+        if request.user.is_staff:
+            return True
+        provider = obj.service_provider
+        return (
+            provider.owner_id == request.user.pk and provider.provider_type == 'hotel'
+            and provider.is_active and not provider.is_blocked
+        )
+
+
+class HotelViewSet(viewsets.GenericViewSet):
+    """
+    Hotel detail page data.
+    """
+    queryset = Hotel.objects.filter(is_active=True).select_related('service_provider')
+    permission_classes = [AllowAny]
+
+    @action(detail=True, methods=['get'], serializer_class=CalendarQuerySerializer)
+    def calendar(self, request, pk=None):
+        """Lowest price and availability per day for ?month=YYYY-MM (default this month) and ?months=1..3."""
+        hotel = self.get_object()
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        first = serializer.validated_data.get('month') or timezone.localdate().replace(day=1)
+        months = first.month - 1 + serializer.validated_data['months']
+        end = date(first.year + months // 12, months % 12 + 1, 1)
+        return Response({
+            'hotel': hotel.pk,
+            'date_from': first,
+            'date_to': end - timedelta(days=1),
+            'days': CalendarDaySerializer(calendar_days(hotel.pk, first, end), many=True).data,
+        })
+
+    @action(detail=False, methods=['get'], serializer_class=HotelSearchSerializer)
+    def search(self, request):
+        """
+        Active hotels by search text and/or city, best match first, or by
+        ranking score (sort=recommended, the default without a text). With
+        check_in/check_out only hotels free for the stay, with their "from"
+        price on the check-in night to filter (min_price, max_price) and
+        sort (sort=price / -price) on.
+        """
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        hotels = Hotel.objects.filter(is_active=True)
+        if 'city' in params:
+            hotels = in_city(hotels, params['city'])
+        if 'check_in' in params:
+            hotels = available_for_stay(hotels, params['check_in'], params['check_out'], params['rooms'])
+            hotels = with_lead_rate(hotels, params['check_in'])
+            if 'min_price' in params:
+                hotels = hotels.filter(lead_price__gte=params['min_price'])
+            if 'max_price' in params:
+                hotels = hotels.filter(lead_price__lte=params['max_price'])
+        if params.get('q'):
+            hotels = search_hotels(params['q'], hotels, fuzzy=params['fuzzy'])
+
+        sort = params.get('sort') or ('relevance' if params.get('q') else 'recommended')
+        if sort == 'recommended':
+            hotels = hotels.order_by('-ranking_score', 'pk')
+        elif sort == 'price':
+            hotels = hotels.order_by(F('lead_price').asc(nulls_last=True), 'pk')
+        elif sort == '-price':
+            hotels = hotels.order_by(F('lead_price').desc(nulls_last=True), 'pk')
+
+        hotels = (
+            hotels.only(*SEARCH_RESULT_COLUMNS)
+            .prefetch_related(Prefetch(
+                'images', queryset=HotelImage.objects.filter(is_primary=True).select_related('stored'),
+                to_attr='primary_images',
+            ))[:params['limit']]
+        )
+        results = HotelSearchResultSerializer(hotels, many=True, context=self.get_serializer_context())
+        return Response({'results': results.data})
+
+    @action(detail=True, methods=['get'])
+    def images(self, request, pk=None):
+        """Hotel and room type photos with their resized variant URLs."""
+        hotel = self.get_object()
+        context = self.get_serializer_context()
+        return Response({
+            'hotel': hotel.pk,
+            'images': HotelImageSerializer(
+                HotelImage.objects.filter(hotel=hotel).select_related('stored'), many=True, context=context
+            ).data,
+            'room_type_images': RoomTypeImageSerializer(
+                RoomTypeImage.objects.filter(room_type__hotel=hotel, room_type__is_active=True)
+                .select_related('stored'),
+                many=True, context=context,
+            ).data,
+        })
+
+    @action(detail=True, methods=['post'], serializer_class=BulkInventorySerializer,
+            permission_classes=[IsAuthenticated, IsHotelPartner])
+    @idempotent
+    def inventory(self, request, pk=None):
+        """Channel-manager push: rate and allotment ranges per room type, applied in one transaction."""
+        hotel = self.get_object()
+        serializer = self.get_serializer(data=request.data, context=dict(self.get_serializer_context(), hotel=hotel))
+        serializer.is_valid(raise_exception=True)
+        result = apply_inventory(hotel, serializer.validated_data['updates'])
+        return Response(result, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['post'], serializer_class=AllocationSerializer,
+            permission_classes=[IsAuthenticated, IsHotelPartner])
+    def allocate(self, request, pk=None):
+        """Assign rooms to the day's confirmed arrivals (default today); dry_run only plans."""
+        hotel = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        result = allocate_rooms(hotel, serializer.validated_data.get('date'), serializer.validated_data['dry_run'])
+        return Response(result, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], url_path='bookings-export', serializer_class=BookingExportSerializer,
+            permission_classes=[IsAdminUser])
+    def bookings_export(self, request):
+        """
+        Finance extract of the bookings made ?date_from= to ?date_to= (default
+        yesterday) with their room lines, streamed: ?output=csv (default),
+        ndjson or parquet. ?hotel= (repeatable) narrows it down.
+        """
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        bookings = booked_between(data['date_from'], data['date_to'], data.get('hotel'))
+        response = StreamingHttpResponse(render_export(bookings, data['output']), content_type=OUTPUTS[data['output']])
+        filename = f"bookings-{data['date_from'].isoformat()}-{data['date_to'].isoformat()}.{data['output']}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    @action(detail=True, methods=['get', 'post'], serializer_class=HotelReviewSerializer,
+            permission_classes=[IsAuthenticatedOrReadOnly])
+    def reviews(self, request, pk=None):
+        """Latest published reviews (?limit, default 20); POST adds one and updates the hotel's rating."""
+        hotel = self.get_object()
+        if request.method == 'POST':
+            serializer = self.get_serializer(data=request.data, context=dict(self.get_serializer_context(), hotel=hotel))
+            serializer.is_valid(raise_exception=True)
+            # The rating signals read the stored row and update the hotel; keep both in one transaction
+            with transaction.atomic():
+                serializer.save(hotel=hotel, user=request.user)
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+        query = ReviewQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        reviews = (
+            HotelReview.objects.filter(hotel=hotel, is_published=True)
+            .select_related('user')[:query.validated_data['limit']]
+        )
+        return Response({
+            'hotel': hotel.pk,
+            'average_rating': hotel.average_rating,
+            'total_reviews': hotel.total_reviews,
+            'results': self.get_serializer(reviews, many=True).data,
+        })